@@ -92,7 +92,7 @@ fi
 if [[ "${do_bootstrap}" == "1" ]]; then
   if [[ "${IMPORT_MEALDB}" == "1" ]]; then
     echo "[entrypoint] import_mealdb"
-    python manage.py import_mealdb --sleep "${MEALDB_SLEEP}" --limit "${MEALDB_LIMIT}"
+    python manage.py import_mealdb --bulk --sleep "${MEALDB_SLEEP}" --limit "${MEALDB_LIMIT}"
   fi
 
   if [[ "${TOKENIZE_INGREDIENTS}" == "1" ]]; then
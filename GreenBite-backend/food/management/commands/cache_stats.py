@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from food.utils.response_cache import EVENTS, response_cache_stats
+from food.utils.tiered_cache import TIER_EVENTS, tiered_cache_stats
+
+
+class Command(BaseCommand):
+    help = "Show response cache and two-tier catalog cache counters per namespace"
+
+    def handle(self, *args, **options):
+        stats = response_cache_stats()
+        tiers = tiered_cache_stats()
+        if not stats and not tiers:
+            self.stdout.write("No cache activity recorded yet.")
+            return
+
+        if stats:
+            self.stdout.write(f"{'namespace':<20}" + "".join(f"{e:>12}" for e in EVENTS) + f"{'hit ratio':>11}")
+            for namespace, row in sorted(stats.items()):
+                self.stdout.write(
+                    f"{namespace:<20}" + "".join(f"{row[e]:>12}" for e in EVENTS) + f"{row['hit_ratio']:>11.2%}"
+                )
+
+        if tiers:
+            if stats:
+                self.stdout.write("")
+            self.stdout.write(
+                f"{'tiered cache':<20}" + "".join(f"{e:>12}" for e in TIER_EVENTS)
+                + f"{'L1 ratio':>10}{'L2 ratio':>10}{'hit ratio':>11}"
+            )
+            for namespace, row in sorted(tiers.items()):
+                self.stdout.write(
+                    f"{namespace:<20}" + "".join(f"{row[e]:>12}" for e in TIER_EVENTS)
+                    + f"{row['l1_hit_ratio']:>10.2%}{row['l2_hit_ratio']:>10.2%}{row['hit_ratio']:>11.2%}"
+                )
+        self.stdout.write(self.style.SUCCESS("Done."))
@@ -1,9 +1,20 @@
+import json
+import os
 import time
+from pathlib import Path
+
+from django.conf import settings
 from django.core.management.base import BaseCommand
 from django.db import transaction
 
 from recipes.models import MealDBRecipe
-from food.utils.embeddings import embed_text
+from food.utils.caching import bump_catalog_version
+from food.utils.embeddings import EMBEDDING_MODEL, get_embedding_client
+from food.utils.embedding_cache import EmbeddingCache
+from food.utils.embedding_pipeline import AdaptiveRateLimiter, EmbeddingPipeline
+from food.utils.embedding_store import build_embedding_store
+
+CHECKPOINT_NAME = "embed_meals.checkpoint.json"
 
 
 def _recipe_to_text(r: MealDBRecipe, max_instructions_chars: int = 1200, max_ingredients: int = 35) -> str:
@@ -39,21 +50,48 @@ def _recipe_to_text(r: MealDBRecipe, max_instructions_chars: int = 1200, max_ing
 
 
 class Command(BaseCommand):
-    help = "Generate embeddings for MealDBRecipe and store in embedding field (fast + safe batching)."
+    help = "Generate embeddings for MealDBRecipe and store in embedding field (batched + concurrent)."
 
     def add_arguments(self, parser):
         parser.add_argument("--limit", type=int, default=0, help="0 = all")
-        parser.add_argument("--batch-size", type=int, default=50, help="DB bulk_update batch size")
-        parser.add_argument("--sleep", type=float, default=0.0, help="Sleep seconds between requests (rate limiting)")
+        parser.add_argument("--batch-size", type=int, default=200, help="DB bulk_update batch size")
+        parser.add_argument(
+            "--request-batch",
+            type=int,
+            default=100,
+            help="Number of recipes sent in one embeddings request.",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=4,
+            help="Maximum embeddings requests in flight.",
+        )
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=0.0,
+            help="Minimum seconds between requests (caps the adaptive rate limiter).",
+        )
         parser.add_argument(
             "--only-missing",
             action="store_true",
-            help="Embed only recipes where embedding IS NULL (recommended).",
+            help="Default behaviour; kept for compatibility.",
         )
         parser.add_argument(
             "--force",
             action="store_true",
-            help="Re-embed even if embedding exists.",
+            help="Re-embed even if embedding exists (resumes from the last checkpoint).",
+        )
+        parser.add_argument(
+            "--restart",
+            action="store_true",
+            help="Ignore any checkpoint left by an interrupted --force run.",
+        )
+        parser.add_argument(
+            "--no-cache",
+            action="store_true",
+            help="Bypass the content-hash embedding cache (always call the API).",
         )
         parser.add_argument(
             "--max",
@@ -61,75 +99,220 @@ class Command(BaseCommand):
             default=0,
             help="Alias for --limit (kept for convenience).",
         )
+        parser.add_argument(
+            "--skip-store",
+            action="store_true",
+            help="Do not rebuild the memory-mapped embedding store after embedding.",
+        )
+        parser.add_argument(
+            "--store-only",
+            action="store_true",
+            help="Only rebuild the embedding store from embeddings already in the DB.",
+        )
 
     def handle(self, *args, **opts):
         limit = opts["limit"] or opts["max"]
-        batch_size = int(opts["batch_size"])
+        batch_size = max(1, int(opts["batch_size"]))
+        request_batch = max(1, int(opts["request_batch"]))
+        concurrency = max(1, int(opts["concurrency"]))
         sleep_s = float(opts["sleep"])
-        only_missing = bool(opts["only_missing"])
         force = bool(opts["force"])
 
+        if opts["store_only"]:
+            self._publish_store()
+            return
+
         qs = MealDBRecipe.objects.all().order_by("id")
-        if not force and only_missing:
-            qs = qs.filter(embedding__isnull=True)
-        elif not force and not only_missing:
-            # default behavior as your old command: missing only
+        if not force:
+            # missing only (default, same as --only-missing); reruns resume by themselves
             qs = qs.filter(embedding__isnull=True)
+        else:
+            checkpoint = self._read_checkpoint()
+            if checkpoint and not opts["restart"]:
+                qs = qs.filter(id__gt=checkpoint["last_id"])
+                self.stdout.write(f"Resuming from checkpoint (last_id={checkpoint['last_id']})")
 
         if limit and limit > 0:
             qs = qs[:limit]
 
         total = qs.count()
         if total == 0:
+            self._clear_checkpoint()
             self.stdout.write(self.style.SUCCESS("Nothing to embed."))
+            if not opts["skip_store"]:
+                self._publish_store()
             return
 
-        self.stdout.write(f"Embedding {total} MealDB recipes (batch_size={batch_size}, sleep={sleep_s}) ...")
+        limiter = AdaptiveRateLimiter(max_rate=1.0 / sleep_s) if sleep_s > 0 else AdaptiveRateLimiter()
+        pipeline = EmbeddingPipeline(
+            get_embedding_client(),
+            model=EMBEDDING_MODEL,
+            concurrency=concurrency,
+            limiter=limiter,
+        )
+
+        self.stdout.write(
+            f"Embedding {total} MealDB recipes "
+            f"(request_batch={request_batch}, concurrency={concurrency}, batch_size={batch_size}) ..."
+        )
 
+        # trimmed once at the end of the run instead of on sampled inserts
+        embedding_cache = None if opts["no_cache"] else EmbeddingCache(model=EMBEDDING_MODEL, evict_sample_rate=0)
+        cached_hits = []
         updated_buffer = []
+        counters = {"skipped": 0, "cached": 0}
         ok = 0
-        skipped = 0
         failed = 0
+        # highest id of the contiguous run of batches written without errors
+        last_id = None
+        clean_prefix = True
         started = time.time()
 
-        # Use iterator for memory efficiency
-        for r in qs.iterator(chunk_size=200):
-            text = _recipe_to_text(r)
-            if not text.strip():
-                skipped += 1
-                continue
+        fields = ("id", "title", "cuisine", "category", "ingredients", "instructions")
+        recipes = qs.only(*fields).iterator(chunk_size=1000)
+
+        batches = self._request_batches(recipes, request_batch, counters, embedding_cache, cached_hits)
+        for (batch, texts), vectors, error in pipeline.run(batches):
+            ok += self._apply(cached_hits, updated_buffer)
+            cached_hits.clear()
 
-            try:
-                emb = embed_text(text)
-                if not emb:
-                    failed += 1
-                    continue
-                r.embedding = emb
-                updated_buffer.append(r)
-                ok += 1
-            except Exception as e:
-                failed += 1
-                # keep going; don't kill the whole batch
-                self.stderr.write(f"[embed_meals] Failed id={r.id} title={r.title!r}: {e}")
+            if error is not None:
+                # the checkpoint must not move past these ids, or a resumed --force run skips them
+                clean_prefix = False
+                failed += len(batch)
+                # keep going; don't kill the whole run
+                self.stderr.write(
+                    f"[embed_meals] Failed ids {batch[0].id}..{batch[-1].id} ({len(batch)} recipes): {error}"
+                )
                 continue
 
-            if sleep_s > 0:
-                time.sleep(sleep_s)
+            if embedding_cache is not None:
+                embedding_cache.set_many(dict(zip(texts, vectors)))
+            applied = self._apply(zip(batch, vectors), updated_buffer)
+            failed += len(batch) - applied
+            ok += applied
+            if applied < len(batch):
+                clean_prefix = False
+            elif clean_prefix:
+                last_id = batch[-1].id
 
             if len(updated_buffer) >= batch_size:
-                with transaction.atomic():
-                    MealDBRecipe.objects.bulk_update(updated_buffer, ["embedding"], batch_size=batch_size)
+                self._flush(updated_buffer, batch_size, last_id)
                 elapsed = time.time() - started
                 self.stdout.write(self.style.SUCCESS(
-                    f"Progress: embedded={ok}/{total} skipped={skipped} failed={failed} elapsed={elapsed:.1f}s"
+                    f"Progress: embedded={ok}/{total} cached={counters['cached']} "
+                    f"skipped={counters['skipped']} failed={failed} "
+                    f"requests={pipeline.requests} retries={pipeline.retries} "
+                    f"rate={pipeline.limiter.rate:.1f}/s elapsed={elapsed:.1f}s"
                 ))
-                updated_buffer.clear()
 
-        if updated_buffer:
-            with transaction.atomic():
-                MealDBRecipe.objects.bulk_update(updated_buffer, ["embedding"], batch_size=batch_size)
+        # hits found after the last API batch (or in a fully cached run)
+        ok += self._apply(cached_hits, updated_buffer)
+        self._flush(updated_buffer, batch_size, last_id)
+        if embedding_cache is not None:
+            embedding_cache.evict()
+        if failed and force:
+            # resume point stays before the first failed batch
+            self.stdout.write("Checkpoint kept before the first failure; rerun with --force to retry the failed ids")
+        else:
+            self._clear_checkpoint()
+        if ok:
+            # bulk_update skips the post_save signal: tell every worker's catalog cache
+            bump_catalog_version()
 
         elapsed = time.time() - started
         self.stdout.write(self.style.SUCCESS(
-            f"✅ Done. embedded={ok} skipped={skipped} failed={failed} total={total} elapsed={elapsed:.1f}s"
+            f"✅ Done. embedded={ok} cached={counters['cached']} skipped={counters['skipped']} "
+            f"failed={failed} total={total} "
+            f"requests={pipeline.requests} retries={pipeline.retries} elapsed={elapsed:.1f}s"
+        ))
+
+        if not opts["skip_store"]:
+            self._publish_store()
+
+    @staticmethod
+    def _apply(pairs, buffer) -> int:
+        applied = 0
+        for r, emb in pairs:
+            if not emb:
+                continue
+            r.embedding = emb
+            r.sync_embedding_vector()
+            buffer.append(r)
+            applied += 1
+        return applied
+
+    @classmethod
+    def _request_batches(cls, recipes, size, counters, embedding_cache, cached_hits):
+        """
+        Yield ((recipes, texts), texts) for the API. Recipes whose text is already
+        in the embedding cache go straight to `cached_hits` instead.
+        """
+        chunk, texts = [], []
+        for r in recipes:
+            text = _recipe_to_text(r)
+            if not text.strip():
+                counters["skipped"] += 1
+                continue
+            chunk.append(r)
+            texts.append(text)
+            if len(chunk) >= size:
+                yield from cls._split_cached(chunk, texts, counters, embedding_cache, cached_hits)
+                chunk, texts = [], []
+        if chunk:
+            yield from cls._split_cached(chunk, texts, counters, embedding_cache, cached_hits)
+
+    @staticmethod
+    def _split_cached(chunk, texts, counters, embedding_cache, cached_hits):
+        found = embedding_cache.get_many(texts) if embedding_cache is not None else {}
+        misses = []
+        for r, text in zip(chunk, texts):
+            if text in found:
+                cached_hits.append((r, found[text]))
+            else:
+                misses.append((r, text))
+        counters["cached"] += len(chunk) - len(misses)
+        if misses:
+            batch = [r for r, _ in misses]
+            miss_texts = [t for _, t in misses]
+            yield (batch, miss_texts), miss_texts
+
+    def _flush(self, buffer, batch_size, last_id):
+        if buffer:
+            with transaction.atomic():
+                MealDBRecipe.objects.bulk_update(buffer, ["embedding", "embedding_vec"], batch_size=batch_size)
+            buffer.clear()
+        if last_id is not None:
+            self._write_checkpoint(last_id)
+
+    # Checkpoint: highest recipe id whose batch is written (results arrive in id order)
+    def _checkpoint_path(self) -> Path:
+        return Path(settings.EMBEDDING_STORE_DIR) / CHECKPOINT_NAME
+
+    def _read_checkpoint(self):
+        try:
+            with open(self._checkpoint_path(), "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get("model") != EMBEDDING_MODEL:
+            return None
+        return data
+
+    def _write_checkpoint(self, last_id: int) -> None:
+        path = self._checkpoint_path()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"model": EMBEDDING_MODEL, "last_id": last_id}, f)
+        os.replace(tmp, path)
+
+    def _clear_checkpoint(self) -> None:
+        self._checkpoint_path().unlink(missing_ok=True)
+
+    def _publish_store(self):
+        store = build_embedding_store()
+        dim = store.matrix.shape[1] if store.matrix.ndim == 2 else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"Embedding store generation {store.generation} written ({len(store)} x {dim})"
         ))
@@ -0,0 +1,121 @@
+"""
+Run EXPLAIN ANALYZE on the hot FoodLogSys queries against a seeded dataset.
+
+The dataset is created inside a transaction that is rolled back, so it is safe
+to point at a development database:
+
+    python manage.py explain_foodlog_queries --users 200 --logs-per-user 150
+    python manage.py explain_foodlog_queries --summary
+
+Each query is built by the same helper the application uses, so the plans
+shown are the plans production runs.
+"""
+import random
+import re
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from food.models import CategoryChoices, FoodLogSys, StorageTypeChoices
+from food.views.foodlogsysviews import expiring_soon_queryset
+from meal_plans.services.inventory import InventorySnapshot
+from project.utils.normalize import normalize_ingredient_name
+from recipes.views import preview_logs_queryset
+
+PANTRY = (
+    "chicken breast", "ground beef", "salmon", "eggs", "milk", "butter", "cheddar cheese",
+    "yogurt", "rice", "pasta", "flour", "bread", "tomato", "onion", "garlic", "potato",
+    "carrot", "spinach", "broccoli", "bell pepper", "apple", "banana", "lemon", "beans",
+)
+PREVIEW_INGREDIENTS = ("chicken breast", "onion", "garlic", "tomato", "rice", "bell pepper")
+
+_INDEX_RE = re.compile(r"(?:Index|Index Only|Bitmap Index) Scan(?: Backward)? (?:using|on) (\w+)")
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "EXPLAIN ANALYZE the canonical FoodLogSys queries on a seeded (rolled back) dataset"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=100, help="Seeded users")
+        parser.add_argument("--logs-per-user", type=int, default=150, help="Seeded food logs per user")
+        parser.add_argument("--consumed-ratio", type=float, default=0.6, help="Share of seeded logs already consumed")
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--summary", action="store_true", help="Print one line per query instead of full plans")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("EXPLAIN ANALYZE output is only meaningful on PostgreSQL")
+
+        try:
+            with transaction.atomic():
+                user = self._seed(options)
+                with connection.cursor() as cursor:
+                    cursor.execute(f"ANALYZE {connection.ops.quote_name(FoodLogSys._meta.db_table)}")
+                for label, queryset in self._queries(user):
+                    self._explain(label, queryset, options["summary"])
+                raise _Rollback()
+        except _Rollback:
+            pass
+
+        self.stdout.write(self.style.SUCCESS("Done (all seeded rows rolled back)."))
+
+    def _queries(self, user):
+        today = timezone.now().date()
+        norms = sorted({normalize_ingredient_name(name) for name in PREVIEW_INGREDIENTS})
+        return [
+            ("InventoryService / RecommendRecipesAPIView (inventory snapshot)", InventorySnapshot.queryset(user, today)),
+            ("ConsumePreviewAPIView", preview_logs_queryset(user, norms, today)),
+            ("expiring_soon", expiring_soon_queryset(user, today + timedelta(days=3))),
+        ]
+
+    def _seed(self, options):
+        rng = random.Random(options["seed"])
+        today = timezone.now().date()
+        user_model = get_user_model()
+        users = user_model.objects.bulk_create(
+            user_model(email=f"explain-{i}@example.invalid", username=f"explain-{i}", password="!")
+            for i in range(max(1, options["users"]))
+        )
+
+        categories = [c for c, _ in CategoryChoices.choices]
+        storage = [s for s, _ in StorageTypeChoices.choices]
+        normalized = {name: normalize_ingredient_name(name) for name in PANTRY}
+        logs = []
+        for user in users:
+            for _ in range(max(0, options["logs_per_user"])):
+                name = rng.choice(PANTRY)
+                logs.append(FoodLogSys(
+                    user=user,
+                    name=name,
+                    # bulk_create skips save(), which normally fills name_normalized
+                    name_normalized=normalized[name],
+                    quantity=rng.randint(0, 20),
+                    unit="pcs",
+                    category=rng.choice(categories),
+                    storage_type=rng.choice(storage),
+                    expiry_date=today + timedelta(days=rng.randint(-60, 60)),
+                    is_consumed=rng.random() < options["consumed_ratio"],
+                ))
+        # real pantries grow interleaved across users; contiguous per-user rows flatter the plain user_id index
+        rng.shuffle(logs)
+        FoodLogSys.objects.bulk_create(logs, batch_size=2000)
+        self.stdout.write(f"Seeded {len(users)} users / {len(logs)} food logs")
+        return users[0]
+
+    def _explain(self, label, queryset, summary):
+        plan = queryset.explain(analyze=True, buffers=True)
+        if summary:
+            indexes = sorted(set(_INDEX_RE.findall(plan))) or ["seq scan"]
+            timing = re.search(r"Execution Time: ([\d.]+) ms", plan)
+            self.stdout.write(f"{label}: {', '.join(indexes)} ({timing.group(1) if timing else '?'} ms)")
+            return
+        self.stdout.write(self.style.MIGRATE_HEADING(label))
+        self.stdout.write(plan)
+        self.stdout.write("")
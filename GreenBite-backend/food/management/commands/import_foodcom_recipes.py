@@ -1,81 +1,161 @@
-import csv
-import ast
+import io
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 
-from django.core.management.base import BaseCommand
-from django.db import transaction
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
 
-from food.models import FoodComRecipe
+from food.utils.foodcom_csv import COPY_COLUMNS, iter_chunk_ranges, parse_chunk, read_header
 
-
-def parse_list(value):
-    if value is None:
-        return []
-    value = str(value).strip()
-    if not value:
-        return []
-    try:
-        return ast.literal_eval(value)  # "['a','b']" -> ['a','b']
-    except Exception:
-        return []
+# table of the retired FoodComRecipe model; COPY only targets columns it actually has
+DEFAULT_TABLE = "food_foodcomrecipe"
+TEXT_COLUMNS = ("title", "description", "source")
 
 
 class Command(BaseCommand):
-    help = "Import Food.com RAW_recipes.csv into FoodComRecipe table"
+    help = "Import Food.com RAW_recipes.csv into the FoodComRecipe table (parallel parse + COPY)"
 
     def add_arguments(self, parser):
         parser.add_argument("csv_path", type=str)
-        parser.add_argument("--batch-size", type=int, default=2000)
-        parser.add_argument("--limit", type=int, default=None)
+        parser.add_argument("--table", type=str, default=DEFAULT_TABLE)
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Parser processes")
+        parser.add_argument("--chunk-mb", type=float, default=8.0, help="Approximate size of each byte-range chunk")
+        parser.add_argument("--limit", type=int, default=None, help="Stop after N rows (sampling runs save no resume offset)")
+        parser.add_argument("--resume", action="store_true", help="Continue from the offset saved by an interrupted run")
+        parser.add_argument("--start-offset", type=int, default=None, help="Start at this byte offset (a record boundary)")
+        parser.add_argument("--dry-run", action="store_true", help="Parse only; report throughput without writing")
 
     def handle(self, *args, **options):
         csv_path = options["csv_path"]
-        batch_size = options["batch_size"]
+        table = options["table"]
         limit = options["limit"]
-
-        to_create = []
-        created_total = 0
-        processed = 0
-
-        self.stdout.write(f"Reading: {csv_path}")
-
-        with open(csv_path, "r", encoding="utf-8", newline="") as f:
-            reader = csv.DictReader(f)
-
-            for row in reader:
-                processed += 1
-                if limit and processed > limit:
-                    break
-
-                # Map CSV -> model (ignore nutrition, contributor_id, submitted, etc.)
-                recipe = FoodComRecipe(
-                    title=(row.get("name") or "").strip(),
-                    description=(row.get("description") or "").strip(),
-                    tags=parse_list(row.get("tags")),
-                    ingredients=parse_list(row.get("ingredients")),
-                    steps=parse_list(row.get("steps")),
-                    n_ingredients=int(row["n_ingredients"]) if row.get("n_ingredients") else None,
-                    n_steps=int(row["n_steps"]) if row.get("n_steps") else None,
-                    source="foodcom",
+        dry_run = options["dry_run"]
+        workers = max(1, options["workers"])
+        chunk_bytes = max(1, int(options["chunk_mb"] * 1024 * 1024))
+
+        if not os.path.exists(csv_path):
+            raise CommandError(f"File not found: {csv_path}")
+
+        fieldnames, data_start = read_header(csv_path)
+        columns = list(COPY_COLUMNS) if dry_run else self._target_columns(table)
+
+        start = data_start
+        if options["start_offset"] is not None:
+            start = max(data_start, options["start_offset"])
+        elif options["resume"]:
+            start = max(data_start, self._read_progress(csv_path))
+
+        size = os.path.getsize(csv_path)
+        self.stdout.write(f"Reading: {csv_path} from byte {start}/{size} with {workers} workers")
+
+        now = timezone.now().isoformat()
+        copy_sql = self._copy_sql(table, columns)
+        processed = skipped = 0
+        offset = start
+        started = time.time()
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = deque()
+            ranges = iter_chunk_ranges(csv_path, start, chunk_bytes)
+
+            def submit_next():
+                for chunk_start, chunk_end in ranges:
+                    pending.append(pool.submit(parse_chunk, csv_path, chunk_start, chunk_end, fieldnames, columns, now))
+                    return
+
+            # bounded look-ahead keeps memory flat on large files
+            for _ in range(workers * 2):
+                submit_next()
+
+            while pending:
+                chunk = pending.popleft().result()
+                submit_next()
+
+                data, rows = chunk.copy_data, chunk.rows
+                if limit and processed + rows > limit:
+                    rows = limit - processed
+                    data = chunk.head(rows)
+
+                if not dry_run and rows:
+                    with transaction.atomic():
+                        with connection.cursor() as cursor:
+                            cursor.copy_expert(copy_sql, io.StringIO(data))
+
+                processed += rows
+                skipped += chunk.skipped
+                offset = chunk.end
+                if not dry_run and not limit:
+                    self._write_progress(csv_path, offset)
+
+                elapsed = time.time() - started
+                self.stdout.write(
+                    f"Processed {processed} rows (offset {offset}/{size}, {processed / elapsed if elapsed else 0:.0f} rows/s)"
                 )
 
-                to_create.append(recipe)
-
-                if len(to_create) >= batch_size:
-                    created_total += self._flush(to_create)
-                    to_create.clear()
-                    self.stdout.write(f"Processed {processed}, created {created_total}")
+                if limit and processed >= limit:
+                    for future in pending:
+                        future.cancel()
+                    break
 
-        if to_create:
-            created_total += self._flush(to_create)
+        if not dry_run and not limit and offset >= size:
+            self._clear_progress(csv_path)
 
+        elapsed = time.time() - started
         self.stdout.write(self.style.SUCCESS(
-            f"Done. Processed {processed} rows. Created {created_total} new rows."
+            f"Done. {'Parsed' if dry_run else 'Copied'} {processed} rows, skipped {skipped} "
+            f"in {elapsed:.1f}s ({processed / elapsed if elapsed else 0:.0f} rows/s). Last offset {offset}."
         ))
 
-    def _flush(self, objs):
-        with transaction.atomic():
-            created = FoodComRecipe.objects.bulk_create(
-                objs,
-                batch_size=len(objs),
-            )
-        return len(created)
\ No newline at end of file
+    def _target_columns(self, table):
+        with connection.cursor() as cursor:
+            if table not in connection.introspection.table_names(cursor):
+                raise CommandError(
+                    f"Table {table!r} does not exist (the FoodComRecipe model is not installed). "
+                    "Use --table to point at an existing table or --dry-run to benchmark parsing."
+                )
+            existing = {c.name for c in connection.introspection.get_table_description(cursor, table)}
+        columns = [c for c in COPY_COLUMNS if c in existing]
+        if "title" not in columns:
+            raise CommandError(f"Table {table!r} has no title column")
+        return columns
+
+    @staticmethod
+    def _copy_sql(table, columns):
+        qn = connection.ops.quote_name
+        cols = ", ".join(qn(c) for c in columns)
+        not_null = ", ".join(qn(c) for c in columns if c in TEXT_COLUMNS)
+        options = "FORMAT csv" + (f", FORCE_NOT_NULL ({not_null})" if not_null else "")
+        return f"COPY {qn(table)} ({cols}) FROM STDIN WITH ({options})"
+
+    # Resume state: byte offset after the last committed chunk, next to the CSV
+    @staticmethod
+    def _progress_path(csv_path):
+        return f"{csv_path}.progress.json"
+
+    def _read_progress(self, csv_path):
+        try:
+            with open(self._progress_path(csv_path), "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return 0
+        if state.get("size") != os.path.getsize(csv_path):
+            self.stderr.write(self.style.WARNING("CSV changed since the last run; starting from the beginning"))
+            return 0
+        return int(state.get("offset") or 0)
+
+    def _write_progress(self, csv_path, offset):
+        path = self._progress_path(csv_path)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"offset": offset, "size": os.path.getsize(csv_path)}, f)
+        os.replace(tmp, path)
+
+    def _clear_progress(self, csv_path):
+        try:
+            os.remove(self._progress_path(csv_path))
+        except FileNotFoundError:
+            pass
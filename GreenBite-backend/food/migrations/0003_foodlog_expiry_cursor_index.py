@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:50
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('food', '0002_embedding_cache'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='foodlogsys',
+            index=models.Index(fields=['user', 'expiry_date', 'id'], name='foodlog_user_expiry_id_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:52
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('food', '0003_foodlog_expiry_cursor_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='foodlogsys',
+            index=models.Index(condition=models.Q(('is_consumed', False)), fields=['user', 'expiry_date', 'id'], name='foodlog_open_user_expiry_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='foodlogsys',
+            index=models.Index(condition=models.Q(('is_consumed', False)), fields=['user', 'name_normalized', 'expiry_date'], name='foodlog_open_user_name_idx'),
+        ),
+    ]
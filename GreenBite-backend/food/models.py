@@ -163,6 +163,22 @@ class FoodLogSys(models.Model):
         ordering = ['expiry_date']
         verbose_name = "Food Log Entry"
         verbose_name_plural = "Food Log Entries"
+        indexes = [
+            # keyset pagination of the food log list: WHERE user = ? AND (expiry_date, id) > (?, ?)
+            models.Index(fields=["user", "expiry_date", "id"], name="foodlog_user_expiry_id_idx"),
+            # open inventory (snapshot, expiring soon): WHERE user = ? AND NOT is_consumed ORDER BY expiry_date
+            models.Index(
+                fields=["user", "expiry_date", "id"],
+                condition=models.Q(is_consumed=False),
+                name="foodlog_open_user_expiry_idx",
+            ),
+            # ingredient lookups (consume preview): WHERE user = ? AND NOT is_consumed AND name_normalized IN (...)
+            models.Index(
+                fields=["user", "name_normalized", "expiry_date"],
+                condition=models.Q(is_consumed=False),
+                name="foodlog_open_user_name_idx",
+            ),
+        ]
 
 #input get it from ai and make crud operation 
 class WasteLog(models.Model):
@@ -263,3 +279,23 @@ class FoodSafetyScanJob(models.Model):
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+
+
+class EmbeddingCacheEntry(models.Model):
+    """
+    Persistent embedding cache keyed by (model, sha256(text)).
+    `last_used_at` drives LRU eviction (see food.utils.embedding_cache).
+    """
+    model = models.CharField(max_length=100)
+    text_hash = models.CharField(max_length=64)
+    embedding = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["model", "text_hash"], name="uniq_embedding_cache_model_hash")
+        ]
+
+    def __str__(self):
+        return f"EmbeddingCacheEntry(model={self.model}, hash={self.text_hash[:12]})"
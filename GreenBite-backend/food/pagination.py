@@ -1,4 +1,13 @@
+import base64
+import binascii
+import json
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
 
 class FoodLogPagination(PageNumberPagination):
@@ -17,3 +26,85 @@ class MealPagination(PageNumberPagination):
     page_size = 10 
     page_size_query_param = 'page_size'
     max_page_size = 50
+
+
+class FoodLogCursorPagination:
+  """
+  Keyset pagination on (sort field, id) for the food log list.
+
+  Each page is `WHERE (field, id) > (last field, last id) ORDER BY field, id
+  LIMIT n`, which the (user, expiry_date, id) index serves without an OFFSET
+  scan. The total is only counted when asked for (`count=true`).
+  """
+  page_size = 20
+  page_size_query_param = "page_size"
+  max_page_size = 100
+  cursor_query_param = "cursor"
+  invalid_cursor_message = "Invalid cursor"
+
+  def paginate_queryset(self, queryset, request, field="expiry_date", descending=False):
+    self.request = request
+    self.model = queryset.model
+    self.field = field
+    self.descending = descending
+    self.count = queryset.count() if _truthy(request.query_params.get("count")) else None
+
+    size = self.get_page_size(request)
+    prefix = "-" if descending else ""
+    queryset = queryset.order_by(f"{prefix}{field}", f"{prefix}id")
+
+    encoded = request.query_params.get(self.cursor_query_param)
+    if encoded:
+      value, last_id = self.decode_cursor(encoded)
+      op = "lt" if descending else "gt"
+      queryset = queryset.filter(
+        Q(**{f"{field}__{op}": value}) | Q(**{field: value, f"id__{op}": last_id})
+      )
+
+    rows = list(queryset[: size + 1])
+    self.has_next = len(rows) > size
+    rows = rows[:size]
+    self.last = rows[-1] if rows else None
+    return rows
+
+  def get_page_size(self, request):
+    try:
+      size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+    except (TypeError, ValueError):
+      return self.page_size
+    return max(1, min(size, self.max_page_size))
+
+  def decode_cursor(self, encoded):
+    try:
+      state = json.loads(base64.urlsafe_b64decode(encoded.encode("ascii")))
+      if state["f"] != self.field or bool(state["d"]) != self.descending:
+        raise ValueError("cursor belongs to another sort")
+      # a value the field cannot hold would otherwise fail in the query (500)
+      value = self.model._meta.get_field(self.field).to_python(state["v"])
+      return value, int(state["id"])
+    except (TypeError, ValueError, KeyError, binascii.Error, ValidationError, FieldDoesNotExist):
+      raise NotFound(self.invalid_cursor_message)
+
+  def encode_cursor(self, row):
+    def get(name):
+      return row[name] if isinstance(row, dict) else getattr(row, name)
+
+    value = get(self.field)
+    state = {"f": self.field, "d": int(self.descending), "v": str(value), "id": get("id")}
+    return base64.urlsafe_b64encode(json.dumps(state, separators=(",", ":")).encode("ascii")).decode("ascii")
+
+  def get_next_link(self):
+    if not self.has_next or self.last is None:
+      return None
+    url = self.request.build_absolute_uri()
+    return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.last))
+
+  def get_paginated_response(self, data):
+    payload = {"next": self.get_next_link(), "results": data}
+    if self.count is not None:
+      payload["count"] = self.count
+    return Response(payload)
+
+
+def _truthy(value):
+  return str(value).lower() in ("1", "true", "yes")
@@ -0,0 +1,18 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from food.utils.caching import bump_foodlog_version
+from .models import FoodLogSys
+
+
+@receiver(post_save, sender=FoodLogSys)
+@receiver(post_delete, sender=FoodLogSys)
+def foodlog_changed(sender, instance, **kwargs):
+    """
+    Any pantry write retires the user's cached inventory snapshot.
+    Bumped again on commit so a snapshot cached from pre-commit rows is not reused.
+    """
+    user_id = instance.user_id
+    bump_foodlog_version(user_id)
+    transaction.on_commit(lambda: bump_foodlog_version(user_id))
@@ -1,14 +1,44 @@
+import ast
+import base64
+import csv
+import json
+import os
+import tempfile
+from io import StringIO
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
 from datetime import date, timedelta
 from decimal import Decimal
 
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
 from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from rest_framework import status
+from rest_framework.response import Response
 from rest_framework.test import APITestCase
 
 from food.models import FoodLogSys, WasteLog
+from food.management.commands.embed_meals import CHECKPOINT_NAME, _recipe_to_text
+from food.models import EmbeddingCacheEntry
+from food.utils.embedding_cache import EmbeddingCache, embedding_cache_stats
+from food.utils.embedding_pipeline import AdaptiveRateLimiter, EmbeddingPipeline
+from food.utils.foodcom_csv import COPY_COLUMNS, iter_chunk_ranges, parse_chunk, parse_list, read_header
+from food.utils import normalize as food_normalize
+from food.utils.meal_fallback import fallback_meals_from_mealdb
+from food.utils.embedding_store import build_embedding_store, get_embedding_store, reset_embedding_store
+from food.utils import response_cache
+from food.utils.caching import CATALOG_NAMESPACE, _version_key, bump_list_version, get_catalog_version, get_list_version
+from food.utils.response_cache import cached_response, decode_payload, encode_payload, entry_key, response_cache_stats
+from food.utils.similarity import cosine_similarity
+from food.utils.tiered_cache import TieredCache, catalog_cache, tiered_cache_stats
+from project.utils import normalize as project_normalize
+from recipes.models import EMBEDDING_DIMENSIONS, MealDBRecipe
 
 TEST_CACHES = {
     "default": {
@@ -143,6 +173,70 @@ class FoodLogSysAPITests(APITestCase):
         self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
         self.assertFalse(FoodLogSys.objects.filter(id=log.id).exists())
     
+@override_settings(CACHES=TEST_CACHES)
+class FoodLogCursorPaginationTests(APITestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(email="cursor@test.com", password="pass1234")
+        self.client.force_authenticate(user=self.user)
+        self.list_url = "/api/food-logs/"
+        today = date.today()
+        # three logs per expiry date so the id tie-breaker is exercised
+        self.logs = [
+            FoodLogSys.objects.create(
+                user=self.user, name=f"Item {i:02d}", quantity=Decimal(i % 4 + 1), unit="kg",
+                category="fruit" if i % 2 else "vegetable", storage_type="fridge",
+                expiry_date=today + timedelta(days=i // 3),
+            )
+            for i in range(14)
+        ]
+
+    def _walk(self, **params):
+        ids, url, params = [], self.list_url, {"pagination": "cursor", "page_size": 4, **params}
+        while url:
+            res = self.client.get(url, params)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            ids.extend(row["id"] for row in res.data["results"])
+            url, params = res.data["next"], None
+        return ids
+
+    def test_walks_every_log_in_expiry_order_without_count(self):
+        with self.assertNumQueries(1):
+            res = self.client.get(self.list_url, {"pagination": "cursor", "page_size": 4})
+        self.assertNotIn("count", res.data)
+
+        self.assertEqual(self._walk(), [log.id for log in self.logs])
+
+    def test_sort_and_filters_keep_working(self):
+        expected = sorted(
+            (log for log in self.logs if log.category == "fruit"),
+            key=lambda log: (-log.quantity, -log.id),
+        )
+        ids = self._walk(sort_by="quantity", sort_order="desc", category="fruit")
+
+        self.assertEqual(ids, [log.id for log in expected])
+
+    def test_compact_projection_and_optional_count(self):
+        res = self.client.get(self.list_url, {"pagination": "cursor", "fields": "compact", "count": "true"})
+
+        self.assertEqual(res.data["count"], 14)
+        row = res.data["results"][0]
+        self.assertEqual(set(row), {"id", "name", "quantity", "unit", "category", "storage_type", "expiry_date", "is_consumed"})
+        self.assertEqual(row["quantity"], "1.00")
+
+    def test_invalid_cursor(self):
+        res = self.client.get(self.list_url, {"cursor": "not-a-cursor"})
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_cursor_with_a_value_the_field_cannot_hold(self):
+        for params, field in (({}, "expiry_date"), ({"sort_by": "quantity"}, "quantity")):
+            state = {"f": field, "d": 0, "v": "abc", "id": 1}
+            cursor = base64.urlsafe_b64encode(json.dumps(state).encode("ascii")).decode("ascii")
+
+            res = self.client.get(self.list_url, {"cursor": cursor, **params})
+
+            self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND, field)
+
+
 @override_settings(CACHES=TEST_CACHES)
 class WasteLogAPITests(APITestCase):
     def setUp(self):
@@ -233,4 +327,588 @@ class WasteLogAPITests(APITestCase):
         log = self._create_waste_log(name="DeleteMe")
         res = self.client.delete(f"/api/waste-log/{log.id}/")
         self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
-        self.assertFalse(WasteLog.objects.filter(id=log.id).exists())
\ No newline at end of file
+        self.assertFalse(WasteLog.objects.filter(id=log.id).exists())
+
+
+@override_settings(CACHES=TEST_CACHES)
+class EmbeddingStoreTests(APITestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.settings_override = override_settings(EMBEDDING_STORE_DIR=self.tmp.name)
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+        reset_embedding_store()
+        self.addCleanup(reset_embedding_store)
+
+        self.recipes = [
+            MealDBRecipe.objects.create(mealdb_id="e1", title="A", embedding=[1.0, 0.0, 0.0]),
+            MealDBRecipe.objects.create(mealdb_id="e2", title="B", embedding=[0.6, 0.8, 0.0]),
+            MealDBRecipe.objects.create(mealdb_id="e3", title="C", embedding=[0.0, 0.0, 2.0]),
+            MealDBRecipe.objects.create(mealdb_id="e4", title="D", embedding=None),
+        ]
+
+    def test_search_matches_cosine_similarity(self):
+        store = build_embedding_store()
+        self.assertEqual(len(store), 3)
+
+        query = [0.9, 0.3, 0.1]
+        hits = store.search(query, top_k=2)
+
+        expected = sorted(
+            ((cosine_similarity(query, r.embedding), r.id) for r in self.recipes if r.embedding),
+            reverse=True,
+        )[:2]
+        self.assertEqual([rid for rid, _ in hits], [rid for _, rid in expected])
+        for (_, got), (want, _) in zip(hits, expected):
+            self.assertAlmostEqual(got, want, places=5)
+
+    def test_search_respects_threshold_and_restrict_ids(self):
+        store = build_embedding_store()
+        hits = store.search([0.0, 0.0, 1.0], top_k=5, threshold=0.5)
+        self.assertEqual([rid for rid, _ in hits], [self.recipes[2].id])
+
+        hits = store.search([1.0, 0.0, 0.0], top_k=5, restrict_ids=[self.recipes[1].id])
+        self.assertEqual([rid for rid, _ in hits], [self.recipes[1].id])
+
+    def test_shared_store_reloads_on_new_generation(self):
+        self.assertIsNone(get_embedding_store())
+
+        build_embedding_store()
+        first = get_embedding_store()
+        self.assertIs(first, get_embedding_store())
+
+        build_embedding_store()
+        second = get_embedding_store()
+        self.assertEqual(second.generation, first.generation + 1)
+
+
+def _unit_vector(*components):
+    vec = [0.0] * EMBEDDING_DIMENSIONS
+    for i, value in enumerate(components):
+        vec[i] = value
+    return vec
+
+
+@override_settings(CACHES=TEST_CACHES)
+class MealFallbackDatabaseSearchTests(APITestCase):
+    def setUp(self):
+        self.omelette = MealDBRecipe.objects.create(
+            mealdb_id="v1", title="Omelette",
+            ingredients=[{"name": "Eggs"}, {"name": "Cheese"}],
+            embedding=_unit_vector(1.0, 0.0),
+        )
+        self.frittata = MealDBRecipe.objects.create(
+            mealdb_id="v2", title="Frittata",
+            ingredients=[{"name": "Eggs"}, {"name": "Potato"}],
+            embedding=_unit_vector(0.6, 0.8),
+        )
+        self.stew = MealDBRecipe.objects.create(
+            mealdb_id="v3", title="Beef Stew",
+            ingredients=[{"name": "Beef"}, {"name": "Carrot"}],
+            embedding=_unit_vector(0.99, 0.1),
+        )
+
+    def test_save_mirrors_embedding_into_vector_column(self):
+        self.assertEqual(len(self.omelette.embedding_vec), EMBEDDING_DIMENSIONS)
+        short = MealDBRecipe.objects.create(mealdb_id="v4", title="Short", embedding=[1.0, 0.0])
+        self.assertIsNone(short.embedding_vec)
+
+    @patch("food.utils.meal_fallback.cached_embed_text", return_value=_unit_vector(1.0, 0.0))
+    def test_db_mode_filters_by_tokens_and_orders_by_cosine(self, _embed):
+        with self.assertNumQueries(1):
+            scored = fallback_meals_from_mealdb(["eggs"], top_k=5, similarity_threshold=0.5, mode="db")
+
+        self.assertEqual([m.id for _, m in scored], [self.omelette.id, self.frittata.id])
+        self.assertAlmostEqual(scored[0][0], 1.0, places=5)
+        self.assertAlmostEqual(scored[1][0], 0.6, places=5)
+
+    @patch("food.utils.meal_fallback.cached_embed_text", return_value=_unit_vector(1.0, 0.0))
+    def test_db_mode_applies_the_threshold_outside_the_index_scan(self, _embed):
+        with CaptureQueriesContext(connection) as ctx:
+            scored = fallback_meals_from_mealdb(["eggs"], top_k=5, similarity_threshold=0.7, mode="db")
+
+        self.assertEqual([m.id for _, m in scored], [self.omelette.id])
+        where = ctx.captured_queries[0]["sql"].split(" WHERE ", 1)[1].split(" ORDER BY ", 1)[0]
+        self.assertNotIn("<=>", where)
+
+    @patch("food.utils.meal_fallback.cached_embed_text", return_value=_unit_vector(1.0, 0.0))
+    def test_db_mode_broadens_when_no_token_overlap(self, _embed):
+        scored = fallback_meals_from_mealdb(["tofu"], top_k=1, similarity_threshold=0.5, mode="db")
+        self.assertEqual([m.id for _, m in scored], [self.omelette.id])
+
+
+class _StubAPIError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+
+
+class StubEmbeddingClient:
+    """Mimics client.embeddings.create(); the vector encodes the input length."""
+
+    def __init__(self, fail_first=None, fail_texts=()):
+        self.calls = []
+        self.fail_first = list(fail_first or [])
+        self.fail_texts = set(fail_texts)
+        self.embeddings = self
+
+    def create(self, model, input):
+        if self.fail_first:
+            raise _StubAPIError(self.fail_first.pop(0))
+        if self.fail_texts & set(input):
+            raise _StubAPIError(400)
+        self.calls.append(list(input))
+        data = [SimpleNamespace(index=i, embedding=[float(len(t)), 1.0]) for i, t in enumerate(input)]
+        # the API does not promise ordered results
+        return SimpleNamespace(data=list(reversed(data)))
+
+
+class EmbeddingPipelineTests(APITestCase):
+    def _pipeline(self, client, **kwargs):
+        return EmbeddingPipeline(client, limiter=AdaptiveRateLimiter(rate=1000, max_rate=1000), backoff=0, **kwargs)
+
+    def test_results_come_back_in_submission_order(self):
+        client = StubEmbeddingClient()
+        batches = [(i, ["x" * (i * 3 + j + 1) for j in range(3)]) for i in range(6)]
+
+        results = list(self._pipeline(client, concurrency=3).run(batches))
+
+        self.assertEqual([key for key, _, _ in results], list(range(6)))
+        for (key, texts), (_, vectors, error) in zip(batches, results):
+            self.assertIsNone(error)
+            self.assertEqual([v[0] for v in vectors], [float(len(t)) for t in texts])
+        self.assertEqual(len(client.calls), 6)
+
+    def test_retries_throttled_and_server_errors(self):
+        client = StubEmbeddingClient(fail_first=[429, 503])
+        pipeline = self._pipeline(client)
+
+        self.assertEqual(pipeline.embed_batch(["ab"]), [[2.0, 1.0]])
+        self.assertEqual(pipeline.retries, 2)
+        self.assertEqual(pipeline.requests, 1)
+
+    def test_client_errors_are_not_retried(self):
+        pipeline = self._pipeline(StubEmbeddingClient(fail_first=[400]))
+        with self.assertRaises(_StubAPIError):
+            pipeline.embed_batch(["ab"])
+        self.assertEqual(pipeline.retries, 0)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class EmbedMealsCommandTests(APITestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.settings_override = override_settings(EMBEDDING_STORE_DIR=self.tmp.name)
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+        reset_embedding_store()
+        self.addCleanup(reset_embedding_store)
+
+        self.recipes = [
+            MealDBRecipe.objects.create(mealdb_id=f"c{i}", title="Dish " + "x" * i, ingredients=[{"name": "Rice"}])
+            for i in range(5)
+        ]
+        self.client_stub = StubEmbeddingClient()
+        patcher = patch(
+            "food.management.commands.embed_meals.get_embedding_client", return_value=self.client_stub
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _run(self, *args):
+        call_command("embed_meals", "--request-batch", "2", "--concurrency", "2", *args, stdout=StringIO())
+
+    def test_embeds_in_batched_requests(self):
+        self._run()
+
+        self.assertEqual([len(call) for call in self.client_stub.calls], [2, 2, 1])
+        for recipe in MealDBRecipe.objects.all():
+            self.assertEqual(recipe.embedding, [float(len(_recipe_to_text(recipe))), 1.0])
+        self.assertEqual(len(get_embedding_store()), 5)
+        self.assertFalse((Path(self.tmp.name) / CHECKPOINT_NAME).exists())
+
+    def test_only_missing_flag_is_still_accepted(self):
+        self._run("--only-missing")
+
+        self.assertFalse(MealDBRecipe.objects.filter(embedding__isnull=True).exists())
+
+    def test_force_run_resumes_from_checkpoint(self):
+        with open(Path(self.tmp.name) / CHECKPOINT_NAME, "w", encoding="utf-8") as f:
+            json.dump({"model": "text-embedding-3-small", "last_id": self.recipes[2].id}, f)
+
+        self._run("--force", "--skip-store")
+
+        embedded = set(MealDBRecipe.objects.exclude(embedding__isnull=True).values_list("id", flat=True))
+        self.assertEqual(embedded, {self.recipes[3].id, self.recipes[4].id})
+        self.assertEqual(len(self.client_stub.calls), 1)
+        self.assertFalse((Path(self.tmp.name) / CHECKPOINT_NAME).exists())
+
+    def test_failed_batch_is_retried_after_an_interrupted_force_run(self):
+        self.client_stub.fail_texts = {_recipe_to_text(self.recipes[1])}
+        real_run = EmbeddingPipeline.run
+
+        def interrupted_run(pipeline, batches):
+            for n, result in enumerate(real_run(pipeline, batches)):
+                if n == 3:
+                    raise KeyboardInterrupt
+                yield result
+
+        with patch.object(EmbeddingPipeline, "run", interrupted_run), self.assertRaises(KeyboardInterrupt):
+            call_command(
+                "embed_meals", "--force", "--skip-store", "--request-batch", "1", "--batch-size", "1",
+                "--concurrency", "1", stdout=StringIO(), stderr=StringIO(),
+            )
+        with open(Path(self.tmp.name) / CHECKPOINT_NAME, encoding="utf-8") as f:
+            self.assertEqual(json.load(f)["last_id"], self.recipes[0].id)
+        self.assertIsNone(MealDBRecipe.objects.get(id=self.recipes[1].id).embedding)
+
+        self.client_stub.fail_texts = set()
+        self._run("--force", "--skip-store")
+
+        self.assertFalse(MealDBRecipe.objects.filter(embedding__isnull=True).exists())
+        self.assertFalse((Path(self.tmp.name) / CHECKPOINT_NAME).exists())
+
+    def test_unchanged_recipes_are_served_from_cache(self):
+        self._run("--skip-store")
+        self.assertEqual(len(self.client_stub.calls), 3)
+
+        MealDBRecipe.objects.filter(id=self.recipes[0].id).update(title="Renamed dish")
+        self._run("--force", "--skip-store")
+
+        self.assertEqual(self.client_stub.calls[3:], [[_recipe_to_text(MealDBRecipe.objects.get(id=self.recipes[0].id))]])
+        renamed = MealDBRecipe.objects.get(id=self.recipes[0].id)
+        self.assertEqual(renamed.embedding[0], float(len(_recipe_to_text(renamed))))
+
+
+@override_settings(CACHES=TEST_CACHES)
+class EmbeddingCacheTests(APITestCase):
+    @patch("food.utils.embedding_cache.embed_text", side_effect=lambda text: [float(len(text)), 0.0])
+    def test_repeated_text_hits_cache(self, embed):
+        cache = EmbeddingCache(model="test-model")
+        before = embedding_cache_stats()
+
+        self.assertEqual(cache.embed("Ingredients: eggs"), [17.0, 0.0])
+        self.assertEqual(cache.embed("Ingredients: eggs"), [17.0, 0.0])
+
+        self.assertEqual(embed.call_count, 1)
+        after = embedding_cache_stats()
+        self.assertEqual(after["hits"] - before["hits"], 1)
+        self.assertEqual(after["misses"] - before["misses"], 1)
+
+    def test_entries_are_keyed_by_model(self):
+        EmbeddingCache(model="a").set_many({"rice": [1.0]})
+        self.assertEqual(EmbeddingCache(model="a").get_many(["rice"]), {"rice": [1.0]})
+        self.assertEqual(EmbeddingCache(model="b").get_many(["rice"]), {})
+
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = EmbeddingCache(model="m", max_entries=2, evict_sample_rate=0)
+        cache.set_many({"a": [1.0], "b": [2.0]})
+        EmbeddingCacheEntry.objects.update(last_used_at=date(2020, 1, 1))
+        cache.get_many(["a"])  # touch "a"
+
+        cache.set_many({"c": [3.0]})
+        self.assertEqual(EmbeddingCacheEntry.objects.count(), 3)
+        cache.evict()
+
+        self.assertEqual(set(cache.get_many(["a", "b", "c"])), {"a", "c"})
+
+    def test_warm_hits_and_unsampled_inserts_do_not_write(self):
+        cache = EmbeddingCache(model="m", max_entries=1, evict_sample_rate=0)
+        cache.set_many({"a": [1.0]})
+
+        # one SELECT: the row was used within TOUCH_INTERVAL
+        with self.assertNumQueries(1):
+            self.assertEqual(cache.get_many(["a"]), {"a": [1.0]})
+        # one INSERT: no COUNT(*) / eviction on the write path
+        with self.assertNumQueries(1):
+            cache.set_many({"b": [2.0]})
+
+
+@override_settings(CACHES=TEST_CACHES)
+class ResponseCacheTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(email="respcache@test.com", password="pass1234")
+        self.client.force_authenticate(user=self.user)
+        self.calls = 0
+
+    def _compute(self, payload=None):
+        def compute():
+            self.calls += 1
+            return Response(payload or {"calls": self.calls})
+        return compute
+
+    def test_list_is_served_from_cache_until_a_write_bumps_the_generation(self):
+        FoodLogSys.objects.create(
+            user=self.user, name="Milk", quantity=Decimal("1"), unit="l",
+            category="dairy", storage_type="fridge", expiry_date=date.today() + timedelta(days=3),
+        )
+        first = self.client.get("/api/food-logs/")
+        with self.assertNumQueries(0):
+            second = self.client.get("/api/food-logs/")
+        self.assertEqual(json.loads(second.content), json.loads(first.content))
+
+        self.client.post("/api/food-logs/", {
+            "name": "Eggs", "quantity": "6", "unit": "pcs", "category": "other",
+            "storage_type": "fridge", "expiry_date": str(date.today() + timedelta(days=7)),
+        }, format="json")
+        third = self.client.get("/api/food-logs/")
+        self.assertEqual(third.data["count"], 2)
+
+    def test_expired_entry_is_served_stale_while_another_worker_refreshes(self):
+        cached_response("ns", 1, "/x", self._compute(), ttl=60)
+        key = entry_key("ns", 1, "/x")
+        generation, _, compressed, blob = cache.get(key)
+        cache.set(key, (generation, 0, compressed, blob))  # expired
+        cache.add(f"{key}:lock", 1)
+
+        res = cached_response("ns", 1, "/x", self._compute(), ttl=60)
+
+        self.assertEqual(res.data, {"calls": 1})
+        self.assertEqual(self.calls, 1)
+
+    def test_concurrent_miss_waits_then_recomputes_without_the_lock(self):
+        cache.add(f"{entry_key('ns', 1, '/y')}:lock", 1)
+
+        with patch.object(response_cache, "LOCK_WAIT_SECONDS", 0.1):
+            res = cached_response("ns", 1, "/y", self._compute(), ttl=60)
+
+        self.assertEqual(res.data, {"calls": 1})
+
+    def test_old_generation_is_never_served(self):
+        cached_response("ns", 1, "/z", self._compute(), ttl=60)
+        bump_list_version("ns", 1)
+
+        res = cached_response("ns", 1, "/z", self._compute(), ttl=60)
+
+        self.assertEqual(res.data, {"calls": 2})
+
+    def test_evicted_generation_counter_does_not_revive_old_entries(self):
+        cached_response("ns", 1, "/r", self._compute(), ttl=60)
+        old = get_list_version("ns", 1)
+        cache.delete(_version_key("ns", 1))
+
+        res = cached_response("ns", 1, "/r", self._compute(), ttl=60)
+
+        self.assertEqual(res.data, {"calls": 2})
+        self.assertNotEqual(get_list_version("ns", 1), old)
+
+    def test_errors_are_not_cached(self):
+        def failing():
+            self.calls += 1
+            return Response({"error": "bad"}, status=status.HTTP_400_BAD_REQUEST)
+
+        cached_response("ns", 1, "/e", failing, ttl=60)
+        cached_response("ns", 1, "/e", failing, ttl=60)
+
+        self.assertEqual(self.calls, 2)
+
+    def test_large_payloads_are_compressed(self):
+        data = {"results": [{"name": "rice", "expiry_date": date(2026, 1, 1)}] * 100}
+        compressed, blob = encode_payload(data)
+
+        self.assertTrue(compressed)
+        self.assertEqual(decode_payload(compressed, blob)["results"][0], {"name": "rice", "expiry_date": "2026-01-01"})
+
+    def test_metrics_are_counted_per_namespace(self):
+        cached_response("stats-ns", 1, "/m", self._compute(), ttl=60)
+        cached_response("stats-ns", 1, "/m", self._compute(), ttl=60)
+
+        row = response_cache_stats()["stats-ns"]
+        self.assertEqual((row["misses"], row["hits"], row["recomputes"]), (1, 1, 1))
+        self.assertEqual(row["hit_ratio"], 0.5)
+
+
+FOODCOM_HEADER = ["name", "id", "minutes", "tags", "n_steps", "steps", "description", "ingredients", "n_ingredients"]
+
+
+@override_settings(CACHES=TEST_CACHES)
+class TieredCacheTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        catalog_cache.clear_local()
+        self.user = get_user_model().objects.create_user(email="tiers@test.com", password="pass1234")
+        self.client.force_authenticate(user=self.user)
+        self.calls = 0
+
+    def _compute(self):
+        self.calls += 1
+        return {"calls": self.calls}
+
+    def _tier_row(self, namespace):
+        return tiered_cache_stats().get(namespace, {})
+
+    def test_l1_then_l2_then_compute(self):
+        tc = TieredCache("test:tiers")
+        self.assertEqual(tc.get("a", self._compute), {"calls": 1})
+        self.assertEqual(tc.get("a", self._compute), {"calls": 1})
+
+        tc.clear_local()  # a fresh worker: only the shared tier has it
+        self.assertEqual(tc.get("a", self._compute), {"calls": 1})
+        self.assertEqual(self.calls, 1)
+
+        row = self._tier_row("test:tiers")
+        self.assertEqual((row["l1_hits"], row["l2_hits"], row["misses"]), (1, 1, 1))
+        self.assertEqual(row["hit_ratio"], round(2 / 3, 4))
+
+    def test_other_worker_bump_is_noticed_after_check_interval(self):
+        tc = TieredCache("test:tiers", check_interval=0)
+        tc.get("a", self._compute)
+        # bump made by another process: no in-process listener fires
+        cache.incr(_version_key(CATALOG_NAMESPACE, 0))
+        self.assertEqual(tc.get("a", self._compute), {"calls": 2})
+
+    def test_lru_is_bounded(self):
+        tc = TieredCache("test:tiers", max_entries=2)
+        tc.get("a", self._compute)
+        tc.get("b", self._compute)
+        tc.get("a", self._compute)  # "b" is now least recently used
+        tc.get("c", self._compute)
+        self.assertEqual(list(tc._entries), ["a", "c"])
+
+    def test_none_is_not_cached(self):
+        tc = TieredCache("test:tiers")
+        self.assertIsNone(tc.get("missing", lambda: None))
+        self.assertEqual(tc.get("missing", self._compute), {"calls": 1})
+
+    def test_catalog_version_survives_a_cache_flush_without_repeating(self):
+        before = get_catalog_version()
+        cache.clear()
+        self.assertNotEqual(get_catalog_version(), before)
+
+    def test_mealdb_detail_is_served_from_l1_until_the_recipe_changes(self):
+        recipe = MealDBRecipe.objects.create(mealdb_id="tier-1", title="Soup")
+        self.client.get("/api/mealdb/tier-1/")
+        with self.assertNumQueries(0):
+            res = self.client.get("/api/mealdb/tier-1/")
+        self.assertEqual(res.data["title"], "Soup")
+
+        recipe.title = "Stew"
+        recipe.save()  # post_save bumps the catalog generation
+        self.assertEqual(self.client.get("/api/mealdb/tier-1/").data["title"], "Stew")
+        self.assertEqual(self.client.get("/api/mealdb/nope/").status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_mealdb_random_skips_the_database_when_warm(self):
+        for i in range(3):
+            MealDBRecipe.objects.create(mealdb_id=f"rnd-{i}", title=f"Meal {i}")
+        self.client.get("/api/mealdb/random/?n=3")
+        with self.assertNumQueries(0):
+            res = self.client.get("/api/mealdb/random/?n=3")
+        self.assertEqual(sorted(m["mealdb_id"] for m in res.data), ["rnd-0", "rnd-1", "rnd-2"])
+
+
+def _foodcom_csv(rows):
+    f = tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False, newline="", encoding="utf-8")
+    writer = csv.writer(f)
+    writer.writerow(FOODCOM_HEADER)
+    for i, (name, description, ingredients) in enumerate(rows):
+        writer.writerow([
+            name, i, 10, repr(["easy", "30-minutes-or-less"]), 2, repr(["mix", "bake"]),
+            description, repr(ingredients), len(ingredients),
+        ])
+    f.close()
+    return f.name
+
+
+class FoodComCsvParsingTests(APITestCase):
+    def setUp(self):
+        rows = [
+            (f"recipe {i}", "line one\nline \"two\"" if i % 3 == 0 else "", ["eggs", "mom's flour", "milk"])
+            for i in range(40)
+        ]
+        rows.append(("", "no title", ["salt"]))
+        self.path = _foodcom_csv(rows)
+        self.addCleanup(os.unlink, self.path)
+
+    def test_list_fast_path_matches_literal_eval(self):
+        for literal in ["[]", "['a', 'b']", '["mom\'s", \'x\']', "['a\\'b']", "[1, 2]", "not a list"]:
+            try:
+                expected = ast.literal_eval(literal)
+            except Exception:
+                expected = []
+            self.assertEqual(parse_list(literal), expected if isinstance(expected, list) else [])
+
+    def test_chunks_split_on_record_boundaries(self):
+        fieldnames, start = read_header(self.path)
+        ranges = list(iter_chunk_ranges(self.path, start, 200))
+        self.assertGreater(len(ranges), 5)
+
+        parsed = [parse_chunk(self.path, a, b, fieldnames, COPY_COLUMNS, "2024-01-01T00:00:00") for a, b in ranges]
+        self.assertEqual(sum(c.rows for c in parsed), 40)
+        self.assertEqual(sum(c.skipped for c in parsed), 1)
+
+        rows = list(csv.reader("".join(c.copy_data for c in parsed).splitlines(keepends=True)))
+        self.assertEqual([r[0] for r in rows], [f"recipe {i}" for i in range(40)])
+        self.assertEqual(rows[0][1], "line one\nline \"two\"")
+        self.assertEqual(json.loads(rows[0][COPY_COLUMNS.index("ingredient_tokens")]), ["egg", "milk", "mom s flour"])
+
+    def test_command_copies_rows_and_resumes(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "CREATE TABLE foodcom_import_test (id serial PRIMARY KEY, title varchar(255) NOT NULL, "
+                "description text NOT NULL, tags jsonb, ingredients jsonb, ingredient_tokens jsonb, "
+                "steps jsonb, n_ingredients integer, n_steps integer, source varchar(50) NOT NULL, "
+                "created_at timestamptz, updated_at timestamptz)"
+            )
+
+        def count():
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT count(*) FROM foodcom_import_test")
+                return cursor.fetchone()[0]
+
+        args = [self.path, "--table", "foodcom_import_test", "--workers", "2", "--chunk-mb", "0.0002"]
+        call_command("import_foodcom_recipes", *args, "--limit", "25", stdout=StringIO())
+        self.assertEqual(count(), 25)
+
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT description, n_steps, ingredient_tokens FROM foodcom_import_test ORDER BY id LIMIT 2")
+            first, second = cursor.fetchall()
+        self.assertEqual(first[0], "line one\nline \"two\"")
+        self.assertEqual(second[0], "")
+        self.assertEqual(first[1], 2)
+
+        # pretend an earlier run committed the first chunk and was interrupted
+        fieldnames, start = read_header(self.path)
+        first_start, first_end = next(iter_chunk_ranges(self.path, start, int(0.0002 * 1024 * 1024)))
+        first_rows = parse_chunk(self.path, first_start, first_end, fieldnames, COPY_COLUMNS, "").rows
+        with open(f"{self.path}.progress.json", "w", encoding="utf-8") as f:
+            json.dump({"offset": first_end, "size": os.path.getsize(self.path)}, f)
+
+        call_command("import_foodcom_recipes", *args, "--resume", stdout=StringIO())
+        self.assertEqual(count(), 25 + 40 - first_rows)
+        self.assertFalse(os.path.exists(f"{self.path}.progress.json"))
+
+    def test_missing_table_is_reported(self):
+        with self.assertRaises(CommandError):
+            call_command("import_foodcom_recipes", self.path, "--table", "no_such_table", stdout=StringIO())
+
+
+GOLDEN_NORMALIZE_PATH = Path(__file__).resolve().parent / "testdata" / "mealdb_ingredients_normalized.json"
+
+
+class IngredientNormalizerGoldenTests(APITestCase):
+    """
+    testdata/mealdb_ingredients_normalized.json holds [raw, project.utils, food.utils]
+    outputs recorded from the original regex-per-descriptor implementations.
+    """
+
+    def setUp(self):
+        with open(GOLDEN_NORMALIZE_PATH, encoding="utf-8") as f:
+            self.golden = json.load(f)
+
+    def test_project_normalizer_matches_golden_file(self):
+        for raw, expected, _ in self.golden:
+            project_normalize.normalize_ingredient_name.cache_clear()
+            self.assertEqual(project_normalize.normalize_ingredient_name(raw), expected, raw)
+
+    def test_food_normalizer_matches_golden_file(self):
+        for raw, _, expected in self.golden:
+            food_normalize.normalize_ingredient_name.cache_clear()
+            self.assertEqual(food_normalize.normalize_ingredient_name(raw), expected, raw)
+
+    def test_normalize_many_matches_single_calls(self):
+        raws = [row[0] for row in self.golden] * 2
+        self.assertEqual(project_normalize.normalize_many(raws), [row[1] for row in self.golden] * 2)
+        self.assertEqual(food_normalize.normalize_many(raws), [row[2] for row in self.golden] * 2)
@@ -1,4 +1,5 @@
 import hashlib
+import time
 from django.core.cache import cache
 def _hash_key(*parts: str) -> str:
     joined = "|".join([p or "" for p in parts])
@@ -7,11 +8,20 @@ def _hash_key(*parts: str) -> str:
 def _version_key(namespace: str, user_id: int) -> str:
     return f"{namespace}:list:v:{user_id}"
 
+def seed_version(key: str) -> int:
+    """
+    Start a missing counter from a time-based value: entries built against an
+    evicted or flushed counter must never match the restarted one.
+    """
+    cache.add(key, time.time_ns() // 1000, timeout=None)
+    v = cache.get(key)
+    return int(v) if v is not None else time.time_ns() // 1000
+
 def get_list_version(namespace: str, user_id: int) -> int:
-    v = cache.get(_version_key(namespace, user_id))
+    key = _version_key(namespace, user_id)
+    v = cache.get(key)
     if v is None:
-        v = 1
-        cache.set(_version_key(namespace, user_id), v, timeout = None)
+        return seed_version(key)
     return int(v)
 
 def bump_list_version(namespace: str, user_id:int) -> None:
@@ -19,8 +29,8 @@ def bump_list_version(namespace: str, user_id:int) -> None:
     try:
         cache.incr(key)
     except Exception:
-        current = cache.get(key) or 1
-        cache.set(key, int(current) + 1, timeout = None)
+        # missing counter: a fresh seed already differs from every earlier value
+        seed_version(key)
 
 def detail_key(namespace: str, user_id: int, pk: int) -> str:
     return f"{namespace}:detail:{user_id}:{pk}"
@@ -35,3 +45,55 @@ def invalidate_cache(namespace, user_id: int, detail_id:int | None=None) -> None
     bump_list_version(namespace, user_id)
     if detail_id is not None:
         cache.delete(detail_key(namespace, user_id, detail_id))
+
+# global MealDB catalog version (user_id=0); bumped whenever recipes change
+CATALOG_NAMESPACE = "mealdb:catalog"
+# in-process listeners told about a bump right away (other workers notice via the shared counter)
+_catalog_listeners = []
+
+def get_catalog_version() -> int:
+    # seeded like every list version, so per-process copies built against a flushed counter never match
+    return get_list_version(CATALOG_NAMESPACE, 0)
+
+def bump_catalog_version() -> None:
+    get_catalog_version()
+    bump_list_version(CATALOG_NAMESPACE, 0)
+    for listener in _catalog_listeners:
+        listener()
+
+def on_catalog_bump(listener) -> None:
+    _catalog_listeners.append(listener)
+
+# bumped whenever embed_meals publishes a new embedding store
+EMBEDDING_NAMESPACE = "mealdb:embeddings"
+
+def get_embedding_version() -> int:
+    return get_list_version(EMBEDDING_NAMESPACE, 0)
+
+def bump_embedding_version() -> None:
+    bump_list_version(EMBEDDING_NAMESPACE, 0)
+
+# per-user inventory version; bumped on every FoodLogSys write (see food.signals)
+FOODLOG_NAMESPACE = "foodlog"
+_foodlog_listeners = []
+
+def get_foodlog_version(user_id: int) -> int:
+    return get_list_version(FOODLOG_NAMESPACE, user_id)
+
+def bump_foodlog_version(user_id: int) -> None:
+    bump_list_version(FOODLOG_NAMESPACE, user_id)
+    for listener in _foodlog_listeners:
+        listener(user_id)
+
+def on_foodlog_bump(listener) -> None:
+    """listener(user_id) runs after every bump_foodlog_version (e.g. to refresh derived data)."""
+    _foodlog_listeners.append(listener)
+
+# per-plan version (the user_id slot holds the plan id); bumped on replace, skip, confirm and delete
+MEAL_PLAN_NAMESPACE = "mealplan"
+
+def get_meal_plan_version(plan_id: int) -> int:
+    return get_list_version(MEAL_PLAN_NAMESPACE, plan_id)
+
+def bump_meal_plan_version(plan_id: int) -> None:
+    bump_list_version(MEAL_PLAN_NAMESPACE, plan_id)
@@ -0,0 +1,122 @@
+"""
+Persistent embedding cache keyed by (model, sha256(text)).
+
+Rows live in EmbeddingCacheEntry; hits refresh `last_used_at` (at most once per
+TOUCH_INTERVAL, so warm reads stay read-only) and the table is trimmed back to
+settings.EMBEDDING_CACHE_MAX_ENTRIES least-recently-used rows by evict(), which
+embed_meals runs after each run and inserts run on a sampled fraction of calls.
+Hit/miss counters are kept in the shared Django cache so every worker reports
+the same numbers.
+"""
+import hashlib
+import random
+from datetime import timedelta
+from typing import Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from food.models import EmbeddingCacheEntry
+from food.utils.embeddings import EMBEDDING_MODEL, embed_text
+
+STATS_PREFIX = "embedding_cache:stats"
+# LRU order only needs to be this precise; fresher hits are not written back
+TOUCH_INTERVAL = timedelta(hours=1)
+# share of set_many() calls that also trim the table (evict() counts every row)
+EVICT_SAMPLE_RATE = 0.01
+
+
+def text_digest(text: str) -> str:
+    return hashlib.sha256((text or "").encode("utf-8")).hexdigest()
+
+
+def _incr(name: str, delta: int) -> None:
+    if delta <= 0:
+        return
+    key = f"{STATS_PREFIX}:{name}"
+    try:
+        cache.incr(key, delta)
+    except ValueError:
+        # first use: add() keeps concurrent workers from overwriting each other
+        if not cache.add(key, delta, timeout=None):
+            cache.incr(key, delta)
+
+
+class EmbeddingCache:
+    def __init__(
+        self,
+        model: str = EMBEDDING_MODEL,
+        max_entries: Optional[int] = None,
+        evict_sample_rate: float = EVICT_SAMPLE_RATE,
+    ):
+        self.model = model
+        self.max_entries = max_entries if max_entries is not None else settings.EMBEDDING_CACHE_MAX_ENTRIES
+        self.evict_sample_rate = evict_sample_rate
+
+    def get_many(self, texts: Iterable[str]) -> Dict[str, List[float]]:
+        """Return {text: embedding} for every cached text (one query, plus an LRU touch for stale rows)."""
+        by_hash = {text_digest(t): t for t in texts}
+        if not by_hash:
+            return {}
+
+        rows = list(
+            EmbeddingCacheEntry.objects.filter(model=self.model, text_hash__in=list(by_hash))
+            .values_list("id", "text_hash", "embedding", "last_used_at")
+        )
+        now = timezone.now()
+        stale = [r[0] for r in rows if r[3] < now - TOUCH_INTERVAL]
+        if stale:
+            EmbeddingCacheEntry.objects.filter(id__in=stale).update(last_used_at=now)
+
+        _incr("hits", len(rows))
+        _incr("misses", len(by_hash) - len(rows))
+        return {by_hash[h]: emb for _, h, emb, _ in rows}
+
+    def set_many(self, embeddings: Dict[str, List[float]]) -> None:
+        entries = [
+            EmbeddingCacheEntry(model=self.model, text_hash=text_digest(t), embedding=emb)
+            for t, emb in embeddings.items()
+            if emb
+        ]
+        if not entries:
+            return
+        # a concurrent writer may have cached the same text already
+        EmbeddingCacheEntry.objects.bulk_create(entries, ignore_conflicts=True)
+        if self.evict_sample_rate and random.random() < self.evict_sample_rate:
+            self.evict()
+
+    def evict(self) -> int:
+        """Trim the table to max_entries, dropping the least recently used rows."""
+        if not self.max_entries or EmbeddingCacheEntry.objects.count() <= self.max_entries:
+            return 0
+        stale = (
+            EmbeddingCacheEntry.objects.order_by("-last_used_at", "-id")
+            .values_list("id", flat=True)[self.max_entries:]
+        )
+        deleted, _ = EmbeddingCacheEntry.objects.filter(id__in=list(stale)).delete()
+        _incr("evictions", deleted)
+        return deleted
+
+    def embed(self, text: str) -> List[float]:
+        """embed_text() behind the cache."""
+        found = self.get_many([text])
+        if text in found:
+            return found[text]
+        emb = embed_text(text)
+        self.set_many({text: emb})
+        return emb
+
+
+def embedding_cache_stats() -> Dict[str, float]:
+    names = ("hits", "misses", "evictions")
+    values = cache.get_many([f"{STATS_PREFIX}:{n}" for n in names])
+    stats = {n: int(values.get(f"{STATS_PREFIX}:{n}") or 0) for n in names}
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_ratio"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+    stats["entries"] = EmbeddingCacheEntry.objects.count()
+    return stats
+
+
+def cached_embed_text(text: str) -> List[float]:
+    return EmbeddingCache().embed(text)
@@ -0,0 +1,154 @@
+"""
+Batched, concurrent embeddings client used by `manage.py embed_meals`.
+
+Each request carries many inputs (the embeddings API accepts lists), a bounded
+number of requests are in flight at once, and an AIMD rate limiter backs off on
+429s and slowly speeds up again while requests succeed. Transient failures
+(429, 5xx, connection errors) are retried with exponential backoff.
+"""
+import logging
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from openai import APIConnectionError
+
+from food.utils.embeddings import EMBEDDING_MODEL
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS = {408, 409, 429}
+
+
+def is_retryable(exc: Exception) -> bool:
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        return isinstance(exc, (APIConnectionError, ConnectionError, TimeoutError))
+    return status in RETRYABLE_STATUS or status >= 500
+
+
+def retry_after_seconds(exc: Exception) -> Optional[float]:
+    headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+    try:
+        value = headers.get("retry-after")
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+class AdaptiveRateLimiter:
+    """
+    Request pacing shared by every worker thread: +increase req/s after each
+    success, halved on every 429 (and paused for Retry-After when given).
+    """
+
+    def __init__(self, rate: float = 5.0, min_rate: float = 0.2, max_rate: float = 50.0, increase: float = 0.5):
+        self.min_rate = min_rate
+        self.max_rate = max(max_rate, min_rate)
+        self.rate = min(max(rate, min_rate), self.max_rate)
+        self.increase = increase
+        self._next_at = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_at)
+            self._next_at = start + 1.0 / self.rate
+        if start > now:
+            time.sleep(start - now)
+
+    def on_success(self) -> None:
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def on_throttle(self, retry_after: Optional[float] = None) -> None:
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+            if retry_after:
+                self._next_at = max(self._next_at, time.monotonic() + retry_after)
+
+
+class EmbeddingPipeline:
+    """
+    Embed batches of texts with at most `concurrency` requests in flight.
+
+    `client` only needs `client.embeddings.create(model=..., input=[...])`
+    returning `.data` items with `.index` and `.embedding`, so tests can pass a stub.
+    """
+
+    def __init__(
+        self,
+        client,
+        model: str = EMBEDDING_MODEL,
+        concurrency: int = 4,
+        limiter: Optional[AdaptiveRateLimiter] = None,
+        max_retries: int = 5,
+        backoff: float = 1.0,
+    ):
+        self.client = client
+        self.model = model
+        self.concurrency = max(1, concurrency)
+        self.limiter = limiter or AdaptiveRateLimiter()
+        self.max_retries = max_retries
+        self.backoff = backoff
+
+        self.requests = 0
+        self.retries = 0
+        self._stats_lock = threading.Lock()
+
+    def embed_batch(self, texts: Sequence[str]) -> List[List[float]]:
+        attempt = 0
+        while True:
+            self.limiter.acquire()
+            try:
+                response = self.client.embeddings.create(model=self.model, input=list(texts))
+            except Exception as exc:
+                if attempt >= self.max_retries or not is_retryable(exc):
+                    raise
+                retry_after = retry_after_seconds(exc)
+                if getattr(exc, "status_code", None) == 429:
+                    self.limiter.on_throttle(retry_after)
+                delay = retry_after or self.backoff * (2 ** attempt) * (0.5 + random.random() / 2)
+                attempt += 1
+                with self._stats_lock:
+                    self.retries += 1
+                logger.warning(f"EmbeddingPipeline: retry {attempt}/{self.max_retries} in {delay:.1f}s after {exc!r}")
+                time.sleep(delay)
+                continue
+
+            self.limiter.on_success()
+            with self._stats_lock:
+                self.requests += 1
+
+            data = sorted(response.data, key=lambda d: d.index)
+            if len(data) != len(texts):
+                raise ValueError(f"expected {len(texts)} embeddings, got {len(data)}")
+            return [d.embedding for d in data]
+
+    def run(
+        self, batches: Iterable[Tuple[Any, Sequence[str]]]
+    ) -> Iterator[Tuple[Any, Optional[List[List[float]]], Optional[Exception]]]:
+        """
+        Yield (key, vectors, error) per batch, in submission order.
+        Results are consumed in order so callers can checkpoint a contiguous prefix.
+        """
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="embed") as pool:
+            pending = deque()
+            for key, texts in batches:
+                pending.append((key, pool.submit(self.embed_batch, texts)))
+                # keep every worker busy while the head of the queue is awaited
+                if len(pending) >= self.concurrency * 2:
+                    yield self._collect(*pending.popleft())
+            while pending:
+                yield self._collect(*pending.popleft())
+
+    @staticmethod
+    def _collect(key, future):
+        try:
+            return key, future.result(), None
+        except Exception as exc:
+            return key, None, exc
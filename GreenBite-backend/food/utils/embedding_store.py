@@ -0,0 +1,223 @@
+"""
+Recipe embedding store: a contiguous float32 matrix of L2-normalized
+MealDBRecipe embeddings plus the matching id array, written by
+`manage.py embed_meals` and memory-mapped by every worker.
+
+Layout inside settings.EMBEDDING_STORE_DIR:
+    manifest.json             -> {"generation", "matrix", "ids", "count", "dim"}
+    recipes-g<N>.npy          -> float32 [count, dim], rows pre-normalized
+    recipe-ids-g<N>.npy       -> int64 [count]
+"""
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+from django.conf import settings
+
+from food.utils.caching import bump_embedding_version, get_embedding_version
+from recipes.models import MealDBRecipe
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "manifest.json"
+
+
+def _store_dir() -> Path:
+    return Path(settings.EMBEDDING_STORE_DIR)
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class EmbeddingStore:
+    def __init__(self, ids: np.ndarray, matrix: np.ndarray, generation: int = 0):
+        self.ids = ids
+        self.matrix = matrix
+        self.generation = generation
+        self._row_of = {int(rid): row for row, rid in enumerate(ids)}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def load(cls, directory: Optional[Path] = None) -> Optional["EmbeddingStore"]:
+        directory = Path(directory or _store_dir())
+        manifest_path = directory / MANIFEST_NAME
+        if not manifest_path.exists():
+            return None
+
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+
+        matrix = np.load(directory / manifest["matrix"], mmap_mode="r")
+        ids = np.load(directory / manifest["ids"])
+        logger.info(
+            f"EmbeddingStore: loaded generation {manifest['generation']} "
+            f"({len(ids)} x {matrix.shape[1] if matrix.ndim == 2 else 0})"
+        )
+        return cls(ids=ids, matrix=matrix, generation=int(manifest["generation"]))
+
+    def search(
+        self,
+        query: Sequence[float],
+        top_k: int = 4,
+        threshold: Optional[float] = None,
+        restrict_ids: Optional[Sequence[int]] = None,
+    ) -> List[Tuple[int, float]]:
+        """
+        Cosine top-k as one matrix-vector product.
+        Returns [(recipe_id, score), ...] best first.
+        """
+        if top_k <= 0 or not len(self):
+            return []
+
+        q = np.asarray(query, dtype=np.float32)
+        norm = np.linalg.norm(q)
+        if norm == 0 or q.shape[0] != self.matrix.shape[1]:
+            return []
+        q = q / norm
+
+        if restrict_ids is not None:
+            rows = np.fromiter(
+                (self._row_of[i] for i in restrict_ids if i in self._row_of), dtype=np.int64
+            )
+            if not len(rows):
+                return []
+            scores = self.matrix[rows] @ q
+        else:
+            rows = None
+            scores = self.matrix @ q
+
+        keep = np.arange(len(scores))
+        if threshold is not None:
+            keep = np.nonzero(scores >= threshold)[0]
+        if not len(keep):
+            return []
+
+        if len(keep) > top_k:
+            part = np.argpartition(-scores[keep], top_k - 1)[:top_k]
+            keep = keep[part]
+        keep = keep[np.argsort(-scores[keep], kind="stable")]
+
+        row_idx = rows[keep] if rows is not None else keep
+        return [(int(self.ids[r]), float(scores[k])) for r, k in zip(row_idx, keep)]
+
+
+def build_embedding_store(directory: Optional[Path] = None) -> EmbeddingStore:
+    """
+    Snapshot every embedded MealDBRecipe into a new store generation and
+    publish it (manifest swap + version bump).
+    """
+    directory = Path(directory or _store_dir())
+    directory.mkdir(parents=True, exist_ok=True)
+
+    ids, vectors = [], []
+    dim = None
+    qs = MealDBRecipe.objects.exclude(embedding__isnull=True).order_by("id").values_list("id", "embedding")
+    for rid, emb in qs.iterator(chunk_size=500):
+        if not emb:
+            continue
+        if dim is None:
+            dim = len(emb)
+        if len(emb) != dim:
+            logger.warning(f"EmbeddingStore: skipping recipe {rid} (dim {len(emb)} != {dim})")
+            continue
+        ids.append(rid)
+        vectors.append(emb)
+
+    matrix = np.ascontiguousarray(
+        _normalize_rows(np.asarray(vectors, dtype=np.float32).reshape(len(vectors), dim or 0))
+    )
+    id_array = np.asarray(ids, dtype=np.int64)
+
+    previous = _read_generation(directory)
+    generation = previous + 1
+    matrix_name = f"recipes-g{generation}.npy"
+    ids_name = f"recipe-ids-g{generation}.npy"
+
+    _atomic_save(directory / matrix_name, matrix)
+    _atomic_save(directory / ids_name, id_array)
+    _atomic_write_json(directory / MANIFEST_NAME, {
+        "generation": generation,
+        "matrix": matrix_name,
+        "ids": ids_name,
+        "count": int(len(id_array)),
+        "dim": int(dim or 0),
+    })
+    _remove_old_generations(directory, keep={generation, previous})
+
+    bump_embedding_version()
+    return EmbeddingStore(ids=id_array, matrix=matrix, generation=generation)
+
+
+def _read_generation(directory: Path) -> int:
+    try:
+        with open(directory / MANIFEST_NAME, "r", encoding="utf-8") as f:
+            return int(json.load(f).get("generation", 0))
+    except (OSError, ValueError):
+        return 0
+
+
+def _atomic_save(path: Path, array: np.ndarray) -> None:
+    tmp = path.with_suffix(".tmp.npy")
+    np.save(tmp, array)
+    os.replace(tmp, path)
+
+
+def _atomic_write_json(path: Path, data: dict) -> None:
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+def _remove_old_generations(directory: Path, keep: set) -> None:
+    # workers still mapping the previous generation keep it alive; older ones go
+    for path in directory.glob("recipe*-g*.npy"):
+        try:
+            gen = int(path.stem.rsplit("-g", 1)[1])
+        except (IndexError, ValueError):
+            continue
+        if gen not in keep:
+            path.unlink(missing_ok=True)
+
+
+_UNSET = object()
+_store = _UNSET
+_store_version = None
+_store_lock = threading.Lock()
+
+
+def get_embedding_store() -> Optional[EmbeddingStore]:
+    """
+    Lazily loaded store shared by every request in this worker.
+    Reloaded only when embed_meals publishes a new generation.
+    """
+    global _store, _store_version
+    version = get_embedding_version()
+    if _store is not _UNSET and _store_version == version:
+        return _store
+
+    with _store_lock:
+        if _store is _UNSET or _store_version != version:
+            try:
+                _store = EmbeddingStore.load()
+            except Exception:
+                logger.exception("EmbeddingStore: failed to load; falling back to DB embeddings")
+                _store = None
+            _store_version = version
+        return _store
+
+
+def reset_embedding_store() -> None:
+    global _store, _store_version
+    with _store_lock:
+        _store = _UNSET
+        _store_version = None
@@ -1,11 +1,18 @@
 from openai import OpenAI
 
+EMBEDDING_MODEL = "text-embedding-3-small"
+
 client = OpenAI()
 
+
+def get_embedding_client():
+    return client
+
+
 def embed_text(text: str) -> list[float]:
 
     response = client.embeddings.create(
-        model="text-embedding-3-small",
+        model=EMBEDDING_MODEL,
         input=text
     )
     return response.data[0].embedding
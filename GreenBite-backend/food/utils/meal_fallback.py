@@ -1,44 +1,102 @@
-from recipes.models import MealDBRecipe
-from food.utils.embeddings import embed_text
-from food.utils.similarity import cosine_similarity
+from django.conf import settings
+from pgvector.django import CosineDistance
 
-from recipes.models import MealDBRecipe
-from food.utils.embeddings import embed_text
+from recipes.models import EMBEDDING_DIMENSIONS, MealDBRecipe
+from food.utils.embedding_cache import cached_embed_text
+from food.utils.embedding_store import get_embedding_store
 from food.utils.similarity import cosine_similarity
-from food.utils.normalize import normalize_ingredient_name
+from food.utils.normalize import normalize_many
+from meal_plans.services.recipe_index import get_recipe_index
+
 
 def fallback_meals_from_mealdb(
     ingredients: list[str],
     top_k: int = 4,
     similarity_threshold: float = 0.60,
+    mode: str | None = None,
 ):
     """
     Semantic fallback: find closest MealDB recipes using embeddings.
+
+    mode="store" (default) ranks with the memory-mapped embedding store,
+    mode="db" pushes the token filter and cosine ordering into Postgres (pgvector).
     """
+    mode = mode or settings.MEAL_FALLBACK_SEARCH
 
     # Normalize ingredient names
-    norms = [
-        normalize_ingredient_name(i)
-        for i in ingredients
-        if normalize_ingredient_name(i)
-    ]
+    norms = [n for n in normalize_many(ingredients) if n]
+
+    if mode == "db":
+        query_embedding = cached_embed_text("Ingredients: " + ", ".join(norms or ingredients))
+        scored = _nearest_in_db(query_embedding, norms, top_k, similarity_threshold)
+        if not scored and norms:
+            # If nothing matched, broaden search to every embedded meal
+            scored = _nearest_in_db(query_embedding, [], top_k, similarity_threshold)
+        if not scored:
+            qs_any = MealDBRecipe.objects.all().order_by("-id")[:top_k]
+            return [(0.0, m) for m in qs_any]
+        return scored
+
+    # Stage 1 — keyword overlap filter (in-memory token index)
+    candidate_ids = get_recipe_index().candidate_ids(norms) if norms else []
+
+    # Stage 2 — semantic ranking
+    query_text = "Ingredients: " + ", ".join(norms or ingredients)
+    query_embedding = cached_embed_text(query_text)
+
+    store = get_embedding_store()
+    if store is not None and len(store):
+        hits = store.search(
+            query_embedding,
+            top_k=top_k,
+            threshold=similarity_threshold,
+            restrict_ids=candidate_ids or None,
+        )
+        if not hits and candidate_ids:
+            # If nothing matched, broaden search to every embedded meal
+            hits = store.search(query_embedding, top_k=top_k, threshold=similarity_threshold)
+
+        meals = MealDBRecipe.objects.in_bulk([rid for rid, _ in hits])
+        scored = [(score, meals[rid]) for rid, score in hits if rid in meals]
+    else:
+        scored = _scan_db_embeddings(query_embedding, candidate_ids, similarity_threshold)
+
+    # FINAL SAFETY NET: if still nothing, return any meals (even without embeddings)
+    if not scored:
+        qs_any = MealDBRecipe.objects.all().order_by("-id")[:top_k]
+        return [(0.0, m) for m in qs_any]
+
+    return scored[:top_k]   # [(score, MealDBRecipe), ...]
 
-    # Stage 1 — keyword overlap filter
-    qs = MealDBRecipe.objects.exclude(embedding__isnull=True)
 
-    if norms:
-        qs = qs.filter(ingredients_norm__overlap=norms)
+def _nearest_in_db(query_embedding, tokens, top_k, similarity_threshold):
+    """
+    One SQL statement: jsonb ?| token overlap (GIN) + ORDER BY cosine distance (HNSW).
+
+    The similarity threshold is applied to the k rows in Python: a distance
+    predicate in the WHERE clause keeps Postgres off the HNSW index.
+    """
+    if not query_embedding or len(query_embedding) != EMBEDDING_DIMENSIONS:
+        return []
+
+    qs = MealDBRecipe.objects.filter(embedding_vec__isnull=False)
+    if tokens:
+        qs = qs.filter(ingredient_tokens__has_any_keys=list(tokens))
+
+    qs = qs.annotate(distance=CosineDistance("embedding_vec", query_embedding)).order_by("distance")[:top_k]
+    return [(1 - meal.distance, meal) for meal in qs if 1 - meal.distance >= similarity_threshold]
 
-    candidates = list(qs[:800])  # safety cap
+
+def _scan_db_embeddings(query_embedding, candidate_ids, similarity_threshold):
+    """Slow path used until embed_meals has written an embedding store."""
+    qs = MealDBRecipe.objects.exclude(embedding__isnull=True)
+
+    candidates = list(qs.filter(id__in=candidate_ids)[:800]) if candidate_ids else []
 
     # If nothing matched, broaden search
     if not candidates:
         # Try any embedded meals
-        candidates = list(MealDBRecipe.objects.exclude(embedding__isnull=True)[:800])
-
-    # Stage 2 — semantic ranking
-    query_text = "Ingredients: " + ", ".join(norms or ingredients)
-    query_embedding = embed_text(query_text)
+        candidates = list(qs[:800])
 
     scored = []
     for meal in candidates:
@@ -47,10 +105,4 @@ def fallback_meals_from_mealdb(
             scored.append((score, meal))
 
     scored.sort(key=lambda x: x[0], reverse=True)
-
-    # FINAL SAFETY NET: if still nothing, return any meals (even without embeddings)
-    if not scored:
-        qs_any = MealDBRecipe.objects.all().order_by("-id")[:top_k]
-        return [(0.0, m) for m in qs_any]
-
-    return scored[:top_k]   # [(score, MealDBRecipe), ...]
+    return scored
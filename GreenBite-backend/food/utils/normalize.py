@@ -1,6 +1,57 @@
 import re
+from functools import lru_cache
 
+# Removed in this order; earlier entries win when two matches overlap
+# ("reduced fat free milk" drops "fat free" and keeps "reduced").
+DESCRIPTORS = (
+    "fresh", "dried", "frozen", "canned", "raw", "cooked",
+    "chopped", "diced", "sliced", "minced", "grated",
+    "whole", "crushed", "ground", "powdered",
+    "extra virgin", "virgin", "organic", "natural",
+    "large", "small", "medium", "ripe", "unripe",
+    "boneless", "skinless", "seedless",
+    "low fat", "full fat", "fat free", "reduced fat",
+)
+_PRIORITY = {d: i for i, d in enumerate(DESCRIPTORS)}
 
+# One scan finds every descriptor occurrence, overlapping ones included
+# (the lookahead is zero-width, so each word start is tried).
+_DESCRIPTOR_RE = re.compile(r"\b(?=(" + "|".join(re.escape(d) for d in DESCRIPTORS) + r")\b)")
+_PARENS_RE = re.compile(r"\([^)]*\)")
+_MEASURE_RE = re.compile(r"\d+\s*(kg|g|lb|oz|ml|l|cup|tbsp|tsp|teaspoon|tablespoon)?")
+_SPECIAL_RE = re.compile(r"[^a-z\s-]")
+_PLAIN_RE = re.compile(r"[a-z\s-]*")
+
+NORMALIZE_CACHE_SIZE = 50000
+
+
+def _strip_descriptors(name: str) -> str:
+    """
+    Same result as running re.sub(r"\bdescriptor\b", "", name) for each
+    descriptor in order: removals never create new matches, they only destroy
+    later ones that overlap, so keeping the non-overlapping matches in priority
+    order reproduces the sequential passes in a single scan.
+    """
+    found = [(m.start(), m.start() + len(m.group(1)), m.group(1)) for m in _DESCRIPTOR_RE.finditer(name)]
+    if not found:
+        return name
+
+    found.sort(key=lambda m: (_PRIORITY[m[2]], m[0]))
+    kept = []
+    for start, end, _ in found:
+        if all(end <= k_start or start >= k_end for k_start, k_end in kept):
+            kept.append((start, end))
+    kept.sort()
+
+    parts, pos = [], 0
+    for start, end in kept:
+        parts.append(name[pos:start])
+        pos = end
+    parts.append(name[pos:])
+    return "".join(parts)
+
+
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
 def normalize_ingredient_name(name: str) -> str:
     """
     Normalize an ingredient name for consistent matching.
@@ -13,25 +64,8 @@ def normalize_ingredient_name(name: str) -> str:
     if not name:
         return ""
     
-    # Convert to lowercase
-    name = name.lower().strip()
-    
-    # Remove common descriptive words
-    descriptors = [
-        "fresh", "dried", "frozen", "canned", "raw", "cooked",
-        "chopped", "diced", "sliced", "minced", "grated",
-        "whole", "crushed", "ground", "powdered",
-        "extra virgin", "virgin", "organic", "natural",
-        "large", "small", "medium", "ripe", "unripe",
-        "boneless", "skinless", "seedless",
-        "low fat", "full fat", "fat free", "reduced fat"
-    ]
-    
-    for descriptor in descriptors:
-        name = re.sub(r'\b' + descriptor + r'\b', '', name)
-    
-    # Remove extra whitespace
-    name = ' '.join(name.split())
+    # Convert to lowercase, drop descriptive words, collapse whitespace
+    name = ' '.join(_strip_descriptors(name.lower().strip()).split())
     
     # Remove plural 's' at the end (simple pluralization)
     # Handle common cases like "tomatoes" -> "tomato"
@@ -44,14 +78,18 @@ def normalize_ingredient_name(name: str) -> str:
         if not name.endswith(('ss', 'us', 'is')):
             name = name[:-1]
     
+    # Already plain letters/spaces/hyphens: the passes below are no-ops
+    if _PLAIN_RE.fullmatch(name):
+        return ' '.join(name.split())
+
     # Remove parentheses and their contents
-    name = re.sub(r'\([^)]*\)', '', name)
+    name = _PARENS_RE.sub('', name)
     
     # Remove numbers and measurements
-    name = re.sub(r'\d+\s*(kg|g|lb|oz|ml|l|cup|tbsp|tsp|teaspoon|tablespoon)?', '', name)
+    name = _MEASURE_RE.sub('', name)
     
     # Remove special characters except spaces and hyphens
-    name = re.sub(r'[^a-z\s-]', '', name)
+    name = _SPECIAL_RE.sub('', name)
     
     # Final cleanup
     name = ' '.join(name.split()).strip()
@@ -59,6 +97,11 @@ def normalize_ingredient_name(name: str) -> str:
     return name
 
 
+def normalize_many(names) -> list[str]:
+    """Normalize a batch of names; repeated names are computed once."""
+    return [normalize_ingredient_name(n) for n in names]
+
+
 def normalize_ingredients_list(ingredients: list) -> list[str]:
     """
     Normalize a list of ingredients.
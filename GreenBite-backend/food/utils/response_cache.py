@@ -0,0 +1,202 @@
+"""
+Generational response cache for the list/detail API views.
+
+An entry lives under one key per (namespace, user, request path) and carries
+the generation it was built under. A read fetches the generation counter and
+the entry with a single get_many(); bump_list_version() (and every helper built
+on it) therefore invalidates all of a user's entries at once, and the next
+recompute overwrites the old entry instead of leaving it behind until its TTL.
+
+Misses are coalesced: one worker takes a short add() lock and recomputes,
+the others serve the expired entry of the same generation while it does
+(stale-while-revalidate) or wait briefly for the fresh one. Payloads are
+stored as JSON, zlib-compressed above COMPRESS_MIN_BYTES.
+
+Hit/miss/stale/wait/recompute counters are kept per namespace in the shared
+cache (flushed in batches) and reported by `manage.py cache_stats`.
+"""
+import json
+import logging
+import threading
+import time
+import zlib
+from collections import Counter
+from typing import Callable, Dict, Optional, Tuple
+
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from rest_framework import status
+from rest_framework.response import Response
+
+from food.utils.caching import _hash_key, _version_key, seed_version
+
+logger = logging.getLogger(__name__)
+
+COMPRESS_MIN_BYTES = 1024
+# an expired entry stays readable this long so it can be served while one worker refreshes it
+STALE_GRACE_SECONDS = 60
+LOCK_TIMEOUT_SECONDS = 10
+LOCK_WAIT_SECONDS = 0.5
+LOCK_POLL_SECONDS = 0.05
+
+STATS_PREFIX = "respcache:stats"
+EVENTS = ("hits", "misses", "stale", "waits", "recomputes")
+FLUSH_EVERY_EVENTS = 50
+FLUSH_EVERY_SECONDS = 10
+
+
+def entry_key(namespace: str, user_id: int, key: str) -> str:
+    return f"{namespace}:gen:{user_id}:{_hash_key(key)}"
+
+
+def _lock_key(key: str) -> str:
+    return f"{key}:lock"
+
+
+def encode_payload(data) -> Tuple[bool, bytes]:
+    raw = json.dumps(data, cls=DjangoJSONEncoder, separators=(",", ":")).encode("utf-8")
+    if len(raw) >= COMPRESS_MIN_BYTES:
+        # window no larger than the payload (at most 8 KiB) and memLevel 3: a few KiB to
+        # ~30 KiB of deflate state instead of ~260 KiB; the ratio stays within ~2%
+        window_bits = min(13, max(9, (len(raw) - 1).bit_length()))
+        compressor = zlib.compressobj(6, zlib.DEFLATED, window_bits, 3)
+        return True, compressor.compress(raw) + compressor.flush()
+    return False, raw
+
+
+def decode_payload(compressed: bool, blob: bytes):
+    return json.loads(zlib.decompress(blob) if compressed else blob)
+
+
+class SharedCounters:
+    """
+    Per-process event counters, pushed to the shared cache every few
+    events/seconds so every worker reports into the same totals.
+    """
+
+    def __init__(self, prefix: str):
+        self.prefix = prefix
+        self.namespaces_key = f"{prefix}:namespaces"
+        self._pending: Counter = Counter()
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+
+    def record(self, namespace: str, event: str) -> None:
+        with self._lock:
+            self._pending[(namespace, event)] += 1
+            due = (
+                sum(self._pending.values()) >= FLUSH_EVERY_EVENTS
+                or time.monotonic() - self._last_flush >= FLUSH_EVERY_SECONDS
+            )
+        if due:
+            self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+            self._last_flush = time.monotonic()
+        if not pending:
+            return
+        try:
+            namespaces = set(cache.get(self.namespaces_key) or ())
+            new = {ns for ns, _ in pending} - namespaces
+            if new:
+                cache.set(self.namespaces_key, sorted(namespaces | new), timeout=None)
+            for (namespace, event), delta in pending.items():
+                _incr(f"{self.prefix}:{namespace}:{event}", delta)
+        except Exception:
+            logger.exception(f"{self.prefix}: failed to flush counters")
+
+    def read(self, events) -> Dict[str, Dict[str, int]]:
+        """Shared totals per namespace (this process's pending events are flushed first)."""
+        self.flush()
+        namespaces = cache.get(self.namespaces_key) or []
+        values = cache.get_many([f"{self.prefix}:{ns}:{event}" for ns in namespaces for event in events])
+        return {
+            ns: {event: int(values.get(f"{self.prefix}:{ns}:{event}") or 0) for event in events}
+            for ns in namespaces
+        }
+
+
+def _incr(key: str, delta: int) -> None:
+    try:
+        cache.incr(key, delta)
+    except ValueError:
+        # first use: add() keeps concurrent workers from overwriting each other
+        if not cache.add(key, delta, timeout=None):
+            cache.incr(key, delta)
+
+
+metrics = SharedCounters(STATS_PREFIX)
+
+
+def response_cache_stats() -> Dict[str, Dict[str, float]]:
+    stats = metrics.read(EVENTS)
+    for row in stats.values():
+        lookups = row["hits"] + row["stale"] + row["misses"]
+        row["hit_ratio"] = round((row["hits"] + row["stale"]) / lookups, 4) if lookups else 0.0
+    return stats
+
+
+def cached_response(
+    namespace: str,
+    user_id: int,
+    key: str,
+    compute: Callable[[], Response],
+    ttl: int,
+    generation: Optional[Tuple[str, int]] = None,
+) -> Response:
+    """
+    Return the cached 200 response for `key`, or build it with compute().
+
+    `generation` names the version counter that invalidates the entry
+    (defaults to the namespace's own list version for user_id). Only
+    HTTP 200 responses are stored.
+    """
+    version_key = _version_key(*(generation or (namespace, user_id)))
+    ekey = entry_key(namespace, user_id, key)
+
+    found = cache.get_many([version_key, ekey])
+    current = found.get(version_key)
+    if current is None:
+        # a restarted counter (eviction, flush) must not match entries of the old one
+        current = seed_version(version_key)
+    entry = found.get(ekey)
+
+    if entry is not None and entry[0] == current:
+        if time.time() < entry[1]:
+            metrics.record(namespace, "hits")
+            return Response(decode_payload(entry[2], entry[3]), status=status.HTTP_200_OK)
+        if not cache.add(_lock_key(ekey), 1, timeout=LOCK_TIMEOUT_SECONDS):
+            # someone is already refreshing this entry
+            metrics.record(namespace, "stale")
+            return Response(decode_payload(entry[2], entry[3]), status=status.HTTP_200_OK)
+        metrics.record(namespace, "misses")
+        return _recompute(namespace, ekey, current, compute, ttl, locked=True)
+
+    metrics.record(namespace, "misses")
+    if cache.add(_lock_key(ekey), 1, timeout=LOCK_TIMEOUT_SECONDS):
+        return _recompute(namespace, ekey, current, compute, ttl, locked=True)
+
+    # another worker is computing the same entry: wait a little for its result
+    deadline = time.monotonic() + LOCK_WAIT_SECONDS
+    while time.monotonic() < deadline:
+        time.sleep(LOCK_POLL_SECONDS)
+        entry = cache.get(ekey)
+        if entry is not None and entry[0] == current:
+            metrics.record(namespace, "waits")
+            return Response(decode_payload(entry[2], entry[3]), status=status.HTTP_200_OK)
+    return _recompute(namespace, ekey, current, compute, ttl, locked=False)
+
+
+def _recompute(namespace, ekey, generation, compute, ttl, locked):
+    try:
+        response = compute()
+        metrics.record(namespace, "recomputes")
+        if response.status_code == status.HTTP_200_OK:
+            compressed, blob = encode_payload(response.data)
+            cache.set(ekey, (generation, time.time() + ttl, compressed, blob), timeout=ttl + STALE_GRACE_SECONDS)
+        return response
+    finally:
+        if locked:
+            cache.delete(_lock_key(ekey))
@@ -0,0 +1,149 @@
+"""
+Two-tier cache for global catalog data (MealDB recipes).
+
+L1 is a bounded LRU dict inside each worker process, L2 is the shared Django
+cache (Redis). Every entry belongs to the current catalog generation
+(get_catalog_version()); L2 keys embed it and L1 is dropped as soon as the
+generation moves. Other workers' bumps are noticed within `check_interval`
+seconds, bumps made in this process immediately (on_catalog_bump).
+
+Per-tier hit counters are shared across workers (SharedCounters) and reported
+by `manage.py cache_stats`.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List
+
+from django.core.cache import cache
+
+from food.utils.caching import get_catalog_version, on_catalog_bump
+from food.utils.response_cache import SharedCounters
+
+TIER_STATS_PREFIX = "tiercache:stats"
+TIER_EVENTS = ("l1_hits", "l2_hits", "misses")
+
+tier_metrics = SharedCounters(TIER_STATS_PREFIX)
+
+
+class TieredCache:
+    def __init__(
+        self,
+        namespace: str,
+        max_entries: int = 2048,
+        ttl: int = 60 * 60,
+        l1_ttl: int = 60 * 5,
+        check_interval: float = 2.0,
+    ):
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.l1_ttl = l1_ttl
+        self.check_interval = check_interval
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = None
+        self._checked_at = 0.0
+        on_catalog_bump(self.clear_local)
+
+    def _l2_key(self, generation: int, key: str) -> str:
+        return f"{self.namespace}:g{generation}:{key}"
+
+    def _current_generation(self) -> int:
+        now = time.monotonic()
+        if self._generation is not None and now - self._checked_at < self.check_interval:
+            return self._generation
+        generation = get_catalog_version()
+        with self._lock:
+            if generation != self._generation:
+                self._entries.clear()
+                self._generation = generation
+            self._checked_at = now
+        return generation
+
+    def clear_local(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._generation = None
+
+    def _l1_get(self, key: str, generation: int, now: float):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] != generation or now >= entry[1]:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def _l1_set(self, key: str, generation: int, value, now: float) -> None:
+        with self._lock:
+            self._entries[key] = (generation, now + self.l1_ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, key: str, compute: Callable[[], object]):
+        """
+        Value for `key` from L1, then L2, then compute(). None results are
+        returned but not cached (e.g. a missing recipe).
+        """
+        return self.get_many([key], lambda missing: {key: compute()}).get(key)
+
+    def get_many(self, keys: Iterable[str], compute_missing: Callable[[List[str]], Dict[str, object]]) -> Dict[str, object]:
+        """
+        Values for `keys`; compute_missing(missing_keys) fills whatever neither
+        tier has and returns {key: value} (keys it leaves out stay uncached).
+        """
+        generation = self._current_generation()
+        now = time.monotonic()
+        found: Dict[str, object] = {}
+        missing: List[str] = []
+
+        for key in dict.fromkeys(keys):
+            entry = self._l1_get(key, generation, now)
+            if entry is None:
+                missing.append(key)
+            else:
+                found[key] = entry[2]
+                tier_metrics.record(self.namespace, "l1_hits")
+        if not missing:
+            return found
+
+        l2 = cache.get_many([self._l2_key(generation, k) for k in missing])
+        still_missing = []
+        for key in missing:
+            l2_key = self._l2_key(generation, key)
+            if l2_key in l2:
+                found[key] = l2[l2_key]
+                self._l1_set(key, generation, l2[l2_key], now)
+                tier_metrics.record(self.namespace, "l2_hits")
+            else:
+                still_missing.append(key)
+                tier_metrics.record(self.namespace, "misses")
+        if not still_missing:
+            return found
+
+        computed = {k: v for k, v in (compute_missing(still_missing) or {}).items() if v is not None}
+        if computed:
+            cache.set_many({self._l2_key(generation, k): v for k, v in computed.items()}, timeout=self.ttl)
+            for key, value in computed.items():
+                self._l1_set(key, generation, value, now)
+        found.update(computed)
+        return found
+
+
+def tiered_cache_stats() -> Dict[str, Dict[str, float]]:
+    stats = tier_metrics.read(TIER_EVENTS)
+    for row in stats.values():
+        lookups = row["l1_hits"] + row["l2_hits"] + row["misses"]
+        l2_lookups = row["l2_hits"] + row["misses"]
+        row["l1_hit_ratio"] = round(row["l1_hits"] / lookups, 4) if lookups else 0.0
+        row["l2_hit_ratio"] = round(row["l2_hits"] / l2_lookups, 4) if l2_lookups else 0.0
+        row["hit_ratio"] = round((row["l1_hits"] + row["l2_hits"]) / lookups, 4) if lookups else 0.0
+    return stats
+
+
+# MealDB catalog data: detail payloads, random-card pool, recommendation candidates
+catalog_cache = TieredCache("mealdb:catalog:data")
@@ -7,8 +7,9 @@ from rest_framework import status
 from ..models import FoodLogSys
 from ..serializers import FoodLogSysSerializer
 from ..filters import FoodLogFilter 
-from ..utils.caching import bump_list_version, detail_key, list_key, invalidate_cache
-from ..pagination import FoodLogPagination
+from ..utils.caching import bump_list_version, detail_key, invalidate_cache
+from ..utils.response_cache import cached_response
+from ..pagination import FoodLogCursorPagination, FoodLogPagination
 from meal_plans.services.inventory import InventoryService
 from datetime import date, timedelta
 import logging
@@ -16,8 +17,11 @@ logger = logging.getLogger(__name__)
 
 
 NAMESPACE = "foodlog"
+CACHE_TTL_SECONDS = 60 * 5
 SORTABLE_FIELDS = {"name", "category", "storage_type", "quantity", "expiry_date"}
 DUAL_SORT_FIELDS = {"quantity", "expiry_date"}
+# lightweight projection for ?fields=compact (no model instances, no ModelSerializer)
+COMPACT_FIELDS = ("id", "name", "quantity", "unit", "category", "storage_type", "expiry_date", "is_consumed")
 
 @api_view(['GET', 'POST'])
 @permission_classes([IsAuthenticated])
@@ -26,48 +30,10 @@ def food_log_list_create(request):
     List all food logs for the authenticated user or create a new food log.
     """
     if request.method == 'GET':
-        cache_key = list_key(NAMESPACE, request.user.id, request.get_full_path())
-        cached = cache.get(cache_key)
-        if cached is not None:
-            return Response(cached, status=status.HTTP_200_OK)
-        
-        queryset = FoodLogSys.objects.filter(user=request.user)
-        #FoodLogFilter
-        food_filter = FoodLogFilter(request.GET,queryset=queryset)
-        if not food_filter.is_valid():
-            return Response (
-                food_filter.errors,
-                status=status.HTTP_400_BAD_REQUEST
-                )
-        queryset = food_filter.qs
-
-        #SORTING
-        sort_by = request.GET.get("sort_by", "")
-        sort_order = request.GET.get("sort_order","asc")
-
-        if sort_by in SORTABLE_FIELDS:
-            if sort_by in DUAL_SORT_FIELDS:
-                if sort_order == "desc":
-                    queryset = queryset.order_by(f"-{sort_by}")
-                else:
-                    queryset = queryset.order_by(sort_by)
-            else:
-                queryset = queryset.order_by(sort_by)
-        else:
-            queryset = queryset.order_by("expiry_date")
-
-        #PAGINATION 
-
-        paginator = FoodLogPagination()
-        paginated_queryset = paginator.paginate_queryset(
-            queryset, request
+        return cached_response(
+            NAMESPACE, request.user.id, request.get_full_path(),
+            lambda: _food_log_list(request), ttl=CACHE_TTL_SECONDS,
         )
-        serializer = FoodLogSysSerializer(
-            paginated_queryset, many=True
-        )
-        response = paginator.get_paginated_response(serializer.data)
-        cache.set(cache_key, response.data, timeout= 60*5)
-        return response
 
     elif request.method == 'POST':
         # Create a new food log
@@ -78,6 +44,75 @@ def food_log_list_create(request):
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+
+def _food_log_list(request):
+    """Uncached body of the list view (filters, sorting, page-number or cursor pagination)."""
+    queryset = FoodLogSys.objects.filter(user=request.user)
+    #FoodLogFilter
+    food_filter = FoodLogFilter(request.GET,queryset=queryset)
+    if not food_filter.is_valid():
+        return Response (
+            food_filter.errors,
+            status=status.HTTP_400_BAD_REQUEST
+            )
+    queryset = food_filter.qs
+
+    #SORTING
+    sort_by = request.GET.get("sort_by", "")
+    sort_order = request.GET.get("sort_order","asc")
+
+    if _wants_cursor(request):
+        return _cursor_page(request, queryset, sort_by, sort_order)
+
+    if sort_by in SORTABLE_FIELDS:
+        if sort_by in DUAL_SORT_FIELDS:
+            if sort_order == "desc":
+                queryset = queryset.order_by(f"-{sort_by}")
+            else:
+                queryset = queryset.order_by(sort_by)
+        else:
+            queryset = queryset.order_by(sort_by)
+    else:
+        queryset = queryset.order_by("expiry_date")
+
+    #PAGINATION 
+
+    paginator = FoodLogPagination()
+    paginated_queryset = paginator.paginate_queryset(
+        queryset, request
+    )
+    serializer = FoodLogSysSerializer(
+        paginated_queryset, many=True
+    )
+    return paginator.get_paginated_response(serializer.data)
+
+def _wants_cursor(request):
+    return request.GET.get("pagination") == "cursor" or "cursor" in request.GET
+
+
+def _cursor_page(request, queryset, sort_by, sort_order):
+    """
+    Cursor variant of the list: ?pagination=cursor[&cursor=...][&count=true][&fields=compact].
+    Same filters and sort options; pages seek on (sort field, id) instead of OFFSET.
+    """
+    field = sort_by if sort_by in SORTABLE_FIELDS else "expiry_date"
+    descending = field in DUAL_SORT_FIELDS and sort_order == "desc"
+
+    compact = request.GET.get("fields") == "compact"
+    if compact:
+        queryset = queryset.values(*COMPACT_FIELDS)
+
+    paginator = FoodLogCursorPagination()
+    rows = paginator.paginate_queryset(queryset, request, field=field, descending=descending)
+    if compact:
+        # match the serializer's decimal strings
+        data = [{**row, "quantity": str(row["quantity"])} for row in rows]
+    else:
+        data = FoodLogSysSerializer(rows, many=True).data
+
+    return paginator.get_paginated_response(data)
+
+
 @api_view(['GET', 'PUT', 'PATCH', 'DELETE'])
 @permission_classes([IsAuthenticated])
 def food_log_detail(request, pk):
@@ -152,16 +187,22 @@ def food_log_detail(request, pk):
             {"message": "Food log deleted successfully"},
             status=status.HTTP_204_NO_CONTENT
         )
+
+
+def expiring_soon_queryset(user, soon):
+    return (
+        FoodLogSys.objects.filter(user=user, expiry_date__lte=soon, is_consumed=False)
+        .order_by("expiry_date")
+        .values("id", "name", "category", "expiry_date")
+    )
+
+
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def expiring_soon(request):
     today = date.today()
     soon = today + timedelta(days=3)
-    items = (
-        FoodLogSys.objects.filter(user=request.user, expiry_date__lte=soon, is_consumed=False)
-        .order_by("expiry_date")
-        .values("id", "name", "category", "expiry_date")
-    )
+    items = expiring_soon_queryset(request.user, soon)
     out = []
     for item in items:
         days_left = (item["expiry_date"] - today).days
@@ -192,6 +233,5 @@ def food_log_category_breakdown(request):
     Returns a breakdown of food logs by category.
     """
     inv = InventoryService(request.user)
-    ava = inv.get_available_logs()
-    breakdown = inv._get_category_breakdown(ava)
+    breakdown = inv.get_category_breakdown()
     return Response(breakdown, status=status.HTTP_200_OK)
@@ -10,7 +10,8 @@ from ..pagination import MealPagination
 from ..filters import MealFilter
 from django_filters.rest_framework import DjangoFilterBackend
 
-from ..utils.caching import detail_key,list_key, invalidate_cache, bump_list_version
+from ..utils.caching import detail_key, invalidate_cache, bump_list_version
+from ..utils.response_cache import cached_response
 from django.core.cache import cache
 
 CACHE_TTL_SECONDS = 60 * 5
@@ -79,17 +80,11 @@ class UserMealListAPIView(generics.ListAPIView):
         return Meal.objects.filter(user=self.request.user)
     
     def list(self, request, *args, **kwargs):
-        user_id = request.user.id
-        full_path = request.get_full_path()
-
-        key = list_key(NAMESPACE,user_id, full_path)
-        cached = cache.get(key) 
-        if cached is not None:
-            return Response(cached, status=200)
-        
-        response = super().list(request, *args, **kwargs)
-        cache.set(key, response.data, timeout=CACHE_TTL_SECONDS)
-        return response
+        return cached_response(
+            NAMESPACE, request.user.id, request.get_full_path(),
+            lambda: super(UserMealListAPIView, self).list(request, *args, **kwargs),
+            ttl=CACHE_TTL_SECONDS,
+        )
 
     
 class DeleteMealAPIView(APIView):
@@ -8,7 +8,8 @@ from ..filters import WasteLogFilter
 from ..pagination import WasteLogPagination
 
 from django.core.cache import cache
-from ..utils.caching import detail_key, list_key, invalidate_cache
+from ..utils.caching import detail_key, invalidate_cache
+from ..utils.response_cache import cached_response
 
 CACHE_TTL_SECONDS = 60 * 5
 NAMESPACE = "wastelog"
@@ -17,36 +18,10 @@ NAMESPACE = "wastelog"
 @permission_classes([IsAuthenticated])
 def waste_log_list_create(request):
     if request.method == "GET":
-        user_id = request.user.id
-        full_path = request.get_full_path()
-        key = list_key(NAMESPACE, user_id, full_path)
-
-        cached = cache.get(key)
-        if cached is not None:
-            return Response(cached, status= status.HTTP_200_OK)
-        
-        qs = (WasteLog.objects.filter(user=request.user).select_related("meal"))
-        meal_id = request.query_params.get("meal")
-        if meal_id:
-            qs = qs.filter(meal_id = meal_id)
-        # filters
-        waste_filter = WasteLogFilter(request.GET,queryset=qs)
-        if not waste_filter.is_valid():
-            return Response(waste_filter.errors, status=status.HTTP_400_BAD_REQUEST)
-        filtered_qs = waste_filter.qs
-        # pagination
-        paginator = WasteLogPagination()
-        page = paginator.paginate_queryset(filtered_qs, request)
-        if page is None:
-            serializer = WasteLogSerializer(filtered_qs, many=True)
-            data = serializer.data
-            cache.set(key, data, timeout = CACHE_TTL_SECONDS)
-            return Response(data, status=status.HTTP_200_OK)
-        # serializer
-        serializer = WasteLogSerializer(page, many=True)
-        response = paginator.get_paginated_response(serializer.data)
-        cache.set(key, response.data, timeout=CACHE_TTL_SECONDS)
-        return response
+        return cached_response(
+            NAMESPACE, request.user.id, request.get_full_path(),
+            lambda: _waste_log_list(request), ttl=CACHE_TTL_SECONDS,
+        )
     #post
     serializer = WasteLogSerializer(data = request.data, context ={"request": request})
     if serializer.is_valid():
@@ -58,6 +33,28 @@ def waste_log_list_create(request):
     
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+
+def _waste_log_list(request):
+    qs = (WasteLog.objects.filter(user=request.user).select_related("meal"))
+    meal_id = request.query_params.get("meal")
+    if meal_id:
+        qs = qs.filter(meal_id = meal_id)
+    # filters
+    waste_filter = WasteLogFilter(request.GET,queryset=qs)
+    if not waste_filter.is_valid():
+        return Response(waste_filter.errors, status=status.HTTP_400_BAD_REQUEST)
+    filtered_qs = waste_filter.qs
+    # pagination
+    paginator = WasteLogPagination()
+    page = paginator.paginate_queryset(filtered_qs, request)
+    if page is None:
+        serializer = WasteLogSerializer(filtered_qs, many=True)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+    # serializer
+    serializer = WasteLogSerializer(page, many=True)
+    return paginator.get_paginated_response(serializer.data)
+
+
 @api_view(['GET', 'PUT', 'PATCH', 'DELETE'])
 @permission_classes([IsAuthenticated])
 def waste_log_detail(request, pk):
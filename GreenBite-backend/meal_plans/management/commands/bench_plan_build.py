@@ -0,0 +1,96 @@
+"""
+Measure MealPlanBuilder.build latency and query count against plan size.
+
+Everything runs inside a transaction that is rolled back, so it is safe to
+point at a development database:
+
+    python manage.py bench_plan_build --sizes 7x3,30x4,90x4 --repeat 10
+"""
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from meal_plans.services.meal_plan_builder import MealPlanBuilder
+from meal_plans.services.recipeProvider import RecipeCandidate
+
+
+class _Rollback(Exception):
+    pass
+
+
+def _parse_sizes(value):
+    sizes = []
+    for part in value.split(","):
+        try:
+            days, meals = part.lower().split("x")
+            sizes.append((int(days), int(meals)))
+        except ValueError:
+            raise CommandError(f"Invalid size {part!r}; expected DAYSxMEALS, e.g. 30x4")
+    return sizes
+
+
+def _recipes(count):
+    return [
+        RecipeCandidate(
+            title=f"Bench recipe {i}",
+            ingredients=[f"ingredient {i}-{j}" for j in range(8)],
+            source="bench",
+            instructions="prep, cook, serve",
+            cuisine="bench",
+            metadata={"mealdb_id": str(i)},
+        )
+        for i in range(count)
+    ]
+
+
+class Command(BaseCommand):
+    help = "Benchmark meal plan materialization (MealPlanBuilder.build) by plan size"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", type=str, default="7x3,14x4,30x4,90x4", help="Comma separated DAYSxMEALS")
+        parser.add_argument("--repeat", type=int, default=5, help="Builds per size")
+
+    def handle(self, *args, **options):
+        sizes = _parse_sizes(options["sizes"])
+        repeat = max(1, options["repeat"])
+
+        self.stdout.write(f"{'plan':>8} {'meals':>6} {'queries':>8} {'median ms':>10} {'p95 ms':>8}")
+        try:
+            with transaction.atomic():
+                user = get_user_model().objects.create_user(
+                    email="bench-plan-build@example.invalid", password=None
+                )
+                for days, meals_per_day in sizes:
+                    self._bench(user, days, meals_per_day, repeat)
+                raise _Rollback()
+        except _Rollback:
+            pass
+
+        self.stdout.write(self.style.SUCCESS("Done (all benchmark rows rolled back)."))
+
+    def _bench(self, user, days, meals_per_day, repeat):
+        builder = MealPlanBuilder(user, timezone.now().date(), days, meals_per_day)
+        recipes = _recipes(days * meals_per_day)
+
+        timings = []
+        queries = 0
+        for _ in range(repeat):
+            sid = transaction.savepoint()
+            with CaptureQueriesContext(connection) as ctx:
+                started = time.perf_counter()
+                builder.build(recipes)
+                timings.append((time.perf_counter() - started) * 1000)
+            queries = len(ctx)
+            transaction.savepoint_rollback(sid)
+
+        timings.sort()
+        p95 = timings[min(len(timings) - 1, int(round(0.95 * (len(timings) - 1))))]
+        self.stdout.write(
+            f"{days:>4}x{meals_per_day:<3} {days * meals_per_day:>6} {queries:>8} "
+            f"{statistics.median(timings):>10.1f} {p95:>8.1f}"
+        )
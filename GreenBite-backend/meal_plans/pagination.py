@@ -0,0 +1,9 @@
+from rest_framework.pagination import CursorPagination
+
+
+class MealPlanCursorPagination(CursorPagination):
+    # keyset paging on the list ordering, so deep pages cost the same as the first
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 50
+    ordering = ("-created_at", "-id")
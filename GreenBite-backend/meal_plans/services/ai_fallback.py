@@ -20,7 +20,7 @@ def generate_ai_recipes(food_logs, limit):
     Generate recipes using OpenAI based on available ingredients.
     
     Args:
-        food_logs: QuerySet of FoodLogSys objects
+        food_logs: FoodLogSys objects or InventoryItem rows (anything with .name)
         limit: Number of recipes to generate
     
     Returns:
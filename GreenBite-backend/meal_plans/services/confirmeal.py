@@ -1,11 +1,15 @@
 import logging
 import re
+from dataclasses import dataclass
+from typing import List
 from django.db import transaction
 from django.utils import timezone
 from meal_plans.models import MealPlanDay, MealPlanMeal, MealPlanFoodUsage
-from food.models import FoodLogSys,Meal
+from food.models import Meal
 from decimal import Decimal
-from food.utils.caching import bump_list_version, invalidate_cache
+from food.utils.caching import bump_list_version
+from meal_plans.services.consumption import BatchConsumption
+from meal_plans.services.plan_detail import invalidate_plan_detail
 
 
 logger = logging.getLogger(__name__)
@@ -29,6 +33,131 @@ def _core_ingredient_name(text: str) -> str:
     return " ".join(tokens).strip()
 
 
+@dataclass
+class PlanConfirmation:
+    confirmed_days: List[MealPlanDay]
+    errors: List[str]
+    remaining_days: int
+
+
+def _create_draft_meals(meals, user):
+    """Create the Meal for every draft slot with one INSERT (Meal exists only once confirmed)."""
+    drafts = [meal for meal in meals if meal.meal is None]
+    if not drafts:
+        return
+    created = Meal.objects.bulk_create([
+        Meal(
+            user=user,
+            recipe=meal.draft_title or "",
+            ingredients=meal.draft_ingredients or [],
+            steps=meal.draft_steps or [],
+            cuisine=meal.draft_cuisine or None,
+            calories=meal.draft_calories,
+            serving=meal.draft_serving,
+            photo=meal.draft_photo or "",
+            mealTime=meal.meal_time,
+            source_mealdb_id=(meal.draft_source_mealdb_id or None),
+        )
+        for meal in drafts
+    ])
+    for meal, created_meal in zip(drafts, created):
+        meal.meal = created_meal
+    MealPlanMeal.objects.bulk_update(drafts, ["meal"])
+
+
+def _queue_consumption(consumption, meals):
+    """Add one day's demands: planned usages, or estimated ingredients when a meal has none."""
+    for meal in meals:
+        planned_usages = meal.planned_usages.all()
+
+        if planned_usages:
+            for usage in planned_usages:
+                consumption.add_planned(usage.food_log_id, usage.planned_quantity, usage.food_log.name)
+            continue
+
+        logger.debug(f"No planned usages for meal {meal.id}, using ingredient estimation")
+
+        ingredients = getattr(meal.meal, "ingredients", []) or []
+        if not ingredients:
+            logger.warning(f"Meal {meal.meal.id} has no ingredients; cannot estimate consumption")
+            continue
+
+        for ingredient in ingredients:
+            if isinstance(ingredient, dict):
+                ingredient_text = ingredient.get("name") or ingredient.get("ingredient") or ""
+            else:
+                ingredient_text = str(ingredient or "")
+
+            core = _core_ingredient_name(ingredient_text)
+            if not core:
+                continue
+            consumption.add_estimated(ingredient_text, core)
+
+
+def _confirm_days(days, user):
+    """
+    Confirm any number of days with a fixed number of queries: load every meal
+    and planned usage at once, create the draft Meals in bulk, resolve all
+    consumption in one BatchConsumption pass and flag the days with one UPDATE.
+
+    Returns (confirmed_days, {day_id: error}); days that fail validation are
+    left untouched. Each confirmed day gets its slice of the audit as
+    `consumption_audit`.
+    """
+    meals_by_day = {day.id: [] for day in days}
+    meals = (
+        MealPlanMeal.objects.filter(meal_plan_day_id__in=list(meals_by_day))
+        .select_related('meal', 'original_meal')
+        .prefetch_related('planned_usages__food_log')
+        .order_by('meal_plan_day__date', 'id')
+    )
+    for meal in meals:
+        meals_by_day[meal.meal_plan_day_id].append(meal)
+
+    errors = {}
+    ready = []
+    for day in days:
+        if not meals_by_day[day.id]:
+            errors[day.id] = "No meals found for this day"
+        else:
+            ready.append(day)
+    if not ready:
+        return [], errors
+
+    # Skip skipped meals
+    active = {day.id: [m for m in meals_by_day[day.id] if not m.is_skipped] for day in ready}
+    _create_draft_meals([m for day in ready for m in active[day.id]], user)
+
+    # Collect every demand first, then resolve them against inventory in one pass
+    consumption = BatchConsumption(user)
+    spans = {}
+    for day in ready:
+        logger.info(f"Confirming day {day.date} with {len(meals_by_day[day.id])} meals")
+        start = len(consumption.lines)
+        _queue_consumption(consumption, active[day.id])
+        spans[day.id] = (start, len(consumption.lines))
+
+    audit = consumption.apply()
+
+    # Mark days as confirmed
+    now = timezone.now()
+    MealPlanDay.objects.filter(id__in=[day.id for day in ready]).update(is_confirmed=True, confirmed_at=now)
+    for day in ready:
+        day.is_confirmed = True
+        day.confirmed_at = now
+        start, end = spans[day.id]
+        day.consumption_audit = audit[start:end]
+
+    bump_list_version("meals", user.id)
+    invalidate_plan_detail(*{day.meal_plan_id for day in ready})
+
+    logger.info(
+        f"Confirmed {len(ready)} day(s) - "
+        f"consumed from {len({i for line in audit for i in line.food_log_ids})} food logs"
+    )
+    return ready, errors
+
+
 @transaction.atomic
 def confirm_meal_plan_day(meal_plan_day, user):
     # Handle if passed as ID
@@ -49,147 +178,74 @@ def confirm_meal_plan_day(meal_plan_day, user):
     if meal_plan_day.is_confirmed:
         logger.warning(f"Day {meal_plan_day.id} already confirmed at {meal_plan_day.confirmed_at}")
         raise ValueError("This day is already confirmed")
-    bump_list_version("meals", user.id)
 
-    # Optional: if you create/update FoodLogSys during confirmation
-    bump_list_version("foodlog", user.id)
+    _, errors = _confirm_days([meal_plan_day], user)
+    if errors:
+        raise ValueError(errors[meal_plan_day.id])
 
-    # Get all meals for this day (QuerySet, not list)
-    meals = MealPlanMeal.objects.filter(
-        meal_plan_day=meal_plan_day
-    ).select_related('meal', 'original_meal').prefetch_related('planned_usages__food_log')
-
-    if not meals.exists():
-        raise ValueError("No meals found for this day")
-
-    logger.info(f"Confirming day {meal_plan_day.date} with {meals.count()} meals")
+    return meal_plan_day
 
-    # Track consumption per food log
-    consumption_tracker = {}
 
-    for meal in meals:
-        # Skip skipped meals
-        if meal.is_skipped:
-            logger.debug(f"Skipping meal {meal.id} ({meal.meal_time}) - skipped")
+def _confirm_days_isolated(days, user):
+    """
+    _confirm_days() for all days in one savepoint; if that raises, confirm
+    them one savepoint per day so a failing day is reported (str(exc), as
+    the per-day loop did) and the others still commit.
+    """
+    try:
+        with transaction.atomic():
+            return _confirm_days(days, user)
+    except Exception as e:
+        logger.warning(f"Batched confirmation failed ({e}); confirming {len(days)} day(s) one by one")
+
+    confirmed, errors = [], {}
+    for day in days:
+        try:
+            with transaction.atomic():
+                done, day_errors = _confirm_days([day], user)
+        except Exception as e:
+            errors[day.id] = str(e)
             continue
+        confirmed.extend(done)
+        errors.update(day_errors)
+    return confirmed, errors
 
-        # Create Meal only on confirmation
-        if meal.meal is None:
-            meal.meal = Meal.objects.create(
-                user=user,
-                recipe=meal.draft_title or "",
-                ingredients=meal.draft_ingredients or [],
-                steps=meal.draft_steps or [],
-                cuisine=meal.draft_cuisine or None,
-                calories=meal.draft_calories,
-                serving=meal.draft_serving,
-                photo=meal.draft_photo or "",
-                mealTime=meal.meal_time,
-                source_mealdb_id=(meal.draft_source_mealdb_id or None),
-            )
-            meal.save(update_fields=["meal"])
-
-
-        planned_usages_qs = meal.planned_usages.select_related("food_log")
-
-        if planned_usages_qs.exists():
-            for usage in planned_usages_qs:
-                food_log = usage.food_log
-                quantity = usage.planned_quantity
-
-                if food_log.id not in consumption_tracker:
-                    consumption_tracker[food_log.id] = {"food_log": food_log, "total_quantity": Decimal("0")}
-
-                consumption_tracker[food_log.id]["total_quantity"] += quantity
-
-                logger.debug(
-                    f"Meal {meal.meal_time}: {food_log.name} - {quantity}g (from planned usage)"
-                )
-        else:
-            logger.debug(f"No planned usages for meal {meal.id}, using ingredient estimation")
-
-            ingredients = getattr(meal.meal, "ingredients", []) or []
-            if not ingredients:
-                logger.warning(f"Meal {meal.meal.id} has no ingredients; cannot estimate consumption")
-                continue
-
-            for ingredient in ingredients:
-                if isinstance(ingredient, dict):
-                    ingredient_text = ingredient.get("name") or ingredient.get("ingredient") or ""
-                else:
-                    ingredient_text = str(ingredient or "")
-
-                core = _core_ingredient_name(ingredient_text)
-                if not core:
-                    continue
-
-                # Try matching using core tokens
-                matching_logs = FoodLogSys.objects.filter(
-                    user=user,
-                    is_consumed=False,
-                    name__icontains=core
-                )
-
-                if not matching_logs.exists():
-                    logger.debug(f"No inventory match for ingredient='{ingredient_text}' core='{core}'")
-                    continue
-
-                # Estimate quantity (default 100g per ingredient)
-                estimated_quantity = Decimal('100.00')
-
-                if matching_logs.first().id not in consumption_tracker:
-                    consumption_tracker[matching_logs.first().id] = {
-                        'food_log': matching_logs.first(),
-                        'total_quantity': Decimal('0')
-                    }
-
-                consumption_tracker[matching_logs.first().id]['total_quantity'] += estimated_quantity
-
-                logger.debug(
-                    f"Meal {meal.meal_time}: {ingredient} → {matching_logs.first().name} - "
-                    f"{estimated_quantity}g (estimated)"
-                )
-
-    # Apply consumption to food logs
-    for food_log_id, data in consumption_tracker.items():
-        food_log = data['food_log']
-        consume_quantity = data['total_quantity']
-
-        # Check if enough quantity available
-        if food_log.quantity < consume_quantity:
-            logger.warning(
-                f"Not enough {food_log.name}: have {food_log.quantity}g, "
-                f"need {consume_quantity}g. Using available quantity."
-            )
-            consume_quantity = food_log.quantity
-
-        # Deduct quantity
-        food_log.quantity -= consume_quantity
-
-        # Mark as consumed if quantity reaches zero
-        if food_log.quantity <= 0:
-            food_log.is_consumed = True
-            food_log.quantity = Decimal('0')
-            logger.info(f" {food_log.name} fully consumed")
 
-        food_log.save(update_fields=['quantity', 'is_consumed'])
-
-        logger.info(
-            f"Consumed {consume_quantity}g of {food_log.name} "
-            f"(remaining: {food_log.quantity}g)"
-        )
-
-    # Mark day as confirmed
-    meal_plan_day.is_confirmed = True
-    meal_plan_day.confirmed_at = timezone.now()
-    meal_plan_day.save(update_fields=['is_confirmed', 'confirmed_at'])
+@transaction.atomic
+def confirm_meal_plan(meal_plan, user):
+    """
+    Confirm every unconfirmed day of a plan in one transaction.
 
-    logger.info(
-        f"Confirmed day {meal_plan_day.date} - "
-        f"consumed from {len(consumption_tracker)} food logs"
+    Days that cannot be confirmed are reported as "Day <date>: <reason>" (as the
+    per-day loop did) without rolling back the other days, and the plan is
+    marked confirmed once no day remains.
+    """
+    if meal_plan.user_id != user.id:
+        raise ValueError("You don't have permission to confirm this meal plan")
+    if meal_plan.is_confirmed:
+        raise ValueError("Meal plan already confirmed")
+
+    days = list(
+        MealPlanDay.objects.select_for_update()
+        .filter(meal_plan=meal_plan, is_confirmed=False)
+        .order_by('date')
     )
-
-    return meal_plan_day
+    confirmed, day_errors = _confirm_days_isolated(days, user)
+
+    errors = []
+    for day in days:
+        if day.id in day_errors:
+            errors.append(f"Day {day.date}: {day_errors[day.id]}")
+            logger.warning(f"Failed to confirm day {day.date}: {day_errors[day.id]}")
+
+    remaining = len(days) - len(confirmed)
+    if remaining == 0:
+        meal_plan.is_confirmed = True
+        meal_plan.save(update_fields=["is_confirmed"])
+        invalidate_plan_detail(meal_plan.id)
+        logger.info(f" Meal plan {meal_plan.id} fully confirmed")
+
+    return PlanConfirmation(confirmed_days=confirmed, errors=errors, remaining_days=remaining)
 
 
 def get_day_consumption_preview(meal_plan_day):
@@ -0,0 +1,169 @@
+"""
+Batch consumption engine used when confirming meal plan days.
+
+Every demand for a day (planned usages and estimated ingredients) is collected
+first, the user's open inventory is read and locked with one
+select_for_update() query, deductions are computed in memory and written back
+with a single bulk_update(). The query count no longer depends on how many
+meals or ingredients the day has.
+"""
+import logging
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Dict, List, Optional
+
+from django.db import transaction
+
+from food.models import FoodLogSys
+from food.utils.caching import bump_foodlog_version
+from project.utils.ingredient_synonyms import expand_normalized_tokens
+from project.utils.normalize import normalize_ingredient_name
+
+logger = logging.getLogger(__name__)
+
+# default deduction when a meal has no planned usages for an ingredient
+ESTIMATED_QUANTITY = Decimal("100.00")
+
+
+@dataclass
+class ConsumptionLine:
+    """Audit row: what one ingredient asked for and what was taken from which logs."""
+    ingredient: str
+    normalized: str
+    source: str  # "planned" | "estimated"
+    requested: Decimal
+    consumed: Decimal = Decimal("0")
+    food_log_ids: List[int] = field(default_factory=list)
+    core: str = ""
+    food_log_id: Optional[int] = None  # planned usages target one log
+
+    @property
+    def status(self) -> str:
+        if not self.food_log_ids:
+            return "unmatched"
+        return "consumed" if self.consumed >= self.requested else "partial"
+
+    def as_dict(self) -> dict:
+        return {
+            "ingredient": self.ingredient,
+            "normalized": self.normalized,
+            "source": self.source,
+            "requested": float(self.requested),
+            "consumed": float(self.consumed),
+            "food_log_ids": self.food_log_ids,
+            "status": self.status,
+        }
+
+
+class BatchConsumption:
+    """
+    Collect demands with add_planned()/add_estimated(), then apply() once.
+
+    Estimated ingredients are matched against the inventory in this order:
+    exact name_normalized, synonym variants, then substring of the core name
+    (what the old per-ingredient icontains lookup did). Matching logs are
+    drained earliest-expiry first.
+    """
+
+    def __init__(self, user):
+        self.user = user
+        self.lines: List[ConsumptionLine] = []
+
+    def add_planned(self, food_log_id: int, quantity: Decimal, label: str = "") -> None:
+        self.lines.append(ConsumptionLine(
+            ingredient=label,
+            normalized=normalize_ingredient_name(label),
+            source="planned",
+            requested=Decimal(quantity),
+            food_log_id=food_log_id,
+        ))
+
+    def add_estimated(self, ingredient_text: str, core: str, quantity: Decimal = ESTIMATED_QUANTITY) -> None:
+        self.lines.append(ConsumptionLine(
+            ingredient=ingredient_text,
+            normalized=normalize_ingredient_name(ingredient_text),
+            source="estimated",
+            requested=Decimal(quantity),
+            core=core,
+        ))
+
+    def _load_inventory(self) -> List[FoodLogSys]:
+        planned_ids = {line.food_log_id for line in self.lines if line.food_log_id is not None}
+        if not any(line.source == "estimated" for line in self.lines):
+            qs = FoodLogSys.objects.filter(user=self.user, id__in=planned_ids)
+        else:
+            # a pantry is small; lock all open logs so fallbacks need no extra queries
+            qs = FoodLogSys.objects.filter(user=self.user, is_consumed=False)
+            if planned_ids:
+                qs = qs | FoodLogSys.objects.filter(user=self.user, id__in=planned_ids)
+        return list(qs.select_for_update().order_by("expiry_date", "id"))
+
+    @staticmethod
+    def _match(line: ConsumptionLine, logs: List[FoodLogSys], by_name: Dict[str, List[FoodLogSys]]) -> List[FoodLogSys]:
+        if line.normalized in by_name:
+            return by_name[line.normalized]
+        if line.normalized:
+            variants = expand_normalized_tokens(line.normalized)
+            matched = [log for log in logs if log.name_normalized in variants]
+            if matched:
+                return matched
+        if line.core:
+            return [log for log in logs if line.core in log.name.lower()]
+        return []
+
+    @transaction.atomic
+    def apply(self) -> List[ConsumptionLine]:
+        if not self.lines:
+            return []
+
+        logs = self._load_inventory()
+        by_id = {log.id: log for log in logs}
+        open_logs = [log for log in logs if not log.is_consumed]
+        by_name: Dict[str, List[FoodLogSys]] = {}
+        for log in open_logs:
+            by_name.setdefault(log.name_normalized, []).append(log)
+
+        changed: Dict[int, FoodLogSys] = {}
+        for line in self.lines:
+            if line.source == "planned":
+                log = by_id.get(line.food_log_id)
+                targets = [log] if log is not None else []
+            else:
+                targets = self._match(line, open_logs, by_name)
+
+            remaining = line.requested
+            for log in targets:
+                if remaining <= 0:
+                    break
+                take = min(remaining, log.quantity)
+                line.food_log_ids.append(log.id)
+                if take <= 0:
+                    continue
+                log.quantity -= take
+                if log.quantity <= 0:
+                    log.quantity = Decimal("0")
+                    log.is_consumed = True
+                line.consumed += take
+                remaining -= take
+                changed[log.id] = log
+
+            if not line.food_log_ids:
+                logger.debug(f"No inventory match for ingredient='{line.ingredient}' norm='{line.normalized}'")
+            elif remaining > 0:
+                logger.warning(
+                    f"Not enough {line.ingredient or line.normalized}: needed {line.requested}, "
+                    f"consumed {line.consumed}. Using available quantity."
+                )
+
+        if changed:
+            # bulk_update skips post_save, so retire cached inventory snapshots here
+            FoodLogSys.objects.bulk_update(list(changed.values()), ["quantity", "is_consumed"])
+            user_id = self.user.id
+            bump_foodlog_version(user_id)
+            transaction.on_commit(lambda: bump_foodlog_version(user_id))
+
+        logger.info(
+            f"BatchConsumption: {len(self.lines)} demands, updated {len(changed)} food logs "
+            f"({sum(1 for line in self.lines if line.status == 'unmatched')} unmatched)"
+        )
+        return self.lines
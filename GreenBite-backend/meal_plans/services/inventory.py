@@ -1,66 +1,288 @@
+import json
+import logging
+import zlib
+from dataclasses import dataclass, field
+from datetime import date
+from decimal import Decimal
+from types import MappingProxyType
+from typing import Dict, FrozenSet, List, Mapping, Optional, Tuple
+
+from django.core.cache import cache
 from django.utils import timezone
 from food.models import FoodLogSys
-from project.utils.ingredient_synonyms import expand_ingredient_tokens
+from food.utils.caching import get_foodlog_version
+from project.utils.ingredient_synonyms import expand_normalized_tokens
 from project.utils.normalize import normalize_ingredient_name
-from decimal import Decimal
-from django.db.models.query import QuerySet
-def _safe_count(qs_or_list):
-    if qs_or_list is None:
-        return 0
-
-    #only QuerySet.count() takes zero args reliably
-    if isinstance(qs_or_list, QuerySet):
-        return qs_or_list.count()
 
-    # lists/tuples/dicts/etc.
-    try:
-        return len(qs_or_list)
-    except TypeError:
-        # generator/iterator
-        try:
-            return sum(1 for _ in qs_or_list)
-        except Exception:
-            return 0
 
 def _to_float(val):
     try:
         if val is None:
             return 0.0
         # Decimal -> float, dates remain as-is
-        from decimal import Decimal
         if isinstance(val, Decimal):
             return float(val)
         return float(val)
     except Exception:
         return 0.0
 
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FIELDS = ("id", "name", "name_normalized", "quantity", "unit", "category", "expiry_date")
+EXPIRING_SOON_DAYS = 3
+
+SNAPSHOT_NAMESPACE = "inventory:snapshot"
+SNAPSHOT_FORMAT = 1
+# keys already change with the foodlog version and the day; the TTL only reaps old ones
+SNAPSHOT_TTL_SECONDS = 60 * 60 * 24
+
+
+@dataclass(frozen=True)
+class InventoryItem:
+    id: int
+    name: str
+    name_normalized: str
+    quantity: Decimal
+    unit: str
+    category: str
+    expiry_date: date
+    days_left: int
+
+
+@dataclass(frozen=True)
+class InventorySnapshot:
+    """
+    Immutable view of a user's available food logs, loaded with one values() query.
+
+    Rows are kept as parallel tuples (struct of arrays) ordered by expiry date;
+    `name_ids` index into `vocab` (distinct normalized names). Every aggregate is
+    computed in the same pass in from_rows(), so reading them is free and one
+    snapshot can be shared by the providers, the scorer and the summary.
+    """
+    today: date
+    ids: Tuple[int, ...] = ()
+    names: Tuple[str, ...] = ()
+    name_ids: Tuple[int, ...] = ()
+    vocab: Tuple[str, ...] = ()
+    quantities: Tuple[Decimal, ...] = ()
+    units: Tuple[str, ...] = ()
+    categories: Tuple[str, ...] = ()
+    expiry_dates: Tuple[date, ...] = ()
+    days_left: Tuple[int, ...] = ()
+
+    inventory_map: Mapping[str, Decimal] = field(default_factory=dict)
+    tokens: FrozenSet[str] = frozenset()
+    plain_tokens: FrozenSet[str] = frozenset()
+    expiry_weighted: Mapping[str, Mapping[str, Decimal]] = field(default_factory=dict)
+    quantity_by_unit: Mapping[str, float] = field(default_factory=dict)
+    category_breakdown: Mapping[str, Mapping[str, Decimal]] = field(default_factory=dict)
+    min_days_left: Mapping[str, int] = field(default_factory=dict)
+
+    @staticmethod
+    def queryset(user, today: date):
+        """The single query behind a snapshot (also used by explain_foodlog_queries)."""
+        return (
+            FoodLogSys.objects.filter(
+                user=user,
+                is_consumed=False,
+                expiry_date__gte=today,
+                quantity__gt=0,
+            )
+            .order_by("expiry_date", "id")
+            .values_list(*SNAPSHOT_FIELDS)
+        )
+
+    @classmethod
+    def load(cls, user, today: Optional[date] = None) -> "InventorySnapshot":
+        today = today or timezone.now().date()
+        return cls.from_rows(cls.queryset(user, today), today)
+
+    @classmethod
+    def from_rows(cls, rows, today: date) -> "InventorySnapshot":
+        ids, names, name_ids, quantities, units, categories, expiry_dates, days = ([] for _ in range(8))
+        vocab: Dict[str, int] = {}
+        inventory_map: Dict[str, Decimal] = {}
+        tokens = set()
+        weighted: Dict[str, Dict[str, Decimal]] = {}
+        by_unit: Dict[str, float] = {}
+        by_category: Dict[str, Dict[str, Decimal]] = {}
+        min_days: Dict[str, int] = {}
+
+        for log_id, name, name_normalized, quantity, unit, category, expiry_date in rows:
+            # name_normalized is written on save(); rows created around save() fall back
+            key = name_normalized or normalize_ingredient_name(name)
+            quantity = quantity or Decimal("0")
+            days_left = (expiry_date - today).days
+
+            ids.append(log_id)
+            names.append(name)
+            name_ids.append(vocab.setdefault(key, len(vocab)))
+            quantities.append(quantity)
+            units.append(unit)
+            categories.append(category)
+            expiry_dates.append(expiry_date)
+            days.append(days_left)
+
+            if key:
+                inventory_map[key] = inventory_map.get(key, Decimal("0")) + quantity
+                tokens.update(expand_normalized_tokens(key))
+                min_days[key] = min(min_days.get(key, days_left), days_left)
+
+                weight = max(1, 30 - days_left)  # More weight for sooner expiry
+                entry = weighted.setdefault(key, {"quantity": Decimal("0"), "weighted_score": 0})
+                entry["quantity"] += quantity
+                entry["weighted_score"] += quantity * weight
+
+            unit_key = unit or "unit"
+            by_unit[unit_key] = by_unit.get(unit_key, 0.0) + _to_float(quantity)
+
+            cat = category or "other"
+            bucket = by_category.setdefault(cat, {"count": 0, "total_quantity": Decimal("0")})
+            bucket["count"] += 1
+            bucket["total_quantity"] += quantity
+
+        return cls(
+            today=today,
+            ids=tuple(ids),
+            names=tuple(names),
+            name_ids=tuple(name_ids),
+            vocab=tuple(vocab),
+            quantities=tuple(quantities),
+            units=tuple(units),
+            categories=tuple(categories),
+            expiry_dates=tuple(expiry_dates),
+            days_left=tuple(days),
+            inventory_map=MappingProxyType(inventory_map),
+            tokens=frozenset(tokens),
+            plain_tokens=frozenset(k for k in vocab if k),
+            expiry_weighted=MappingProxyType(weighted),
+            quantity_by_unit=MappingProxyType(by_unit),
+            category_breakdown=MappingProxyType(by_category),
+            min_days_left=MappingProxyType(min_days),
+        )
+
+    def encode(self) -> bytes:
+        """
+        Compact cache payload: the row columns only (dates as ordinals, quantities
+        as decimal strings), JSON-encoded and zlib-compressed. Aggregates are
+        rebuilt by decode() without touching the database.
+        """
+        payload = [
+            SNAPSHOT_FORMAT,
+            self.today.toordinal(),
+            self.ids,
+            self.names,
+            self.vocab,
+            self.name_ids,
+            [str(q) for q in self.quantities],
+            self.units,
+            self.categories,
+            [d.toordinal() for d in self.expiry_dates],
+        ]
+        return zlib.compress(json.dumps(payload, separators=(",", ":")).encode("utf-8"))
+
+    @classmethod
+    def decode(cls, data: bytes) -> "InventorySnapshot":
+        fmt, today, ids, names, vocab, name_ids, quantities, units, categories, expiry = json.loads(
+            zlib.decompress(data)
+        )
+        if fmt != SNAPSHOT_FORMAT:
+            raise ValueError(f"Unknown inventory snapshot format {fmt}")
+        rows = zip(
+            ids,
+            names,
+            (vocab[i] for i in name_ids),
+            map(Decimal, quantities),
+            units,
+            categories,
+            map(date.fromordinal, expiry),
+        )
+        return cls.from_rows(rows, date.fromordinal(today))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def item(self, i: int) -> InventoryItem:
+        return InventoryItem(
+            id=self.ids[i],
+            name=self.names[i],
+            name_normalized=self.vocab[self.name_ids[i]],
+            quantity=self.quantities[i],
+            unit=self.units[i],
+            category=self.categories[i],
+            expiry_date=self.expiry_dates[i],
+            days_left=self.days_left[i],
+        )
+
+    def items(self) -> List[InventoryItem]:
+        return [self.item(i) for i in range(len(self))]
+
+    def expiring_within(self, days: int = EXPIRING_SOON_DAYS) -> List[int]:
+        """Row positions expiring within `days` (rows are sorted, so this is a prefix)."""
+        out = []
+        for i, d in enumerate(self.days_left):
+            if d > days:
+                break
+            out.append(i)
+        return out
+
+
+def snapshot_cache_key(user_id: int, version: int, today: date) -> str:
+    # the day is part of the key: rows drop out of the snapshot once they expire
+    return f"{SNAPSHOT_NAMESPACE}:{user_id}:v{version}:{today.isoformat()}"
+
+
+def get_inventory_snapshot(user, today: Optional[date] = None) -> InventorySnapshot:
+    """
+    Shared snapshot for (user, foodlog version, day), served from the cache so
+    planning and recommendation calls between pantry edits skip the database.
+    """
+    today = today or timezone.now().date()
+    key = snapshot_cache_key(user.id, get_foodlog_version(user.id), today)
+
+    data = cache.get(key)
+    if data is not None:
+        try:
+            return InventorySnapshot.decode(data)
+        except Exception:
+            logger.warning(f"InventorySnapshot: discarding unreadable cache entry {key}")
+
+    snapshot = InventorySnapshot.load(user, today)
+    cache.set(key, snapshot.encode(), timeout=SNAPSHOT_TTL_SECONDS)
+    return snapshot
+
+
 class InventoryService:
     """Service for managing user's food inventory for meal planning."""
     
-    def __init__(self, user):
+    def __init__(self, user, snapshot: Optional[InventorySnapshot] = None):
         self.user = user
+        self._snapshot = snapshot
         self._available_logs = None
-        self._inventory_tokens = None
-        self._inventory_map = None
+    @property
+    def snapshot(self) -> InventorySnapshot:
+        if self._snapshot is None:
+            self._snapshot = get_inventory_snapshot(self.user)
+        return self._snapshot
+
     @property
     def food_logs(self):
         return self.get_available_logs()
 
     @property
     def inventory_tokens(self):
-        # return cached tokens or compute them
-        if self._inventory_tokens is None:
-            return self.get_inventory_tokens()
-        return self._inventory_tokens
+        return self.get_inventory_tokens()
 
     @property
     def inventory_map(self):
-        if self._inventory_map is None:
-            return self.get_inventory_map()
-        return self._inventory_map
+        return self.get_inventory_map()
+
+    def has_items(self) -> bool:
+        return len(self.snapshot) > 0
 
     def get_available_logs(self):
-        # filter FoodLogSys for user, not expired, >0 quantity
+        # filter FoodLogSys for user, not expired, >0 quantity (model instances, when needed)
         if self._available_logs is None:
             self._available_logs = FoodLogSys.objects.filter(
                 user=self.user,
@@ -71,16 +293,8 @@ class InventoryService:
         return self._available_logs
 
     def get_inventory_tokens(self, use_synonyms=True):
-        tokens= set()
-        for log in self.get_available_logs():
-            if use_synonyms:
-                tokens.update(expand_ingredient_tokens(log.name))
-            else:
-                n = normalize_ingredient_name(log.name)
-                if n:
-                    tokens.add(n)
-        self._inventory_tokens = tokens
-        return self._inventory_tokens
+        snapshot = self.snapshot
+        return set(snapshot.tokens if use_synonyms else snapshot.plain_tokens)
 
     def map_food_logs(self):
         """
@@ -95,90 +309,45 @@ class InventoryService:
         """
         Get a mapping of normalized ingredient name → total quantity available.
         """
-        if self._inventory_map is None:
-            inventory = {}
-            
-            for log in self.get_available_logs():
-                key = normalize_ingredient_name(log.name)
-                if not key:
-                    continue
-                
-                from decimal import Decimal
-                # Aggregate quantities for same ingredient
-                inventory.setdefault(key, Decimal('0'))
-                inventory[key] += log.quantity
-            
-            self._inventory_map = inventory
-        
-        return self._inventory_map
+        return dict(self.snapshot.inventory_map)
 
-    # return set of normalized tokens using synonyms
     def get_expiry_weighted_inventory(self):
-        inventory = {}
-        for log in self.get_available_logs():
-            key = normalize_ingredient_name(log.name)
-            if not key:
-                continue
-            days_left = (log.expiry_date - timezone.now().date()).days
-            weight = max(1, 30 - days_left)  # More weight for sooner expiry
-            if key not in inventory:
-                inventory[key] = {'quantity': Decimal('0'), 'weighted_score': 0}
-            inventory[key]['quantity'] += log.quantity
-            inventory[key]['weighted_score'] += log.quantity * weight
-        return inventory
-    def get_expiry_soon(self ,days=3):
-        threshold_date = timezone.now().date() + timezone.timedelta(days=days)
-        return self.get_available_logs().filter(expiry_date__lte=threshold_date)
+        return {k: dict(v) for k, v in self.snapshot.expiry_weighted.items()}
+
+    def get_expiry_soon(self, days=EXPIRING_SOON_DAYS):
+        snapshot = self.snapshot
+        return [snapshot.item(i) for i in snapshot.expiring_within(days)]
+
+    def get_category_breakdown(self):
+        return {cat: dict(info) for cat, info in self.snapshot.category_breakdown.items()}
 
-        
     def get_food_log_summary(self):
-        ava = self.get_available_logs() or []
-        exp = self.get_expiry_soon(days=3) or []
+        snapshot = self.snapshot
+        exp = self.get_expiry_soon(days=EXPIRING_SOON_DAYS)
 
         # prepare serialized expiring items
         exp_items = []
         days_list = []
-        for log in (exp if hasattr(exp, "__iter__") else []):
-            expiry_date = getattr(log, "expiry_date", getattr(log, "expiryDate", None))
-            # compute days left safely
-            try:
-                days_left = (expiry_date - timezone.now().date()).days if expiry_date is not None else None
-            except Exception:
-                # fallback if expiry_date is a string
-                try:
-                    from datetime import datetime
-                    expiry_dt = datetime.fromisoformat(str(expiry_date)).date()
-                    days_left = (expiry_dt - timezone.now().date()).days
-                except Exception:
-                    days_left = None
-
-            days_left = 0 if days_left is None else max(0, int(days_left))
+        for log in exp:
+            days_left = max(0, int(log.days_left))
             days_list.append(days_left)
 
             exp_items.append({
-                "id": getattr(log, "id", None),
-                "name": getattr(log, "name", None),
-                "quantity": _to_float(getattr(log, "quantity", 0)),
-                "unit": getattr(log, "unit", None),
-                "expiry_date": getattr(expiry_date, "isoformat", lambda: expiry_date)(),
+                "id": log.id,
+                "name": log.name,
+                "quantity": _to_float(log.quantity),
+                "unit": log.unit,
+                "expiry_date": log.expiry_date.isoformat(),
                 "days_left": days_left,
-                "category": getattr(log, "category", None),
+                "category": log.category,
             })
 
-        total_items = _safe_count(ava)
-        unique_ingredients = len(self.map_food_logs() or {})
-
-        # aggregate quantities per unit (best-effort)
-        qty_by_unit = {}
-        for log in self.get_available_logs():
-            unit = getattr(log, "unit", "unit") or "unit"
-            qty_by_unit.setdefault(unit, 0.0)
-            qty_by_unit[unit] += _to_float(getattr(log, "quantity", 0))
+        total_items = len(snapshot)
+        unique_ingredients = len(snapshot.inventory_map)
 
         # category breakdown with percentages and float totals
-        raw_cat = self._get_category_breakdown(ava)
         by_category = {}
-        for cat, info in raw_cat.items():
+        for cat, info in snapshot.category_breakdown.items():
             count = info.get("count", 0)
             total_q = _to_float(info.get("total_quantity", 0))
             by_category[cat] = {
@@ -198,49 +367,32 @@ class InventoryService:
         return {
             "total_items": total_items,
             "unique_ingredients": unique_ingredients,
-            "expiring_soon": _safe_count(exp),
+            "expiring_soon": len(exp_items),
             "expiring_items": exp_items,
             "by_category": by_category,
-            "quantity_by_unit": qty_by_unit,
+            "quantity_by_unit": dict(snapshot.quantity_by_unit),
             "avg_days_left": avg_days_left,
             "soonest_expiring": soonest,
             "top_expiring": top_expiring,
             "generated_at": timezone.now().isoformat(),
         }
-    def _get_category_breakdown(self, food_logs):
-        category_map = {}
-        if not food_logs:
-            return category_map
-
-        for log in food_logs:
-            cat = getattr(log, "category", None) or "other"
-            qty = getattr(log, "quantity", 0) or 0
 
-            if cat not in category_map:
-                category_map[cat] = {"count": 0, "total_quantity": Decimal("0")}
+    def get_inventory_summary(self):
+        return self.get_food_log_summary()
 
-            category_map[cat]["count"] += 1
-            try:
-                category_map[cat]["total_quantity"] += qty if isinstance(qty, Decimal) else Decimal(str(qty))
-            except Exception:
-                pass
-
-        return category_map
     def has_ingredient(self, ingredient_name, minQ=None):
         norm = normalize_ingredient_name(ingredient_name)
-        n_map= self.map_food_logs()
+        n_map = self.snapshot.inventory_map
 
         if norm not in n_map:
             return False
         if minQ is not None:
             return n_map[norm] >= Decimal(str(minQ))
 
-        if self.inventory_tokens is None:
-            self.get_inventory_tokens()
-        return norm in self.inventory_tokens
+        return norm in self.snapshot.tokens
     def check_recipe_ingredients(self, recipe_ingredients):
         recipe_set = set(recipe_ingredients)
-        inventory_tokens = self.get_inventory_tokens(use_synonyms=True)
+        inventory_tokens = self.snapshot.tokens
         
         matched = recipe_set & inventory_tokens
         missing = recipe_set - inventory_tokens
@@ -257,8 +409,5 @@ class InventoryService:
     
     def clear_cache(self):
         """Clear cached data (useful after inventory changes)."""
+        self._snapshot = None
         self._available_logs = None
-        self._inventory_tokens = None
-        self._inventory_map = None
-
-
@@ -1,8 +1,7 @@
 from datetime import timedelta
 import logging
-from django.db import transaction
+from django.db import connection, transaction
 from meal_plans.models import MealPlan, MealPlanDay, MealPlanMeal
-from food.models import Meal
 
 logger = logging.getLogger(__name__)
 def _val(obj, key, default=None):
@@ -47,18 +46,44 @@ def _meta(obj, key, default=None):
 
 class MealPlanBuilder:
 
-    
-    def __init__(self, user, start_date, days, meals_per_day):
+    DEFAULT_MEAL_TIMES = ["breakfast", "lunch", "dinner", "snack"]
+
+    def __init__(self, user, start_date, days, meals_per_day, meal_times=None):
        
         self.user = user
         self.start_date = start_date
         self.days = days
         self.meals_per_day = meals_per_day
-        self.meal_times = ["breakfast", "lunch", "dinner", "snack"][:meals_per_day]
-    
+        self.meal_times = list(meal_times or self.DEFAULT_MEAL_TIMES)[:meals_per_day]
+
+    @staticmethod
+    def draft_meal(plan_day, meal_time, recipe):
+        """Unsaved MealPlanMeal holding the recipe as a draft (Meal is created on confirmation)."""
+        cuisine = _val(recipe, "cuisine", "")
+        cuisine = "" if cuisine is None else str(cuisine).strip()
+        mealdb_id = _meta(recipe, "mealdb_id") or _val(recipe, "mealdb_id") or _val(recipe, "idMeal")
+
+        return MealPlanMeal(
+            meal_plan_day=plan_day,
+            meal_time=meal_time,
+            meal=None,
+            draft_title=_s(_val(recipe, "title") or _val(recipe, "recipe")),
+            draft_ingredients=_list(_val(recipe, "ingredients")),
+            draft_steps=_list(_val(recipe, "steps") or _val(recipe, "instructions")),
+            draft_cuisine=cuisine,
+            draft_calories=_i(_val(recipe, "calories")),
+            draft_serving=_i(_val(recipe, "serving")),
+            draft_photo=_s(_val(recipe, "photo") or _val(recipe, "thumbnail")),
+            draft_source_mealdb_id=_s(mealdb_id),
+            is_skipped=False,
+        )
+
     @transaction.atomic
     def build(self, recipes):
-      
+        """
+        Write the plan with three INSERTs regardless of size: the MealPlan,
+        one bulk_create for its days and one for every meal.
+        """
         total_meals_needed = self.days * self.meals_per_day
         
         if len(recipes) < total_meals_needed:
@@ -76,89 +101,47 @@ class MealPlanBuilder:
         )
         
         logger.info(f"Created MealPlan {meal_plan.id} for user {self.user.id}")
-        
-        recipe_index = 0
-        meals_created = 0
-        
-        # Build each day
-        for day_offset in range(self.days):
-            current_date = self.start_date + timedelta(days=day_offset)
-            
-            # Create day
-            plan_day = MealPlanDay.objects.create(
+
+        plan_days = [
+            MealPlanDay(
                 meal_plan=meal_plan,
-                date=current_date,
+                date=self.start_date + timedelta(days=day_offset),
                 is_confirmed=False
             )
-            
-            logger.debug(f"Created MealPlanDay for {current_date}")
-            
-            # Add meals for this day
+            for day_offset in range(self.days)
+        ]
+        plan_days = self._create_days(meal_plan, plan_days)
+
+        # Assign recipes to slots in memory
+        meals = []
+        recipe_index = 0
+        for day_offset, plan_day in enumerate(plan_days):
             for meal_time in self.meal_times:
-                # Check if we have more recipes
                 if recipe_index >= len(recipes):
                     logger.warning(
                         f"Ran out of recipes at day {day_offset + 1}, {meal_time}. "
-                        f"Created {meals_created} meals total."
+                        f"Created {len(meals)} meals total."
                     )
                     break
-                
-                recipe = recipes[recipe_index]
-                cuisine = _val(recipe, "cuisine", "")
-                cuisine = "" if cuisine is None else str(cuisine).strip()
-
-                if cuisine is None:  # should never happen, but keep a hard guard
-                    cuisine = ""
-                mealdb_id = _meta(recipe, "mealdb_id") or _val(recipe, "mealdb_id") or _val(recipe, "idMeal")
-                mealdb_id = _s(mealdb_id)
+                meals.append(self.draft_meal(plan_day, meal_time, recipes[recipe_index]))
+                recipe_index += 1
 
+        MealPlanMeal.objects.bulk_create(meals)
 
-                # TEMP debug (remove later)
-                logger.error(
-                    "DEBUG draft_cuisine=%r type=%s recipe_class=%s recipe_repr=%r",
-                    cuisine,
-                    type(cuisine).__name__,
-                    type(recipe).__name__,
-                    str(recipe)[:500],
-                )
-                
-                # Create Meal object
-                MealPlanMeal.objects.create(
-                meal_plan_day=plan_day,
-                meal_time=meal_time,
-                meal=None,
-                draft_title=_s(_val(recipe, "title") or _val(recipe, "recipe")),
-                draft_ingredients=_list(_val(recipe, "ingredients")),
-                draft_steps=_list(_val(recipe, "steps") or _val(recipe, "instructions")),
-                draft_cuisine=cuisine,
-                draft_calories=_i(_val(recipe, "calories")),
-                draft_serving=_i(_val(recipe, "serving")),
-                draft_photo=_s(_val(recipe, "photo") or _val(recipe, "thumbnail")),
-                draft_source_mealdb_id=mealdb_id,
-                is_skipped=False,
-            )
-                
-                # Link meal to plan day
-                # MealPlanMeal.objects.create(
-                #     meal_plan_day=plan_day,
-                #     meal_time=meal_time,
-                #     meal=meal,
-                   
-                # )
-                
-                meals_created += 1
-                recipe_index += 1
-                
-                logger.debug(
-                    f"Added {meal_time} meal: {recipe.title} (source: {recipe.source})"
-                )
-        
         logger.info(
-            f"Successfully built meal plan {meal_plan.id} with {meals_created} meals "
+            f"Successfully built meal plan {meal_plan.id} with {len(meals)} meals "
             f"across {self.days} days"
         )
         
         return meal_plan
+
+    @staticmethod
+    def _create_days(meal_plan, plan_days):
+        created = MealPlanDay.objects.bulk_create(plan_days)
+        if connection.features.can_return_rows_from_bulk_insert:
+            return created
+        # backends without RETURNING: read the new rows back (dates are unique per plan)
+        return list(MealPlanDay.objects.filter(meal_plan=meal_plan).order_by("date"))
     
     def build_partial(self, recipes, skip_incomplete_days=False):
         
@@ -2,7 +2,7 @@
 MealPlanningService - Orchestrates the entire meal planning process.
 """
 import logging
-from typing import List
+from typing import List, Optional
 from .inventory import InventoryService
 from .recipe_scorer import RecipeScorer
 from .meal_plan_builder import MealPlanBuilder
@@ -23,14 +23,16 @@ class MealPlanningService:
         days,
         meals_per_day,
         providers: List[RecipeProvider],
-        use_diversity: bool = True
+        use_diversity: bool = True,
+        inventory: Optional[InventoryService] = None
     ):
         self.user = user
         self.start_date = start_date
         self.days = days
         self.meals_per_day = meals_per_day
         
-        self.inventory = InventoryService(user)
+        # share the providers' InventoryService so one snapshot serves the whole run
+        self.inventory = inventory or InventoryService(user)
         self.providers = providers
         self.scorer = RecipeScorer()
         self.builder = MealPlanBuilder(user, start_date, days, meals_per_day)
@@ -41,7 +43,7 @@ class MealPlanningService:
         Generate a complete meal plan.
         """
         # Step 1: Check inventory
-        if not self.inventory.get_available_logs().exists():
+        if not self.inventory.has_items():
             raise ValueError("No available food inventory to base meal plan on")
         
 
@@ -120,49 +122,38 @@ class MealPlanningService:
     
     def _score_simple(self, candidates, inventory_tokens, inventory_map):
         """Score recipes without diversity consideration."""
-        scored = []
-        
-        for recipe in candidates:
-            recipe_tokens = set(recipe.ingredient_tokens or [])
-            score = self.scorer.score(recipe_tokens, inventory_tokens, inventory_map)
-            scored.append((score, recipe))
-        
-        return scored
+        token_sets = [set(recipe.ingredient_tokens or []) for recipe in candidates]
+        scores = self.scorer.score_many(token_sets, inventory_tokens, inventory_map)
+        return list(zip(scores, candidates))
     
     def _score_with_diversity(self, candidates, inventory_tokens, inventory_map):
         """
         Score recipes with diversity (penalize repetition).
         """
         scored = []
-        used_tokens = set()
         
-        # First pass: score all recipes
-        initial_scores = []
-        for recipe in candidates:
-            recipe_tokens = set(recipe.ingredient_tokens or [])
-            # ✅ Pass inventory_map correctly
-            score = self.scorer.score(recipe_tokens, inventory_tokens, inventory_map)
-            initial_scores.append((score, recipe, recipe_tokens))
+        # First pass: score all recipes in one batch
+        token_sets = [set(recipe.ingredient_tokens or []) for recipe in candidates]
+        base_scores = self.scorer.score_many(token_sets, inventory_tokens, inventory_map)
+        initial_scores = list(zip(base_scores, candidates, token_sets))
         
         # Sort by initial score
         initial_scores.sort(key=lambda x: x[0] if x[0] else -1, reverse=True)
         
-        # Second pass: re-score with diversity consideration
-        for base_score, recipe, recipe_tokens in initial_scores:
+        # Second pass: diversity against tokens used by higher-ranked recipes
+        diversity_scores = self.scorer.score_diversity_sequence(
+            [recipe_tokens for _, _, recipe_tokens in initial_scores]
+        )
+        
+        for (base_score, recipe, _), diversity_score in zip(initial_scores, diversity_scores):
             if base_score is None:
                 scored.append((None, recipe))
                 continue
             
-            # Calculate diversity bonus/penalty
-            diversity_score = self.scorer.score_diversity(recipe_tokens, used_tokens)
-            
             # Combine scores (70% match, 30% diversity)
             final_score = base_score * 0.7 + diversity_score * 0.3
             
             scored.append((final_score, recipe))
-            
-            # Update used tokens (for next iteration)
-            used_tokens.update(recipe_tokens)
         
         return scored
     
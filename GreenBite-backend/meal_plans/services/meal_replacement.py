@@ -7,6 +7,7 @@ from django.db import transaction
 from meal_plans.models import MealPlanMeal
 from food.models import Meal
 from .inventory import InventoryService
+from .plan_detail import invalidate_plan_detail
 from .recipeProvider import MealDBRecipeProvider, AIRecipeProvider
 
 logger = logging.getLogger(__name__)
@@ -47,7 +48,7 @@ def replace_meal(meal_plan_meal_id, user, use_ai=True):
     # Get user's inventory
     inventory = InventoryService(user)
     
-    if not inventory.get_available_logs().exists():
+    if not inventory.has_items():
         raise ValueError("No available ingredients to generate alternative meal")
     
     # Get alternative recipes
@@ -98,6 +99,7 @@ def replace_meal(meal_plan_meal_id, user, use_ai=True):
     meal_plan_meal.is_replaced = True
     meal_plan_meal.replaced_at = timezone.now()
     meal_plan_meal.save(update_fields=['meal', 'is_replaced', 'replaced_at', 'original_meal'])
+    invalidate_plan_detail(meal_plan_meal.meal_plan_day.meal_plan_id)
     
     logger.info(
         f"Replaced meal {meal_plan_meal.id}: "
@@ -0,0 +1,203 @@
+"""
+Fast read path for MealPlanDetailAPIView.
+
+Builds the same JSON as MealPlanDetailSerializer from flat values() rows
+(plan, days, meals joined to Meal/original Meal, planned usages) instead of
+model instances and per-field SerializerMethodFields, and caches the result
+per (plan id, plan version, meals and food log list versions). Field
+formatting reuses the DRF field classes so dates, datetimes and decimals
+render exactly as the serializer renders them.
+"""
+import hashlib
+from typing import Optional
+
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework import serializers
+
+from food.utils.caching import bump_meal_plan_version, get_foodlog_version, get_list_version, get_meal_plan_version
+from meal_plans.models import MealPlan, MealPlanDay, MealPlanFoodUsage, MealPlanMeal
+
+DETAIL_NAMESPACE = "mealplan:detail"
+DETAIL_TTL_SECONDS = 60 * 5
+
+_date = serializers.DateField()
+_datetime = serializers.DateTimeField()
+_quantity = serializers.DecimalField(max_digits=10, decimal_places=2)
+
+MEAL_COLUMNS = (
+    "id",
+    "meal_plan_day_id",
+    "meal_time",
+    "is_skipped",
+    "meal_id",
+    "is_replaced",
+    "replaced_at",
+    "draft_title",
+    "draft_ingredients",
+    "draft_steps",
+    "draft_cuisine",
+    "draft_calories",
+    "draft_serving",
+    "draft_photo",
+    "draft_source_mealdb_id",
+    "meal__recipe",
+    "meal__cuisine",
+    "meal__calories",
+    "meal__serving",
+    "meal__ingredients",
+    "meal__steps",
+    "meal__photo",
+    "meal__source_mealdb_id",
+    "original_meal__recipe",
+)
+
+
+def _dt(value):
+    return _datetime.to_representation(value) if value is not None else None
+
+
+def _photo(row, request):
+    value = row["meal__photo"] if row["meal_id"] is not None else None
+    if not value:
+        value = row["draft_photo"]
+    if not value:
+        return None
+    url = str(value)
+    return request.build_absolute_uri(url) if request and url.startswith("/") else url
+
+
+def _meal_payload(row, usages, request):
+    """One MealPlanMealNestedSerializer item (confirmed Meal first, draft fields as fallback)."""
+    title = row["meal__recipe"] or row["draft_title"] or None
+
+    calories = row["meal__calories"]
+    serving = row["meal__serving"]
+    ingredients = row["meal__ingredients"]
+    steps = row["meal__steps"]
+    if steps is None:
+        steps = row["draft_steps"] or []
+    if isinstance(steps, list):
+        instructions = "\n".join([str(s) for s in steps if s])
+    else:
+        instructions = str(steps) if steps else None
+
+    photo = _photo(row, request)
+    confirmed_source = row["meal__source_mealdb_id"] if row["meal_id"] is not None else None
+
+    return {
+        "id": row["id"],
+        "meal_time": row["meal_time"],
+        "is_skipped": row["is_skipped"],
+        "meal": row["meal_id"],
+        "title": title,
+        "recipe": title,
+        "cuisine": row["meal__cuisine"] or (row["draft_cuisine"] or None),
+        "calories": calories if calories is not None else row["draft_calories"],
+        "serving": serving if serving is not None else row["draft_serving"],
+        "ingredients": ingredients if ingredients is not None else (row["draft_ingredients"] or []),
+        "steps": steps,
+        "instructions": instructions,
+        "photo": photo,
+        "thumbnail": photo,
+        "source_mealdb_id": confirmed_source or row["draft_source_mealdb_id"] or None,
+        "draft_source_mealdb_id": row["draft_source_mealdb_id"],
+        "planned_usages": usages,
+        "is_replaced": row["is_replaced"],
+        "replaced_at": _dt(row["replaced_at"]),
+        "original_recipe": row["original_meal__recipe"],
+    }
+
+
+def build_plan_detail(plan_id: int, user, request=None) -> Optional[dict]:
+    """Plan detail payload from four flat queries, or None if the plan is not the user's."""
+    plan = (
+        MealPlan.objects.filter(id=plan_id, user=user)
+        .values("id", "start_date", "days", "is_confirmed", "created_at")
+        .first()
+    )
+    if plan is None:
+        return None
+
+    days = list(
+        MealPlanDay.objects.filter(meal_plan_id=plan_id)
+        .order_by("date")
+        .values("id", "date", "is_confirmed", "confirmed_at")
+    )
+
+    usages_by_meal = {}
+    usage_rows = (
+        MealPlanFoodUsage.objects.filter(meal_plan_meal__meal_plan_day__meal_plan_id=plan_id)
+        .order_by("id")
+        .values_list("id", "meal_plan_meal_id", "food_log_id", "food_log__name", "planned_quantity")
+    )
+    for usage_id, meal_id, food_log_id, food_name, quantity in usage_rows:
+        usages_by_meal.setdefault(meal_id, []).append({
+            "id": usage_id,
+            "food_log": food_log_id,
+            "food_name": food_name,
+            "planned_quantity": _quantity.to_representation(quantity),
+        })
+
+    meals_by_day = {}
+    meal_rows = (
+        MealPlanMeal.objects.filter(meal_plan_day__meal_plan_id=plan_id)
+        .order_by("meal_plan_day__date", "meal_time")
+        .values(*MEAL_COLUMNS)
+    )
+    for row in meal_rows:
+        meals_by_day.setdefault(row["meal_plan_day_id"], []).append(
+            _meal_payload(row, usages_by_meal.get(row["id"], []), request)
+        )
+
+    return {
+        "id": plan["id"],
+        "start_date": _date.to_representation(plan["start_date"]),
+        "days": plan["days"],
+        "is_confirmed": plan["is_confirmed"],
+        "created_at": _dt(plan["created_at"]),
+        "days_plan": [
+            {
+                "id": day["id"],
+                "date": _date.to_representation(day["date"]),
+                "is_confirmed": day["is_confirmed"],
+                "confirmed_at": _dt(day["confirmed_at"]),
+                "meals": meals_by_day.get(day["id"], []),
+            }
+            for day in days
+        ],
+    }
+
+
+def plan_detail_cache_key(plan_id: int, user, request=None) -> str:
+    # photos may be made absolute against the request host, so the host is part of the key
+    base = request.build_absolute_uri("/") if request else ""
+    digest = hashlib.sha256(base.encode("utf-8")).hexdigest()[:16]
+    version = get_meal_plan_version(plan_id)
+    # confirmed Meals are edited through the meals endpoints, which bump this list version
+    meals_version = get_list_version("meals", user.id)
+    # planned usages show the food log's name, which pantry edits change
+    foodlog_version = get_foodlog_version(user.id)
+    return f"{DETAIL_NAMESPACE}:{user.id}:{plan_id}:v{version}:m{meals_version}:f{foodlog_version}:{digest}"
+
+
+def get_plan_detail(plan_id: int, user, request=None) -> Optional[dict]:
+    key = plan_detail_cache_key(plan_id, user, request)
+    data = cache.get(key)
+    if data is None:
+        data = build_plan_detail(plan_id, user, request)
+        if data is not None:
+            cache.set(key, data, timeout=DETAIL_TTL_SECONDS)
+    return data
+
+
+def invalidate_plan_detail(*plan_ids: int) -> None:
+    """Retire cached plan details now and again on commit (readers may race the transaction)."""
+    plan_ids = {pid for pid in plan_ids if pid is not None}
+    for plan_id in plan_ids:
+        bump_meal_plan_version(plan_id)
+
+    def _bump():
+        for plan_id in plan_ids:
+            bump_meal_plan_version(plan_id)
+    transaction.on_commit(_bump)
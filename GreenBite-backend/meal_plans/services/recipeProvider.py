@@ -2,11 +2,11 @@ from decimal import Decimal
 from .inventory import InventoryService
 from abc import ABC, abstractmethod
 from .ai_fallback import generate_ai_recipes as generate_ai_recipes_raw
+from .recipe_index import get_recipe_index, score_counts
 
 from typing import List, Dict, Any , Optional
 from recipes.models import MealDBRecipe
 import logging
-from django.db.models import Q
 
 
 logging.basicConfig(level=logging.INFO)
@@ -51,11 +51,7 @@ class RecipeProvider(ABC):
         rec=set(recipe_tokens)
         if not rec or not self.inventory_tokens:
             return {"score": 0.0, "matched": 0, "missed": len(rec), "match_ratio": 0.0}
-        matched = len(rec & self.inventory_tokens)
-        missed = len(rec) - matched
-        match_ratio = matched / len(rec) if rec else 0.0
-        score = matched * 3 + match_ratio * 10 - missed
-        return {"score": score, "matched": matched, "missed": missed, "match_ratio": match_ratio}
+        return score_counts(len(rec & self.inventory_tokens), len(rec))
     def check_recipe_visibility(self, recipe_tokens: List[str], min_ratio: float=0.4) -> bool:
         score = self.score_recipe(recipe_tokens)
         return score["match_ratio"] >= min_ratio
@@ -70,8 +66,8 @@ class AIRecipeProvider(RecipeProvider):
         if (not self.inventory_tokens):
             logger.warning("No inventory tokens available for AI recipe generation")
             return []
-        foodlog= self.inventory_service.get_available_logs()
-        if not foodlog.exists():
+        foodlog = self.inventory_service.snapshot.items()
+        if not foodlog:
             logger.warning("No available food logs for AI recipe generation")
             return []
         try:
@@ -104,52 +100,51 @@ class AIRecipeProvider(RecipeProvider):
 class MealDBRecipeProvider(RecipeProvider):
     def find_recipes(self, limit: int = 30) -> List[RecipeCandidate]:
         logger.info(f"MealDBRecipeProvider: Fetching recipes with ingredient overlap.")
-        inventory_ings = list(self.inventory_tokens)
         if not self.inventory_tokens:
             logger.warning("No inventory tokens available for MealDB search")
             return []
-    
-        query = Q()
-        for ing in inventory_ings:
-            query |= Q(ingredient_tokens__contains=[ing])
-        #fetch
-                
-        candidate_recipes = MealDBRecipe.objects.filter(
-            query
-        ).only("id", "title", "ingredient_tokens", "instructions", "thumbnail", "ingredients","category","cuisine")
-        logger.info(f"MealDB: Found {candidate_recipes.count()} candidate recipes")
+
+        # candidate generation + scoring run against the in-memory index,
+        # only the top `limit` rows are loaded from the DB
+        matches = get_recipe_index().top_k(self.inventory_tokens, limit)
+        logger.info(f"MealDB: Found {len(matches)} candidate recipes")
+        if not matches:
+            return []
+
+        rows = MealDBRecipe.objects.only(
+            "id", "mealdb_id", "title", "ingredient_tokens", "instructions", "thumbnail", "ingredients", "category", "cuisine"
+        ).in_bulk([m.recipe_id for m in matches])
 
         recipes = []
-        for recipe in candidate_recipes:
-            rec_tokens = recipe.ingredient_tokens or []
-            score_data = self.score_recipe(rec_tokens)
-            if score_data.get("matched", 0) > 0:
-                candidate = RecipeCandidate(
-                    title=recipe.title,
-                    ingredients=recipe.ingredients or [],
-                    source="mealdb",
-                    thumbnail=recipe.thumbnail,
-                    instructions=recipe.instructions,
-                    ingredient_tokens=rec_tokens,
-                    cuisine=recipe.cuisine,
-                    metadata={
-                        'recipe_id': recipe.id,
-                        'category': recipe.category,
-                        'cuisine': recipe.cuisine,
-                        'mealdb_id': recipe.mealdb_id,
-                    }
-                )
+        for match in matches:
+            recipe = rows.get(match.recipe_id)
+            if recipe is None:
+                # deleted since the index was built
+                continue
+            candidate = RecipeCandidate(
+                title=recipe.title,
+                ingredients=recipe.ingredients or [],
+                source="mealdb",
+                thumbnail=recipe.thumbnail,
+                instructions=recipe.instructions,
+                ingredient_tokens=recipe.ingredient_tokens or [],
+                cuisine=recipe.cuisine,
+                metadata={
+                    'recipe_id': recipe.id,
+                    'category': recipe.category,
+                    'cuisine': recipe.cuisine,
+                    'mealdb_id': recipe.mealdb_id,
+                }
+            )
 
-                candidate.score = score_data.get("score", 0)
-                candidate.metadata.update({
-                    'matched_ingredients': score_data.get('matched', 0),
-                    'missing_ingredients': score_data.get('missing', 0),
-                    'match_ratio': score_data.get('match_ratio', 0.0),
-                })
-                recipes.append(candidate)
-            logger.info(f"MealDBRecipeProvider: Found {len(recipes)} suitable recipes.")
-            recipes.sort(key=lambda r: r.score, reverse=True)
-        recipes = recipes[:limit]
+            candidate.score = match.score
+            candidate.metadata.update({
+                'matched_ingredients': match.matched,
+                'missing_ingredients': match.missed,
+                'match_ratio': match.match_ratio,
+            })
+            recipes.append(candidate)
+        logger.info(f"MealDBRecipeProvider: Found {len(recipes)} suitable recipes.")
         return recipes
     def find_by_category(self, category: str, limit: int = 10) -> List[RecipeCandidate]:
         logger.info(f"MealDBRecipeProvider: Fetching recipes in category '{category}'")
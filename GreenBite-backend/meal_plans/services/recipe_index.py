@@ -0,0 +1,142 @@
+"""
+RecipeTokenIndex - process-local inverted index over MealDBRecipe.ingredient_tokens.
+
+Built once per worker from the catalog and rebuilt lazily whenever the global
+catalog version changes (see food.utils.caching.bump_catalog_version).
+"""
+import heapq
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from food.utils.caching import get_catalog_version
+from recipes.models import MealDBRecipe
+
+logger = logging.getLogger(__name__)
+
+
+def score_counts(matched: int, total: int) -> Dict[str, float]:
+    """
+    Overlap score shared by RecipeProvider.score_recipe and the index.
+    """
+    missed = total - matched
+    match_ratio = matched / total if total else 0.0
+    score = matched * 3 + match_ratio * 10 - missed
+    return {"score": score, "matched": matched, "missed": missed, "match_ratio": match_ratio}
+
+
+@dataclass(frozen=True)
+class IndexMatch:
+    recipe_id: int
+    score: float
+    matched: int
+    missed: int
+    match_ratio: float
+
+
+class RecipeTokenIndex:
+    """
+    token -> posting list of recipe positions, plus per-recipe token counts.
+
+    Positions follow the catalog's default ordering (title), so ties keep the
+    same order the ORM-based search used to return.
+    """
+
+    def __init__(self, rows: Iterable[Tuple[int, Optional[List[str]]]], version: int = 0):
+        self.version = version
+        self._ids: List[int] = []
+        self._token_counts: List[int] = []
+        postings: Dict[str, List[int]] = {}
+
+        for pos, (recipe_id, tokens) in enumerate(rows):
+            unique = set(tokens or [])
+            self._ids.append(recipe_id)
+            self._token_counts.append(len(unique))
+            for token in unique:
+                postings.setdefault(token, []).append(pos)
+
+        self._postings: Dict[str, Tuple[int, ...]] = {t: tuple(p) for t, p in postings.items()}
+
+    @classmethod
+    def build(cls, version: int = 0) -> "RecipeTokenIndex":
+        started = time.perf_counter()
+        rows = MealDBRecipe.objects.order_by("title", "id").values_list("id", "ingredient_tokens")
+        index = cls(rows.iterator(chunk_size=2000), version=version)
+        logger.info(
+            f"RecipeTokenIndex: built v{version} with {len(index)} recipes, "
+            f"{len(index._postings)} tokens in {(time.perf_counter() - started) * 1000:.1f}ms"
+        )
+        return index
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def match_counts(self, inventory_tokens: Iterable[str]) -> Dict[int, int]:
+        """Return {position: matched_token_count} for recipes sharing any token."""
+        counts: Dict[int, int] = {}
+        for token in set(inventory_tokens or ()):
+            for pos in self._postings.get(token, ()):
+                counts[pos] = counts.get(pos, 0) + 1
+        return counts
+
+    def candidate_ids(self, tokens: Iterable[str]) -> List[int]:
+        """Ids of recipes sharing at least one token (order not significant)."""
+        return [self._ids[pos] for pos in self.match_counts(tokens)]
+
+    def top_k(self, inventory_tokens: Iterable[str], k: int = 30) -> List[IndexMatch]:
+        """
+        Score every recipe that shares at least one token with the inventory and
+        return the best k, highest score first.
+        """
+        if k <= 0:
+            return []
+
+        counts = self.match_counts(inventory_tokens)
+        if not counts:
+            return []
+
+        scored = []
+        for pos, matched in counts.items():
+            data = score_counts(matched, self._token_counts[pos])
+            scored.append((data["score"], -pos, data))
+
+        best = heapq.nlargest(k, scored, key=lambda x: (x[0], x[1]))
+        return [
+            IndexMatch(
+                recipe_id=self._ids[-neg_pos],
+                score=score,
+                matched=data["matched"],
+                missed=data["missed"],
+                match_ratio=data["match_ratio"],
+            )
+            for score, neg_pos, data in best
+        ]
+
+
+_index: Optional[RecipeTokenIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_recipe_index() -> RecipeTokenIndex:
+    """
+    Shared index for this process; rebuilt when the catalog version moves.
+    """
+    global _index
+    version = get_catalog_version()
+    index = _index
+    if index is not None and index.version == version:
+        return index
+
+    with _index_lock:
+        if _index is None or _index.version != version:
+            _index = RecipeTokenIndex.build(version=version)
+        return _index
+
+
+def reset_recipe_index() -> None:
+    """Drop the cached index (next access rebuilds it)."""
+    global _index
+    with _index_lock:
+        _index = None
@@ -2,12 +2,31 @@
 RecipeScorer - Scores recipe candidates based on various criteria.
 """
 import logging
-from typing import Set, Dict, Any, Optional
+from typing import Set, Dict, Any, Optional, Iterable, List, Tuple
 from decimal import Decimal
 
+import numpy as np
+
 logger = logging.getLogger(__name__)
 
 
+def _encode_tokens(token_sets: List[Set[str]]) -> Tuple[Dict[str, int], np.ndarray, np.ndarray]:
+    """
+    Encode recipes as a sparse (CSR-style) token-id matrix.
+
+    Returns (vocab, indices, row_ids): `indices[j]` is the token id of the j-th
+    non-zero entry and `row_ids[j]` the recipe it belongs to.
+    """
+    vocab: Dict[str, int] = {}
+    indices: List[int] = []
+    row_ids: List[int] = []
+    for row, tokens in enumerate(token_sets):
+        for token in tokens:
+            indices.append(vocab.setdefault(token, len(vocab)))
+            row_ids.append(row)
+    return vocab, np.asarray(indices, dtype=np.int64), np.asarray(row_ids, dtype=np.int64)
+
+
 class RecipeScorer:
     """
     Scores recipe candidates based on inventory match, variety, and other factors.
@@ -77,6 +96,105 @@ class RecipeScorer:
         
         return score
     
+    def score_many(
+        self,
+        recipe_token_sets: Iterable[Iterable[str]],
+        inventory_tokens: Set[str],
+        inventory_map: Optional[Dict[str, Decimal]] = None
+    ) -> List[Optional[float]]:
+        """
+        Batch version of score(): one result per recipe, in input order.
+
+        Recipes are encoded as a sparse token-id matrix and the inventory as a
+        bit vector over the same vocabulary, so matched/missing/ratio/abundance
+        are computed for all candidates at once. Results are identical to
+        calling score() per recipe.
+        """
+        token_sets = [set(t or ()) for t in recipe_token_sets]
+        n = len(token_sets)
+        if n == 0:
+            return []
+
+        if not isinstance(inventory_tokens, set):
+            inventory_tokens = set(inventory_tokens) if inventory_tokens else set()
+
+        vocab, indices, row_ids = _encode_tokens(token_sets)
+        lengths = np.fromiter((len(t) for t in token_sets), dtype=np.int64, count=n)
+
+        in_inventory = np.zeros(len(vocab), dtype=bool)
+        for token in inventory_tokens:
+            tid = vocab.get(token)
+            if tid is not None:
+                in_inventory[tid] = True
+
+        hits = in_inventory[indices]
+        matched = np.bincount(row_ids, weights=hits, minlength=n).astype(np.int64)
+        missing = lengths - matched
+        safe_lengths = np.where(lengths > 0, lengths, 1)
+        match_ratio = matched / safe_lengths
+
+        scores = (
+            matched * self.match_weight +
+            match_ratio * self.ratio_weight -
+            missing * self.missing_penalty
+        )
+
+        if inventory_map and isinstance(inventory_map, dict):
+            # Decimal thresholds are evaluated once per vocabulary token, not per recipe
+            token_bonus = np.zeros(len(vocab), dtype=np.float64)
+            for token, tid in vocab.items():
+                if in_inventory[tid]:
+                    token_bonus[tid] = self._quantity_bonus(inventory_map.get(token, Decimal('0')))
+            scores = scores + np.bincount(row_ids, weights=token_bonus[indices] * hits, minlength=n)
+
+        return [float(scores[i]) if lengths[i] else None for i in range(n)]
+
+    def score_diversity_sequence(
+        self,
+        recipe_token_sets: Iterable[Iterable[str]],
+        already_used_tokens: Optional[Set[str]] = None
+    ) -> List[float]:
+        """
+        Diversity score for each recipe in order, where every recipe's tokens
+        count as "already used" for the recipes after it.
+
+        Equivalent to calling score_diversity() in a loop and updating the
+        used-token set after each call.
+        """
+        token_sets = [set(t or ()) for t in recipe_token_sets]
+        n = len(token_sets)
+        if n == 0:
+            return []
+
+        vocab, indices, row_ids = _encode_tokens(token_sets)
+        lengths = np.fromiter((len(t) for t in token_sets), dtype=np.int64, count=n)
+
+        # first row in which each token appears; pre-used tokens count as row -1
+        first_row = np.full(len(vocab), n, dtype=np.int64)
+        np.minimum.at(first_row, indices, row_ids)
+        for token in (already_used_tokens or ()):
+            tid = vocab.get(token)
+            if tid is not None:
+                first_row[tid] = -1
+
+        seen_before = first_row[indices] < row_ids
+        overlap = np.bincount(row_ids, weights=seen_before, minlength=n).astype(np.int64)
+        safe_lengths = np.where(lengths > 0, lengths, 1)
+        diversity = 10.0 * (1 - overlap / safe_lengths)
+
+        return [float(diversity[i]) if lengths[i] else 0.0 for i in range(n)]
+
+    @staticmethod
+    def _quantity_bonus(quantity) -> float:
+        # Give small bonus for high quantities
+        if quantity > 1000:  # grams
+            return 2.0
+        elif quantity > 500:
+            return 1.0
+        elif quantity > 200:
+            return 0.5
+        return 0.0
+
     def _calculate_abundance_bonus(
         self,
         matched_tokens: Set[str],
@@ -94,14 +212,7 @@ class RecipeScorer:
         for token in matched_tokens:
             # ✅ Use .get() to safely access dict
             quantity = inventory_map.get(token, Decimal('0'))
-            
-            # Give small bonus for high quantities
-            if quantity > 1000:  # grams
-                bonus += 2.0
-            elif quantity > 500:
-                bonus += 1.0
-            elif quantity > 200:
-                bonus += 0.5
+            bonus += self._quantity_bonus(quantity)
         
         return bonus
     
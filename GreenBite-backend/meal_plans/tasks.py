@@ -132,7 +132,8 @@ def async_generate_meal_plan(
             days=days,
             meals_per_day=meals_per_day,
             providers=providers,
-            use_diversity=True
+            use_diversity=True,
+            inventory=inventory
         )
         
         meal_plan = service.generate()
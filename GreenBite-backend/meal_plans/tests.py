@@ -1,17 +1,48 @@
+import json
 from decimal import Decimal
+from unittest.mock import patch
 
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 from rest_framework import status
-from rest_framework.test import APIClient
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
 
-from food.models import FoodLogSys
+from food.models import FoodLogSys, Meal
 from meal_plans.models import MealPlan, MealPlanDay, MealPlanMeal, MealPlanFoodUsage
+from meal_plans.services import confirmeal
+from meal_plans.services.confirmeal import confirm_meal_plan, confirm_meal_plan_day
+from meal_plans.services.inventory import InventoryService, InventorySnapshot
+from meal_plans.services.meal_plan_builder import MealPlanBuilder
+from meal_plans.services.meal_planning_service import MealPlanningService
+from meal_plans.services.plan_detail import build_plan_detail, get_plan_detail
+from meal_plans.services.recipeProvider import MealDBRecipeProvider, RecipeCandidate
+from meal_plans.services.recipe_index import RecipeTokenIndex, get_recipe_index
+from meal_plans.services.recipe_scorer import RecipeScorer
+from meal_plans.serializers import MealPlanDetailSerializer
+from project.utils import ingredient_synonyms
+from project.utils.ingredient_synonyms import (
+    compile_synonyms,
+    expand_ingredient_tokens,
+    get_base_ingredient,
+    reload_synonyms,
+)
+from recipes.models import MealDBRecipe
 
 
 API_PREFIX = "/api/meal_plans/"
 
+TEST_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "meal-plans-test-cache",
+    }
+}
+
 
 class MealPlanAPITestCase(TestCase):
     def setUp(self):
@@ -79,7 +110,7 @@ class MealPlanAPITestCase(TestCase):
 
         resp = self.client.get(f"{API_PREFIX}")
         self.assertEqual(resp.status_code, status.HTTP_200_OK)
-        self.assertIsInstance(resp.data, list)
+        self.assertIsInstance(resp.data["results"], list)
 
     def test_get_meal_plan_detail(self):
         plan = MealPlan.objects.create(user=self.user, start_date=timezone.now().date(), days=1)
@@ -150,3 +181,573 @@ class MealPlanUnauthorizedTestCase(TestCase):
     def test_generate_requires_auth(self):
         resp = self.client.post(f"{API_PREFIX}generate/", {"days": 1, "meals_per_day": 1}, format="json")
         self.assertEqual(resp.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class RecipeTokenIndexTestCase(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="index_user@test.com", password="123456"
+        )
+        FoodLogSys.objects.create(
+            user=self.user,
+            name="Egg",
+            quantity=Decimal("6"),
+            unit="pcs",
+            expiry_date=timezone.now().date() + timezone.timedelta(days=10),
+        )
+        FoodLogSys.objects.create(
+            user=self.user,
+            name="Rice",
+            quantity=Decimal("500"),
+            unit="g",
+            expiry_date=timezone.now().date() + timezone.timedelta(days=10),
+        )
+        self.fried_rice = MealDBRecipe.objects.create(
+            mealdb_id="idx-1", title="Egg Fried Rice",
+            ingredients=[{"name": "Egg"}, {"name": "Rice"}, {"name": "Soy Sauce"}],
+        )
+        self.omelette = MealDBRecipe.objects.create(
+            mealdb_id="idx-2", title="Omelette", ingredients=[{"name": "Egg"}],
+        )
+        MealDBRecipe.objects.create(
+            mealdb_id="idx-3", title="Beef Stew", ingredients=[{"name": "Beef"}, {"name": "Carrot"}],
+        )
+
+    def test_top_k_scores_match_score_recipe(self):
+        index = RecipeTokenIndex.build()
+        provider = MealDBRecipeProvider(InventoryService(self.user))
+
+        with self.assertNumQueries(0):
+            matches = index.top_k(provider.inventory_tokens, 10)
+
+        # full match on a one-ingredient recipe outranks 2/3 on fried rice
+        self.assertEqual([m.recipe_id for m in matches], [self.omelette.id, self.fried_rice.id])
+        for m in matches:
+            recipe = MealDBRecipe.objects.get(id=m.recipe_id)
+            expected = provider.score_recipe(recipe.ingredient_tokens)
+            self.assertEqual(m.score, expected["score"])
+            self.assertEqual(m.matched, expected["matched"])
+            self.assertEqual(m.missed, expected["missed"])
+
+    def test_index_rebuilds_when_catalog_changes(self):
+        before = get_recipe_index()
+        MealDBRecipe.objects.create(mealdb_id="idx-4", title="Boiled Egg", ingredients=[{"name": "Egg"}])
+        after = get_recipe_index()
+
+        self.assertIsNot(before, after)
+        self.assertEqual(len(after), len(before) + 1)
+
+    def test_find_recipes_uses_index(self):
+        provider = MealDBRecipeProvider(InventoryService(self.user))
+        recipes = provider.find_recipes(limit=2)
+
+        self.assertEqual([r.metadata["recipe_id"] for r in recipes], [self.omelette.id, self.fried_rice.id])
+        self.assertEqual(recipes[1].metadata["missing_ingredients"], 1)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class InventorySnapshotTestCase(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="snapshot_user@test.com", password="123456"
+        )
+        today = timezone.now().date()
+
+        def log(name, qty, unit, category, days, **extra):
+            return FoodLogSys.objects.create(
+                user=self.user, name=name, quantity=Decimal(qty), unit=unit,
+                category=category, expiry_date=today + timezone.timedelta(days=days), **extra
+            )
+
+        self.eggs = log("Eggs", "6", "pcs", "dairy", 1)
+        self.egg = log("Egg", "4", "pcs", "dairy", 2)
+        self.rice = log("Rice", "500", "g", "grain", 10)
+        log("Milk", "1", "l", "dairy", 5, is_consumed=True)
+        log("Bread", "1", "pcs", "bread", -1)
+        log("Garbanzo Beans", "0", "g", "grain", 20)
+
+    def test_aggregates_come_from_one_query(self):
+        inv = InventoryService(self.user)
+
+        with self.assertNumQueries(1):
+            tokens = inv.get_inventory_tokens()
+            inventory_map = inv.get_inventory_map()
+            weighted = inv.get_expiry_weighted_inventory()
+            breakdown = inv.get_category_breakdown()
+            summary = inv.get_food_log_summary()
+            self.assertTrue(inv.has_ingredient("eggs", minQ=10))
+
+        self.assertEqual(inventory_map, {"egg": Decimal("10"), "rice": Decimal("500")})
+        self.assertIn("egg", tokens)
+        self.assertEqual(inv.get_inventory_tokens(use_synonyms=False), {"egg", "rice"})
+        self.assertEqual(weighted["egg"]["weighted_score"], Decimal("6") * 29 + Decimal("4") * 28)
+        self.assertEqual(breakdown["dairy"], {"count": 2, "total_quantity": Decimal("10")})
+
+        self.assertEqual(summary["total_items"], 3)
+        self.assertEqual(summary["unique_ingredients"], 2)
+        self.assertEqual(summary["expiring_soon"], 2)
+        self.assertEqual([i["id"] for i in summary["expiring_items"]], [self.eggs.id, self.egg.id])
+        self.assertEqual(summary["expiring_items"][0]["quantity"], 6.0)
+        self.assertEqual(summary["by_category"]["dairy"], {"count": 2, "total_quantity": 10.0, "share": 66.7})
+        self.assertEqual(summary["quantity_by_unit"], {"pcs": 10.0, "g": 500.0})
+        self.assertEqual(summary["avg_days_left"], 1.5)
+        self.assertEqual(summary["soonest_expiring"]["name"], "Eggs")
+
+    def test_clear_cache_reloads_snapshot(self):
+        inv = InventoryService(self.user)
+        self.assertEqual(len(inv.snapshot), 3)
+
+        self.rice.consume(Decimal("500"))
+        self.assertEqual(len(inv.snapshot), 3)
+        inv.clear_cache()
+        self.assertEqual(inv.get_inventory_map(), {"egg": Decimal("10")})
+
+    def test_snapshot_is_cached_until_foodlog_changes(self):
+        first = InventoryService(self.user).snapshot
+
+        with self.assertNumQueries(0):
+            cached = InventoryService(self.user).snapshot
+            self.assertEqual(cached.inventory_map, first.inventory_map)
+            self.assertEqual(cached.tokens, first.tokens)
+            self.assertEqual(cached.min_days_left, {"egg": 1, "rice": 10})
+
+        FoodLogSys.objects.create(
+            user=self.user, name="Tomato", quantity=Decimal("3"), unit="pcs",
+            category="vegetable", expiry_date=timezone.now().date(),
+        )
+        with self.assertNumQueries(1):
+            fresh = InventoryService(self.user).snapshot
+        self.assertIn("tomato", fresh.inventory_map)
+
+    def test_snapshot_encoding_round_trip(self):
+        snapshot = InventorySnapshot.load(self.user)
+        decoded = InventorySnapshot.decode(snapshot.encode())
+
+        self.assertEqual(decoded.items(), snapshot.items())
+        self.assertEqual(decoded.expiry_weighted, snapshot.expiry_weighted)
+        self.assertEqual(decoded.category_breakdown, snapshot.category_breakdown)
+
+    def test_planning_service_shares_provider_snapshot(self):
+        inv = InventoryService(self.user)
+        provider = MealDBRecipeProvider(inv)
+        service = MealPlanningService(
+            user=self.user,
+            start_date=timezone.now().date(),
+            days=1,
+            meals_per_day=1,
+            providers=[provider],
+            inventory=inv,
+        )
+
+        self.assertIs(service.inventory.snapshot, inv.snapshot)
+        with self.assertNumQueries(0):
+            service.get_planning_summary()
+
+
+@override_settings(CACHES=TEST_CACHES)
+class ConfirmDayConsumptionTestCase(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="confirm_user@test.com", password="123456"
+        )
+        today = timezone.now().date()
+
+        def log(name, qty, days):
+            return FoodLogSys.objects.create(
+                user=self.user, name=name, quantity=Decimal(qty), unit="g",
+                category="other", expiry_date=today + timezone.timedelta(days=days),
+            )
+
+        self.rice_old = log("Rice", "60", 1)
+        self.rice_new = log("Rice", "500", 9)
+        self.chickpeas = log("Garbanzo Beans", "400", 5)
+        self.chicken = log("Chicken Breast", "300", 2)
+        self.plan = MealPlan.objects.create(user=self.user, start_date=today, days=2)
+
+    def _day(self, offset, ingredients_per_meal, meal_times=("breakfast", "lunch", "dinner", "snack"), plan=None):
+        plan = plan or self.plan
+        day = MealPlanDay.objects.create(
+            meal_plan=plan, date=plan.start_date + timezone.timedelta(days=offset)
+        )
+        for meal_time in meal_times:
+            MealPlanMeal.objects.create(
+                meal_plan_day=day, meal_time=meal_time, draft_title=f"{meal_time} bowl",
+                draft_ingredients=[{"name": name} for name in ingredients_per_meal],
+            )
+        return day
+
+    def test_estimated_ingredients_resolve_in_memory_with_audit(self):
+        day = self._day(0, ["Rice", "Chickpeas", "Chicken", "Saffron"], meal_times=("lunch",))
+
+        confirmed = confirm_meal_plan_day(day, self.user)
+        audit = {line.ingredient: line for line in confirmed.consumption_audit}
+
+        # exact match drains the earliest-expiring rice first
+        self.assertEqual(audit["Rice"].food_log_ids, [self.rice_old.id, self.rice_new.id])
+        self.assertEqual(audit["Rice"].status, "consumed")
+        self.assertEqual(audit["Chickpeas"].food_log_ids, [self.chickpeas.id])
+        self.assertEqual(audit["Chicken"].food_log_ids, [self.chicken.id])
+        self.assertEqual(audit["Saffron"].status, "unmatched")
+
+        self.rice_old.refresh_from_db()
+        self.rice_new.refresh_from_db()
+        self.assertTrue(self.rice_old.is_consumed)
+        self.assertEqual(self.rice_new.quantity, Decimal("460"))
+        self.assertTrue(MealPlanMeal.objects.filter(meal_plan_day=day, meal__isnull=False).exists())
+
+    def test_partial_consumption_caps_at_available(self):
+        day = self._day(0, ["Chicken"])  # 4 meals x 100g against 300g
+
+        audit = confirm_meal_plan_day(day, self.user).consumption_audit
+
+        self.assertEqual([line.status for line in audit], ["consumed", "consumed", "consumed", "partial"])
+        self.chicken.refresh_from_db()
+        self.assertEqual(self.chicken.quantity, Decimal("0"))
+        self.assertTrue(self.chicken.is_consumed)
+
+    def test_query_count_is_flat_in_meal_count(self):
+        ingredients = ["Rice", "Chickpeas", "Chicken", "Onion", "Garlic", "Salt", "Pepper", "Oil", "Lemon", "Parsley"]
+        small = self._day(0, ingredients, meal_times=("lunch",))
+        large = self._day(1, ingredients)
+
+        with CaptureQueriesContext(connection) as one_meal:
+            confirm_meal_plan_day(small, self.user)
+        with CaptureQueriesContext(connection) as four_meals:
+            confirm_meal_plan_day(large, self.user)
+
+        self.assertEqual(len(four_meals), len(one_meal))
+
+
+    def _plan(self, days, ingredients):
+        plan = MealPlan.objects.create(user=self.user, start_date=self.plan.start_date, days=days)
+        for offset in range(days):
+            self._day(offset, ingredients, plan=plan)
+        return plan
+
+    def test_confirm_meal_plan_reports_days_without_meals(self):
+        plan = self._plan(2, ["Rice"])
+        empty = MealPlanDay.objects.create(meal_plan=plan, date=plan.start_date + timezone.timedelta(days=2))
+
+        result = confirm_meal_plan(plan, self.user)
+
+        self.assertEqual(len(result.confirmed_days), 2)
+        self.assertEqual(result.errors, [f"Day {empty.date}: No meals found for this day"])
+        self.assertEqual(result.remaining_days, 1)
+        plan.refresh_from_db()
+        self.assertFalse(plan.is_confirmed)
+        # 8 rice meals x 100g drain both rice logs earliest-expiry first
+        self.rice_new.refresh_from_db()
+        self.assertEqual(self.rice_new.quantity, Decimal("0"))
+
+    def test_confirm_meal_plan_reports_a_failing_day_and_confirms_the_rest(self):
+        plan = self._plan(3, ["Rice"])
+        bad = plan.days_plan.order_by("date")[1]
+        real_queue = confirmeal._queue_consumption
+
+        def queue(consumption, meals):
+            if any(meal.meal_plan_day_id == bad.id for meal in meals):
+                raise RuntimeError("inventory lookup failed")
+            real_queue(consumption, meals)
+
+        with patch("meal_plans.services.confirmeal._queue_consumption", side_effect=queue):
+            result = confirm_meal_plan(plan, self.user)
+
+        self.assertEqual(len(result.confirmed_days), 2)
+        self.assertEqual(result.errors, [f"Day {bad.date}: inventory lookup failed"])
+        self.assertEqual(result.remaining_days, 1)
+        self.assertEqual(
+            set(MealPlanDay.objects.filter(meal_plan=plan, is_confirmed=True).values_list("id", flat=True)),
+            {day.id for day in result.confirmed_days},
+        )
+        # the failed day's draft meals were rolled back with it
+        self.assertFalse(MealPlanMeal.objects.filter(meal_plan_day=bad, meal__isnull=False).exists())
+        self.assertTrue(MealPlanMeal.objects.filter(meal_plan_day=result.confirmed_days[0], meal__isnull=False).exists())
+
+    def test_confirm_meal_plan_query_count_is_constant(self):
+        ingredients = ["Rice", "Chicken", "Onion"]
+        short_plan = self._plan(1, ingredients)
+        long_plan = self._plan(30, ingredients)
+
+        with CaptureQueriesContext(connection) as one_day:
+            confirm_meal_plan(short_plan, self.user)
+        with CaptureQueriesContext(connection) as thirty_days:
+            result = confirm_meal_plan(long_plan, self.user)
+
+        self.assertEqual(len(thirty_days), len(one_day))
+        self.assertEqual(len(result.confirmed_days), 30)
+        long_plan.refresh_from_db()
+        self.assertTrue(long_plan.is_confirmed)
+        self.assertFalse(MealPlanDay.objects.filter(meal_plan=long_plan, is_confirmed=False).exists())
+
+    def test_confirm_plan_endpoint(self):
+        plan = self._plan(2, ["Rice"])
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        resp = client.post(f"{API_PREFIX}{plan.id}/confirm/", {}, format="json")
+
+        self.assertEqual(resp.status_code, status.HTTP_200_OK, resp.data)
+        self.assertEqual(resp.data["message"], "Confirmed 2 day(s)")
+        self.assertIsNone(resp.data["errors"])
+        self.assertTrue(resp.data["plan_fully_confirmed"])
+
+
+class MealPlanBuilderTestCase(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="builder_user@test.com", password="123456"
+        )
+        self.start = timezone.now().date()
+
+    def _recipes(self, count):
+        return [
+            RecipeCandidate(
+                title=f"Recipe {i}", ingredients=["Egg", "Rice"], source="mealdb",
+                instructions="Cook.", cuisine="Test", metadata={"mealdb_id": str(100 + i)},
+            )
+            for i in range(count)
+        ]
+
+    def test_build_writes_days_and_meals_in_bulk(self):
+        builder = MealPlanBuilder(self.user, self.start, days=3, meals_per_day=2)
+        plan = builder.build(self._recipes(5))
+
+        days = list(plan.days_plan.order_by("date"))
+        self.assertEqual([d.date for d in days], [self.start + timezone.timedelta(days=i) for i in range(3)])
+        meals = list(MealPlanMeal.objects.filter(meal_plan_day__meal_plan=plan).order_by("id"))
+        self.assertEqual(len(meals), 5)  # ran out of recipes on the last slot
+        self.assertEqual([(m.meal_plan_day_id, m.meal_time) for m in meals[:2]],
+                         [(days[0].id, "breakfast"), (days[0].id, "lunch")])
+        self.assertEqual(meals[0].draft_title, "Recipe 0")
+        self.assertEqual(meals[0].draft_source_mealdb_id, "100")
+        self.assertEqual(meals[4].meal_plan_day_id, days[2].id)
+
+    def test_query_count_does_not_grow_with_plan_size(self):
+        with CaptureQueriesContext(connection) as small:
+            MealPlanBuilder(self.user, self.start, days=1, meals_per_day=1).build(self._recipes(1))
+        with CaptureQueriesContext(connection) as large:
+            MealPlanBuilder(self.user, self.start, days=30, meals_per_day=4).build(self._recipes(120))
+
+        self.assertEqual(len(large), len(small))
+
+    def test_custom_meal_times(self):
+        builder = MealPlanBuilder(self.user, self.start, days=1, meals_per_day=2, meal_times=["lunch", "dinner", "breakfast"])
+        plan = builder.build(self._recipes(2))
+
+        self.assertEqual(
+            sorted(MealPlanMeal.objects.filter(meal_plan_day__meal_plan=plan).values_list("meal_time", flat=True)),
+            ["dinner", "lunch"],
+        )
+
+
+@override_settings(CACHES=TEST_CACHES)
+class MealPlanDetailFastPathTestCase(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="detail_user@test.com", password="123456"
+        )
+        today = timezone.now().date()
+        self.food = FoodLogSys.objects.create(
+            user=self.user, name="Rice", quantity=Decimal("500"), unit="g",
+            category="grain", expiry_date=today + timezone.timedelta(days=5),
+        )
+        self.plan = MealPlan.objects.create(user=self.user, start_date=today, days=2)
+        day1 = MealPlanDay.objects.create(meal_plan=self.plan, date=today)
+        day2 = MealPlanDay.objects.create(
+            meal_plan=self.plan, date=today + timezone.timedelta(days=1),
+            is_confirmed=True, confirmed_at=timezone.now(),
+        )
+        MealPlanDay.objects.create(meal_plan=self.plan, date=today + timezone.timedelta(days=2))
+
+        draft = MealPlanMeal.objects.create(
+            meal_plan_day=day1, meal_time="lunch", draft_title="Draft Rice",
+            draft_ingredients=["Rice", "Salt"], draft_steps=["Boil", "", "Serve"],
+            draft_cuisine="", draft_calories=400, draft_photo="/media/rice.jpg",
+            draft_source_mealdb_id="52772",
+        )
+        MealPlanFoodUsage.objects.create(meal_plan_meal=draft, food_log=self.food, planned_quantity=Decimal("150.5"))
+        MealPlanMeal.objects.create(meal_plan_day=day1, meal_time="breakfast", is_skipped=True, draft_title="Skipped")
+
+        original = Meal.objects.create(user=self.user, recipe="Old Stew", ingredients=["Beef"], mealTime="dinner")
+        replacement = Meal.objects.create(
+            user=self.user, recipe="New Curry", ingredients=["Rice", "Curry"], steps="Cook it",
+            cuisine="Indian", calories=None, serving=2, photo="https://img.example/curry.jpg",
+            mealTime="dinner", source_mealdb_id="53000",
+        )
+        MealPlanMeal.objects.create(
+            meal_plan_day=day2, meal_time="dinner", meal=replacement, original_meal=original,
+            is_replaced=True, replaced_at=timezone.now(), draft_title="Draft", draft_calories=300,
+        )
+        self.request = Request(APIRequestFactory().get(f"{API_PREFIX}{self.plan.id}/"))
+
+    def _serializer_payload(self):
+        plan = MealPlan.objects.get(id=self.plan.id)
+        data = MealPlanDetailSerializer(plan, context={"request": self.request}).data
+        return json.loads(JSONRenderer().render(data))
+
+    def test_fast_path_matches_serializer(self):
+        fast = json.loads(JSONRenderer().render(build_plan_detail(self.plan.id, self.user, self.request)))
+
+        self.assertEqual(fast, self._serializer_payload())
+        self.assertEqual(fast["days_plan"][0]["meals"][1]["photo"], "http://testserver/media/rice.jpg")
+
+    def test_detail_is_cached_until_plan_changes(self):
+        get_plan_detail(self.plan.id, self.user, self.request)
+        with self.assertNumQueries(0):
+            get_plan_detail(self.plan.id, self.user, self.request)
+
+        client = APIClient()
+        client.force_authenticate(self.user)
+        meal = MealPlanMeal.objects.get(meal_plan_day__meal_plan=self.plan, meal_time="lunch")
+        client.post(f"{API_PREFIX}meals/{meal.id}/skip/", {}, format="json")
+
+        resp = client.get(f"{API_PREFIX}{self.plan.id}/")
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        lunch = [m for m in resp.data["days_plan"][0]["meals"] if m["id"] == meal.id][0]
+        self.assertTrue(lunch["is_skipped"])
+
+    def test_renamed_food_log_shows_in_cached_detail(self):
+        get_plan_detail(self.plan.id, self.user, self.request)
+
+        self.food.name = "Basmati Rice"
+        self.food.save()
+
+        data = get_plan_detail(self.plan.id, self.user, self.request)
+        lunch = [m for m in data["days_plan"][0]["meals"] if m["meal_time"] == "lunch"][0]
+        self.assertEqual(lunch["planned_usages"][0]["food_name"], "Basmati Rice")
+
+    def test_other_users_plan_is_not_found(self):
+        other = get_user_model().objects.create_user(email="detail_other@test.com", password="123456")
+        get_plan_detail(self.plan.id, self.user, self.request)
+
+        self.assertIsNone(get_plan_detail(self.plan.id, other, self.request))
+
+
+class MealPlanListTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="list_user@test.com", password="123456"
+        )
+        self.client.force_authenticate(self.user)
+
+    def _plans(self, count, days=7, meals_per_day=3):
+        builder = MealPlanBuilder(self.user, timezone.now().date(), days, meals_per_day)
+        recipes = [{"title": f"Recipe {i}"} for i in range(days * meals_per_day)]
+        return [builder.build(recipes) for _ in range(count)]
+
+    def test_list_query_count_does_not_grow_with_plans(self):
+        self._plans(1)
+        with CaptureQueriesContext(connection) as one_plan:
+            self.client.get(API_PREFIX, {"include": "meals"})
+
+        self._plans(9)
+        with self.assertNumQueries(len(one_plan)):
+            resp = self.client.get(API_PREFIX, {"include": "meals"})
+        self.assertEqual(len(resp.data["results"]), 10)
+
+        with self.assertNumQueries(1):
+            self.client.get(API_PREFIX)
+
+    def test_second_page_is_reachable_through_next(self):
+        plans = self._plans(25, days=1, meals_per_day=1)
+
+        first = self.client.get(API_PREFIX)
+        self.assertEqual(len(first.data["results"]), 20)
+        self.assertIsNotNone(first.data["next"])
+
+        second = self.client.get(first.data["next"])
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertIsNone(second.data["next"])
+        seen = [p["id"] for p in first.data["results"] + second.data["results"]]
+        self.assertEqual(sorted(seen), sorted(p.id for p in plans))
+
+    def test_summary_counts_and_compact_meals(self):
+        plan = self._plans(1, days=2, meals_per_day=2)[0]
+        day = plan.days_plan.order_by("date").first()
+        MealPlanDay.objects.filter(id=day.id).update(is_confirmed=True)
+
+        resp = self.client.get(API_PREFIX, {"include": "meals"})
+        row = resp.data["results"][0]
+
+        self.assertEqual((row["day_count"], row["meal_count"], row["confirmed_day_count"]), (2, 4, 1))
+        self.assertEqual([d["is_confirmed"] for d in row["days_plan"]], [True, False])
+        self.assertEqual([m["meal_time"] for m in row["days_plan"][0]["meals"]], ["breakfast", "lunch"])
+        self.assertNotIn("days_plan", self.client.get(API_PREFIX).data["results"][0])
+
+    def test_cursor_pagination_walks_all_plans_newest_first(self):
+        plans = self._plans(5, days=1, meals_per_day=1)
+
+        seen = []
+        url, params = API_PREFIX, {"page_size": 2}
+        while url:
+            resp = self.client.get(url, params)
+            seen.extend(row["id"] for row in resp.data["results"])
+            url, params = resp.data["next"], None
+
+        self.assertEqual(seen, [p.id for p in reversed(plans)])
+
+
+class RecipeScorerBatchTestCase(SimpleTestCase):
+    def setUp(self):
+        self.scorer = RecipeScorer()
+        self.recipes = [
+            {"egg", "rice", "soy sauce"},
+            {"egg"},
+            set(),
+            {"beef", "carrot", "onion", "potato"},
+            {"rice", "chicken", "onion"},
+        ]
+        self.inventory = {"egg", "rice", "onion", "chicken"}
+        self.inventory_map = {
+            "egg": Decimal("6"),
+            "rice": Decimal("1500"),
+            "onion": Decimal("300"),
+            "chicken": Decimal("750"),
+        }
+
+    def test_score_many_matches_per_recipe_scores(self):
+        for inventory_map in (None, self.inventory_map):
+            expected = [self.scorer.score(r, self.inventory, inventory_map) for r in self.recipes]
+            self.assertEqual(self.scorer.score_many(self.recipes, self.inventory, inventory_map), expected)
+
+    def test_score_diversity_sequence_matches_incremental_loop(self):
+        used = {"onion"}
+        expected = []
+        for r in self.recipes:
+            expected.append(self.scorer.score_diversity(r, used))
+            used = used | r
+
+        self.assertEqual(self.scorer.score_diversity_sequence(self.recipes, {"onion"}), expected)
+
+
+class IngredientSynonymTableTestCase(SimpleTestCase):
+    def tearDown(self):
+        reload_synonyms()
+
+    def test_lookups_use_compiled_tables(self):
+        self.assertEqual(get_base_ingredient("Garbanzo Beans"), "chickpea")
+        self.assertEqual(expand_ingredient_tokens("Garbanzo Beans"), {"garbanzo bean", "chickpea"})
+        self.assertEqual(expand_ingredient_tokens("Dragon Fruit"), {"dragon fruit"})
+        self.assertEqual(get_base_ingredient("Dragon Fruit"), "dragon fruit")
+
+    def test_duplicate_bases_are_merged_and_reported(self):
+        with self.assertLogs("project.utils.ingredient_synonyms", level="WARNING"):
+            table = compile_synonyms([("pepper", ["bell pepper"]), ("salt", ["sea salt"]), ("Peppers", ["peppercorn"])])
+
+        self.assertEqual(table.duplicates, ("Peppers",))
+        self.assertEqual(table.expansions["pepper"], frozenset({"pepper", "peppercorn"}))
+        self.assertEqual(table.variant_to_base["peppercorn"], "pepper")
+        self.assertIn("sweet pepper", ingredient_synonyms.get_synonym_table().expansions["pepper"])
+
+    def test_first_base_wins_for_shared_variants(self):
+        table = compile_synonyms({"pasta": ["noodles"], "rice": ["rice noodles", "noodles"]})
+        self.assertEqual(table.variant_to_base["noodle"], "pasta")
+
+    def test_reload_swaps_table(self):
+        reload_synonyms({"squash": ["zucchini", "courgette"]})
+        self.assertEqual(get_base_ingredient("Courgettes"), "squash")
+        self.assertEqual(expand_ingredient_tokens("chickpeas"), {"chickpea"})
+
+        reload_synonyms()
+        self.assertEqual(get_base_ingredient("chickpeas"), "chickpea")
@@ -1,3 +1,4 @@
+from django.db.models import Count, Q
 from django.utils import timezone
 from django.utils.dateparse import parse_date
 from rest_framework.views import APIView
@@ -7,14 +8,15 @@ from rest_framework.request import Request
 from rest_framework.test import APIRequestFactory
 from rest_framework import status
 from meal_plans.services.meal_plan_generator import generate_meal_plan
-from meal_plans.services.confirmeal import confirm_meal_plan_day
+from meal_plans.services.confirmeal import confirm_meal_plan, confirm_meal_plan_day
 from meal_plans.services.meal_replacement import replace_meal
 from .models import MealPlanMeal, MealPlanDay, MealPlan
 from .services.meal_planning_service import MealPlanningService
 from .services.inventory import InventoryService
 from .services.recipeProvider import MealDBRecipeProvider, AIRecipeProvider
 from .tasks import async_generate_meal_plan, generate_and_store_waste_logs_for_day
-from .serializers import MealPlanDetailSerializer
+from .services.plan_detail import get_plan_detail, invalidate_plan_detail
+from .pagination import MealPlanCursorPagination
 import logging
 from celery.result import AsyncResult
 from food.serializers import WasteLogSerializer
@@ -76,7 +78,8 @@ class MealPlanGeneratorView(APIView):
                 start_date=start_date,
                 days=days,
                 meals_per_day=meals_per_day,
-                providers=providers
+                providers=providers,
+                inventory=inventory
             )
             
             meal_plan = service.generate()
@@ -99,17 +102,12 @@ class MealPlanDetailAPIView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request, pk):
-        try:
-            plan = MealPlan.objects.prefetch_related(
-                "days_plan__meals__meal",
-                "days_plan__meals__planned_usages__food_log",
-                "days_plan__meals__original_meal",  # ✅ Include original meal
-            ).get(id=pk, user=request.user)
-        except MealPlan.DoesNotExist:
+        # same shape as MealPlanDetailSerializer, built from flat rows and cached per plan version
+        data = get_plan_detail(pk, request.user, request)
+        if data is None:
             return Response({"error": "Meal plan not found"}, status=404)
 
-        serializer = MealPlanDetailSerializer(plan, context={"request": request})
-        return Response(serializer.data)
+        return Response(data)
 
 
 class MealPlanConfirmAPIView(APIView):
@@ -117,48 +115,28 @@ class MealPlanConfirmAPIView(APIView):
 
     def post(self, request, pk):
         try:
-            plan = MealPlan.objects.prefetch_related("days_plan").get(
-                id=pk, 
-                user=request.user
-            )
+            plan = MealPlan.objects.get(id=pk, user=request.user)
         except MealPlan.DoesNotExist:
             return Response({"error": "Meal plan not found"}, status=404)
 
         if plan.is_confirmed:
             return Response({"error": "Meal plan already confirmed"}, status=400)
 
-        # Confirm all unconfirmed days
-        unconfirmed_days = plan.days_plan.filter(is_confirmed=False)
-        
-        confirmed_count = 0
-        errors = []
-        
-        for day in unconfirmed_days:
-            try:
-                confirm_meal_plan_day(day, request.user)
-
-                confirmed_count += 1
-            except ValueError as e:
-                errors.append(f"Day {day.date}: {str(e)}")
-                logger.warning(f"Failed to confirm day {day.date}: {e}")
-            
-            except Exception as e:
-                errors.append(f"Day {day.date}: {str(e)}")
-                logger.exception(f"Failed to confirm day {day.date}: {e}")
-
-        remaining_unconfirmed = plan.days_plan.filter(is_confirmed=False).count()
-        
-        if remaining_unconfirmed == 0:
-            plan.is_confirmed = True
-            plan.save(update_fields=["is_confirmed"])
-            logger.info(f" Meal plan {plan.id} fully confirmed")
+        # Confirm all unconfirmed days in one transaction
+        try:
+            result = confirm_meal_plan(plan, request.user)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            logger.exception(f"Meal plan {plan.id} confirmation failed: {e}")
+            return Response({"error": "Internal server error"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
         return Response({
             "status": "completed",
-            "message": f"Confirmed {confirmed_count} day(s)",
-            "errors": errors if errors else None,
+            "message": f"Confirmed {len(result.confirmed_days)} day(s)",
+            "errors": result.errors if result.errors else None,
             "plan_fully_confirmed": plan.is_confirmed,
-            "remaining_days": remaining_unconfirmed
+            "remaining_days": result.remaining_days
         }, status=status.HTTP_200_OK)
 
 class MealPlanDayConfirmAPIView(APIView):
@@ -189,6 +167,7 @@ class MealPlanDayConfirmAPIView(APIView):
                 "confirmed_at": confirmed_day.confirmed_at,
                 "message": "Day confirmed. Waste logs generation started in background.",
                 "waste_task_id": task.id,
+                "consumption": [line.as_dict() for line in confirmed_day.consumption_audit],
             }, status=status.HTTP_200_OK)
 
         except ValueError as e:
@@ -317,7 +296,7 @@ class MealPlanMealSkipAPIView(APIView):
 
     def post(self, request, pk):
         try:
-            meal = MealPlanMeal.objects.get(
+            meal = MealPlanMeal.objects.select_related("meal_plan_day").get(
                 id=pk,
                 meal_plan_day__meal_plan__user=request.user
             )
@@ -326,6 +305,7 @@ class MealPlanMealSkipAPIView(APIView):
 
         meal.is_skipped = True
         meal.save(update_fields=["is_skipped"])
+        invalidate_plan_detail(meal.meal_plan_day.meal_plan_id)
 
         return Response({"status": "Meal skipped"})
 
@@ -343,38 +323,65 @@ class MealPlanDeleteAPIView(APIView):
             return Response({"error": "Cannot delete confirmed plan"}, status=400)
 
         plan.delete()
+        invalidate_plan_detail(pk)
         return Response(status=204)
 class MealPlanListAPIView(APIView):
+    """
+    GET /api/meal_plans/?page_size=20&cursor=...&include=meals
+    Cursor-paginated plan summaries with day/meal counts from one query;
+    include=meals adds the compact days_plan/meals list (two more queries per page).
+    """
     permission_classes = [IsAuthenticated]
+    pagination_class = MealPlanCursorPagination
 
     def get(self, request):
-        plans = MealPlan.objects.filter(user=request.user).order_by('-created_at')
-        
-        # Simple serialization (without nested data for list view)
-        data = [
-            {
-                "id": plan.id,
-                "start_date": plan.start_date,
-                "days": plan.days,
-                "is_confirmed": plan.is_confirmed,
-                "created_at": plan.created_at,
-                "days_plan": [
-                    {
-                        "id": day.id,
-                        "date": day.date,
-                        "is_confirmed": day.is_confirmed,
-                        "meals": [
-                            {"id": meal.id, "meal_time": meal.meal_time}
-                            for meal in day.meals.all()
-                        ]
-                    }
-                    for day in plan.days_plan.all()
-                ]
-            }
-            for plan in plans
-        ]
-        
-        return Response(data)
+        plans = (
+            MealPlan.objects.filter(user=request.user)
+            .annotate(
+                day_count=Count("days_plan", distinct=True),
+                meal_count=Count("days_plan__meals", distinct=True),
+                confirmed_day_count=Count(
+                    "days_plan", filter=Q(days_plan__is_confirmed=True), distinct=True
+                ),
+            )
+            .values(
+                "id", "start_date", "days", "is_confirmed", "created_at",
+                "day_count", "meal_count", "confirmed_day_count",
+            )
+        )
+
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(plans, request, view=self)
+
+        if request.query_params.get("include") == "meals":
+            self._attach_days(page)
+
+        return paginator.get_paginated_response(page)
+
+    @staticmethod
+    def _attach_days(page):
+        by_plan = {plan["id"]: plan for plan in page}
+        days_by_id = {}
+        for plan in page:
+            plan["days_plan"] = []
+
+        days = (
+            MealPlanDay.objects.filter(meal_plan_id__in=list(by_plan))
+            .order_by("date")
+            .values("id", "meal_plan_id", "date", "is_confirmed")
+        )
+        for day in days:
+            entry = {"id": day["id"], "date": day["date"], "is_confirmed": day["is_confirmed"], "meals": []}
+            days_by_id[day["id"]] = entry
+            by_plan[day["meal_plan_id"]]["days_plan"].append(entry)
+
+        meals = (
+            MealPlanMeal.objects.filter(meal_plan_day_id__in=list(days_by_id))
+            .order_by("meal_plan_day__date", "meal_time")
+            .values_list("id", "meal_plan_day_id", "meal_time")
+        )
+        for meal_id, day_id, meal_time in meals:
+            days_by_id[day_id]["meals"].append({"id": meal_id, "meal_time": meal_time})
 
 class MealPlanTaskStatusAPIView(APIView):
     permission_classes = [IsAuthenticated]
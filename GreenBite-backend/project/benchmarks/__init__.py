@@ -0,0 +1,33 @@
+"""
+Query-count / latency / memory benchmarks for the API hot paths.
+
+    python manage.py bench_api --scale full
+    python manage.py bench_api --scale small --update-baseline
+    python manage.py bench_prompt --scale full   # recommendation LLM prompt size
+"""
+from .dataset import SCALES, BenchmarkDataset, Scale, seed_dataset
+from .runner import (
+    BASELINE_PATH,
+    Measurement,
+    compare_to_baseline,
+    load_baseline,
+    run_benchmarks,
+    write_baseline,
+)
+from .scenarios import SCENARIOS, Scenario, offline_environment
+
+__all__ = [
+    "BASELINE_PATH",
+    "SCALES",
+    "SCENARIOS",
+    "BenchmarkDataset",
+    "Measurement",
+    "Scale",
+    "Scenario",
+    "compare_to_baseline",
+    "load_baseline",
+    "offline_environment",
+    "run_benchmarks",
+    "seed_dataset",
+    "write_baseline",
+]
@@ -0,0 +1,182 @@
+"""
+Synthetic, seeded dataset for the API benchmarks.
+
+Everything is written with bulk_create so seeding a full-size dataset takes a
+few seconds. Callers are expected to run inside a transaction they roll back
+(bench_api) or inside a TestCase.
+"""
+import random
+from dataclasses import dataclass
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from community.models import ComMarket, CommunityParent
+from food.models import CategoryChoices, FoodLogSys, StorageTypeChoices
+from food.utils.caching import bump_catalog_version
+from meal_plans.models import MealPlan, MealPlanDay
+from meal_plans.services.meal_plan_builder import MealPlanBuilder
+from meal_plans.services.recipeProvider import RecipeCandidate
+from meal_plans.services.recipe_index import reset_recipe_index
+from project.utils.normalize import normalize_ingredient_name
+from recipes.models import DifficultyChoices, MealDBRecipe, MealTimeChoices
+
+PANTRY = (
+    "chicken breast", "ground beef", "salmon", "eggs", "milk", "butter", "cheddar cheese",
+    "yogurt", "rice", "pasta", "flour", "bread", "tomato", "onion", "garlic", "potato",
+    "carrot", "spinach", "broccoli", "bell pepper", "apple", "banana", "lemon", "beans",
+    "olive oil", "honey", "mushroom", "zucchini", "cucumber", "lentils", "oats", "tofu",
+)
+# recipe-only ingredients, so catalog overlap with a pantry is partial like the real MealDB
+EXTRAS = (
+    "cumin", "paprika", "coriander", "thyme", "basil", "soy sauce", "ginger", "chili",
+    "coconut milk", "vinegar", "parsley", "oregano", "cinnamon", "sugar", "salt", "black pepper",
+)
+CATEGORIES = ("Beef", "Chicken", "Dessert", "Pasta", "Seafood", "Vegetarian", "Breakfast", "Side")
+CUISINES = ("British", "Italian", "Indian", "Mexican", "Chinese", "French", "Egyptian", "Greek")
+
+
+@dataclass(frozen=True)
+class Scale:
+    users: int
+    food_logs: int  # for the benchmark user
+    noise_logs: int  # for every other user
+    recipes: int
+    listings: int
+    plan_days: int
+    meals_per_day: int
+
+
+SCALES = {
+    "small": Scale(users=3, food_logs=300, noise_logs=50, recipes=120, listings=20, plan_days=3, meals_per_day=3),
+    # roughly a busy pantry against the full TheMealDB catalog
+    "full": Scale(users=25, food_logs=5000, noise_logs=400, recipes=600, listings=400, plan_days=30, meals_per_day=4),
+}
+
+
+@dataclass
+class BenchmarkDataset:
+    scale: Scale
+    user: object
+    plan: MealPlan
+    day: MealPlanDay
+
+
+def seed_dataset(scale: Scale, seed: int = 42) -> BenchmarkDataset:
+    rng = random.Random(seed)
+    users = _seed_users(scale)
+    user = users[0]
+    _seed_food_logs(rng, users, scale)
+    recipes = _seed_catalog(rng, scale)
+    _seed_market(rng, users, scale)
+
+    # the catalog changed under the process-wide token index
+    bump_catalog_version()
+    reset_recipe_index()
+
+    plan = MealPlanBuilder(user, timezone.now().date(), scale.plan_days, scale.meals_per_day).build(
+        [_candidate(r) for r in rng.sample(recipes, min(len(recipes), scale.plan_days * scale.meals_per_day))]
+    )
+    day = plan.days_plan.order_by("date").first()
+    return BenchmarkDataset(scale=scale, user=user, plan=plan, day=day)
+
+
+def _seed_users(scale):
+    user_model = get_user_model()
+    return user_model.objects.bulk_create(
+        user_model(
+            email=f"bench-{i}@example.invalid",
+            username=f"bench-{i}",
+            password="!",
+            is_active=True,
+        )
+        for i in range(max(1, scale.users))
+    )
+
+
+def _seed_food_logs(rng, users, scale):
+    today = timezone.now().date()
+    categories = [c for c, _ in CategoryChoices.choices]
+    storage = [s for s, _ in StorageTypeChoices.choices]
+    normalized = {name: normalize_ingredient_name(name) for name in PANTRY}
+
+    logs = []
+    for index, user in enumerate(users):
+        for _ in range(scale.food_logs if index == 0 else scale.noise_logs):
+            name = rng.choice(PANTRY)
+            consumed = rng.random() < 0.3
+            logs.append(FoodLogSys(
+                user=user,
+                name=name,
+                # bulk_create skips save(), which normally fills name_normalized
+                name_normalized=normalized[name],
+                quantity=Decimal(0) if consumed else Decimal(rng.randint(1, 1000)),
+                unit=rng.choice(("g", "pcs", "ml")),
+                category=rng.choice(categories),
+                storage_type=rng.choice(storage),
+                expiry_date=today + timedelta(days=rng.randint(-20, 60)),
+                is_consumed=consumed,
+            ))
+    rng.shuffle(logs)
+    FoodLogSys.objects.bulk_create(logs, batch_size=2000)
+
+
+def _seed_catalog(rng, scale):
+    meal_times = [m for m, _ in MealTimeChoices.choices]
+    difficulties = [d for d, _ in DifficultyChoices.choices]
+    recipes = []
+    for i in range(scale.recipes):
+        names = rng.sample(PANTRY, rng.randint(3, 8)) + rng.sample(EXTRAS, rng.randint(1, 6))
+        ingredients = [{"name": name, "measure": f"{rng.randint(1, 4)} cups"} for name in names]
+        recipes.append(MealDBRecipe(
+            mealdb_id=f"bench-{i}",
+            title=f"{rng.choice(CUISINES)} {rng.choice(CATEGORIES).lower()} #{i}",
+            category=rng.choice(CATEGORIES),
+            cuisine=rng.choice(CUISINES),
+            instructions="Prepare the ingredients. Cook until done. Serve warm.\r\n" * 4,
+            thumbnail=f"https://example.invalid/meals/{i}.jpg",
+            tags=rng.sample(("Quick", "Healthy", "Comfort", "Spicy", "Budget"), 2),
+            ingredients=ingredients,
+            # bulk_create skips save(), which normally rebuilds the tokens
+            ingredient_tokens=MealDBRecipe.tokens_for(ingredients),
+            meal_time=rng.choice(meal_times),
+            difficulty=rng.choice(difficulties),
+        ))
+    return MealDBRecipe.objects.bulk_create(recipes, batch_size=500)
+
+
+def _seed_market(rng, users, scale):
+    today = timezone.now().date()
+    parents = CommunityParent.objects.bulk_create(
+        CommunityParent(creator=users[i % len(users)], community_type="MARKET") for i in range(scale.listings)
+    )
+    ComMarket.objects.bulk_create(
+        ComMarket(
+            community_parent=parent,
+            seller=parent.creator,
+            title=f"Surplus {rng.choice(PANTRY)} #{i}",
+            description="Fresh, picked up today.",
+            price=Decimal(rng.randint(5, 200)),
+            currency="EGP",
+            quantity=rng.randint(1, 20),
+            unit=rng.choice(("kg", "g", "pcs", "portion")),
+            available_until=today + timedelta(days=rng.randint(1, 14)),
+            status="ACTIVE",
+        )
+        for i, parent in enumerate(parents)
+    )
+
+
+def _candidate(recipe):
+    return RecipeCandidate(
+        title=recipe.title,
+        ingredients=recipe.ingredients,
+        source="mealdb",
+        thumbnail=recipe.thumbnail,
+        instructions=recipe.instructions,
+        ingredient_tokens=recipe.ingredient_tokens,
+        cuisine=recipe.cuisine,
+        metadata={"recipe_id": recipe.id, "mealdb_id": recipe.mealdb_id},
+    )
@@ -0,0 +1,132 @@
+"""
+Run benchmark scenarios through the DRF test client and compare them with the
+stored baseline.
+
+Every run happens inside a savepoint that is rolled back, so write endpoints
+(generate, confirm) see the same data each time. The first run of a scenario
+records the query count, status and peak memory (tracemalloc); the following
+runs are timed without tracing.
+"""
+import json
+import statistics
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from .scenarios import SCENARIOS
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+
+
+@dataclass
+class Measurement:
+    scenario: str
+    status: int
+    expected_status: int
+    queries: int
+    median_ms: float
+    p95_ms: float
+    peak_kib: float
+
+    def as_dict(self) -> dict:
+        data = asdict(self)
+        del data["scenario"], data["expected_status"]
+        return data
+
+
+def run_benchmarks(dataset, scenarios: Iterable = SCENARIOS, repeat: int = 5) -> List[Measurement]:
+    client = APIClient()
+    client.force_authenticate(dataset.user)
+    return [_measure(client, dataset, scenario, max(1, repeat)) for scenario in scenarios]
+
+
+def _request(client, dataset, scenario):
+    call = getattr(client, scenario.method)
+    data = scenario.data(dataset) if scenario.data else None
+    return call(scenario.path(dataset), data, format="json") if data is not None else call(scenario.path(dataset))
+
+
+def _measure(client, dataset, scenario, repeat) -> Measurement:
+    timings = []
+    for run in range(repeat + 1):
+        sid = transaction.savepoint()
+        scenario.invalidate(dataset)
+        if run == 0:
+            tracemalloc.start()
+            with CaptureQueriesContext(connection) as ctx:
+                response = _request(client, dataset, scenario)
+            # read now: later requests reset the connection's query log
+            queries = len(ctx)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        else:
+            started = time.perf_counter()
+            _request(client, dataset, scenario)
+            timings.append((time.perf_counter() - started) * 1000)
+        transaction.savepoint_rollback(sid)
+
+    timings.sort()
+    return Measurement(
+        scenario=scenario.name,
+        status=response.status_code,
+        expected_status=scenario.expected_status,
+        queries=queries,
+        median_ms=round(statistics.median(timings), 2),
+        p95_ms=round(timings[min(len(timings) - 1, int(round(0.95 * (len(timings) - 1))))], 2),
+        peak_kib=round(peak / 1024, 1),
+    )
+
+
+def load_baseline(path: Optional[Path] = None) -> Dict[str, Dict[str, dict]]:
+    try:
+        with open(path or BASELINE_PATH, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def write_baseline(scale_name: str, measurements: List[Measurement], path: Optional[Path] = None) -> None:
+    """
+    Store `measurements` in the scale's baseline. Only the measured scenarios
+    are replaced; the others keep their recorded numbers.
+    """
+    path = Path(path or BASELINE_PATH)
+    baseline = load_baseline(path)
+    baseline.setdefault(scale_name, {}).update({m.scenario: m.as_dict() for m in measurements})
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def compare_to_baseline(
+    measurements: List[Measurement],
+    baseline: Dict[str, dict],
+    time_tolerance: Optional[float] = 0.5,
+    memory_tolerance: Optional[float] = 0.5,
+) -> List[str]:
+    """
+    Regressions against one scale of the baseline, as readable lines.
+
+    Query counts must not grow at all; time and memory may grow by the given
+    fraction (None skips the check, e.g. in unit tests on shared CI machines).
+    """
+    problems = []
+    for m in measurements:
+        if m.status != m.expected_status:
+            problems.append(f"{m.scenario}: status {m.status}, expected {m.expected_status}")
+        ref = baseline.get(m.scenario)
+        if not ref:
+            continue
+        if m.queries > ref["queries"]:
+            problems.append(f"{m.scenario}: {m.queries} queries, baseline {ref['queries']}")
+        if time_tolerance is not None and m.median_ms > ref["median_ms"] * (1 + time_tolerance):
+            problems.append(f"{m.scenario}: median {m.median_ms} ms, baseline {ref['median_ms']} ms")
+        if memory_tolerance is not None and m.peak_kib > ref["peak_kib"] * (1 + memory_tolerance):
+            problems.append(f"{m.scenario}: peak {m.peak_kib} KiB, baseline {ref['peak_kib']} KiB")
+    return problems
@@ -0,0 +1,135 @@
+"""
+Hot API paths driven by the benchmark runner, plus the stubs that keep a run
+offline (LocMem cache, canned LLM selector, no Celery broker).
+"""
+import json
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+from typing import Callable, Optional
+from unittest import mock
+
+from django.test import override_settings
+
+from food.utils.caching import bump_foodlog_version, bump_meal_plan_version
+from meal_plans.tasks import generate_and_store_waste_logs_for_day
+from recipes.recommendations import build_feed, store_feed
+from recipes.tasks import refresh_recommendation_feed
+
+BENCH_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "greenbite-bench",
+    }
+}
+
+
+class StubChatClient:
+    """Stands in for the OpenAI client: picks the first `limit` candidates it is offered."""
+
+    def __init__(self):
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    @staticmethod
+    def _create(messages, **kwargs):
+        # compact selector prompt: candidate rows start with their alias
+        payload = json.loads(messages[-1]["content"])
+        selected = [
+            {"id": row[0], "why": "matches your inventory"}
+            for row in payload.get("c", [])[: payload.get("limit", 5)]
+        ]
+        content = json.dumps({"selected": selected})
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+@contextmanager
+def offline_environment():
+    with ExitStack() as stack:
+        stack.enter_context(override_settings(CACHES=BENCH_CACHES))
+        stack.enter_context(mock.patch("recipes.recommendations.client", StubChatClient()))
+        stack.enter_context(
+            mock.patch("meal_plans.services.recipeProvider.generate_ai_recipes_raw", return_value=[])
+        )
+        stack.enter_context(mock.patch.object(
+            generate_and_store_waste_logs_for_day, "delay", return_value=SimpleNamespace(id="bench")
+        ))
+        stack.enter_context(mock.patch.object(
+            refresh_recommendation_feed, "apply_async", return_value=SimpleNamespace(id="bench")
+        ))
+        yield
+
+
+def _cold_inventory(dataset):
+    # recommend, the food log list and the inventory snapshot all key off the foodlog version
+    bump_foodlog_version(dataset.user.id)
+
+
+def _precomputed_feed(dataset):
+    # what refresh_recommendation_feed leaves behind after a pantry edit
+    _cold_inventory(dataset)
+    store_feed(dataset.user.id, build_feed(dataset.user))
+
+
+def _cold_plan(dataset):
+    bump_meal_plan_version(dataset.plan.id)
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    method: str
+    path: Callable
+    data: Optional[Callable] = None
+    expected_status: int = 200
+    # called before every run so each request misses the response caches
+    invalidate: Callable = field(default=lambda dataset: None)
+
+
+SCENARIOS = (
+    Scenario(
+        "recommend", "get",
+        lambda ds: "/api/recipes/recommend/?limit=5",
+        invalidate=_cold_inventory,
+    ),
+    Scenario(
+        "recommend_feed", "get",
+        lambda ds: "/api/recipes/recommend/?limit=5",
+        invalidate=_precomputed_feed,
+    ),
+    Scenario(
+        "food_log_list", "get",
+        lambda ds: "/api/food-logs/?page=1",
+        invalidate=_cold_inventory,
+    ),
+    Scenario(
+        "food_log_cursor", "get",
+        lambda ds: "/api/food-logs/?pagination=cursor&page_size=50",
+        invalidate=_cold_inventory,
+    ),
+    Scenario(
+        "plan_generate", "post",
+        lambda ds: "/api/meal_plans/generate/",
+        data=lambda ds: {
+            "days": ds.scale.plan_days,
+            "meals_per_day": ds.scale.meals_per_day,
+            "use_ai_fallback": False,
+        },
+        expected_status=201,
+        invalidate=_cold_inventory,
+    ),
+    Scenario(
+        "plan_detail", "get",
+        lambda ds: f"/api/meal_plans/{ds.plan.id}/",
+        invalidate=_cold_plan,
+    ),
+    Scenario(
+        "confirm_day", "post",
+        lambda ds: f"/api/meal_plans/days/{ds.day.id}/confirm/",
+        data=lambda ds: {},
+        invalidate=_cold_inventory,
+    ),
+    Scenario(
+        "market_list", "get",
+        lambda ds: "/api/community/market/listings/",
+    ),
+)
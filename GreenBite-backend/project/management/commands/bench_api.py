@@ -0,0 +1,98 @@
+"""
+Benchmark the API hot paths against a seeded dataset and the stored baseline.
+
+Runs offline (LocMem cache, stub LLM client, no Celery broker) inside a
+transaction that is rolled back, so it is safe to point at a development
+database:
+
+    python manage.py bench_api --scale full
+    python manage.py bench_api --scale small --only recommend,plan_detail
+    python manage.py bench_api --scale full --update-baseline --only recommend_feed
+
+Exits with an error when a scenario uses more queries than the baseline or
+is slower / heavier than the baseline by more than the tolerance.
+--update-baseline replaces only the scenarios that were run; re-record just
+the ones a change is meant to move, on the machine that recorded the rest.
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from project.benchmarks import (
+    BASELINE_PATH,
+    SCALES,
+    SCENARIOS,
+    compare_to_baseline,
+    load_baseline,
+    offline_environment,
+    run_benchmarks,
+    seed_dataset,
+    write_baseline,
+)
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "Benchmark query counts, latency and peak memory of the API hot paths"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scale", choices=sorted(SCALES), default="full")
+        parser.add_argument("--repeat", type=int, default=5, help="Timed runs per scenario")
+        parser.add_argument("--only", type=str, default="", help="Comma separated scenario names")
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--baseline", type=str, default=str(BASELINE_PATH))
+        parser.add_argument("--update-baseline", action="store_true", help="Store the scenarios of this run as their baseline")
+        parser.add_argument("--time-tolerance", type=float, default=0.5, help="Allowed slowdown (0.5 = +50%%)")
+        parser.add_argument("--memory-tolerance", type=float, default=0.5, help="Allowed peak memory growth")
+
+    def handle(self, *args, **options):
+        scale_name = options["scale"]
+        scenarios = self._select(options["only"])
+
+        try:
+            with offline_environment(), transaction.atomic():
+                dataset = seed_dataset(SCALES[scale_name], seed=options["seed"])
+                measurements = run_benchmarks(dataset, scenarios, repeat=options["repeat"])
+                raise _Rollback()
+        except _Rollback:
+            pass
+
+        self.stdout.write(f"{'scenario':<16} {'status':>6} {'queries':>8} {'median ms':>10} {'p95 ms':>8} {'peak KiB':>9}")
+        for m in measurements:
+            self.stdout.write(
+                f"{m.scenario:<16} {m.status:>6} {m.queries:>8} {m.median_ms:>10.1f} {m.p95_ms:>8.1f} {m.peak_kib:>9.1f}"
+            )
+
+        if options["update_baseline"]:
+            write_baseline(scale_name, measurements, options["baseline"])
+            self.stdout.write(self.style.SUCCESS(f"Baseline for {scale_name!r} written to {options['baseline']}"))
+            return
+
+        baseline = load_baseline(options["baseline"]).get(scale_name)
+        if not baseline:
+            self.stdout.write(self.style.WARNING(f"No {scale_name!r} baseline; run with --update-baseline to record one"))
+            return
+
+        problems = compare_to_baseline(
+            measurements,
+            baseline,
+            time_tolerance=options["time_tolerance"],
+            memory_tolerance=options["memory_tolerance"],
+        )
+        if problems:
+            for line in problems:
+                self.stderr.write(line)
+            raise CommandError(f"{len(problems)} regression(s) against the {scale_name!r} baseline")
+        self.stdout.write(self.style.SUCCESS(f"No regressions against the {scale_name!r} baseline."))
+
+    @staticmethod
+    def _select(only):
+        if not only:
+            return SCENARIOS
+        names = {name.strip() for name in only.split(",") if name.strip()}
+        unknown = names - {s.name for s in SCENARIOS}
+        if unknown:
+            raise CommandError(f"Unknown scenario(s): {', '.join(sorted(unknown))}")
+        return [s for s in SCENARIOS if s.name in names]
@@ -0,0 +1,80 @@
+"""
+Measure the recommendation selector prompt on a seeded dataset, offline.
+
+Compares the verbose JSON payload the selector used to receive with the
+compact prompt (recipes.prompt_compaction), then runs the selector twice
+against the stub LLM client to check alias resolution and the response
+cache. Everything happens in a rolled-back transaction:
+
+    python manage.py bench_prompt --scale full
+    python manage.py bench_prompt --scale full --budget 1200
+"""
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from meal_plans.services.inventory import get_inventory_snapshot
+from project.benchmarks import SCALES, offline_environment, seed_dataset
+from recipes.prompt_compaction import (
+    DEFAULT_TOKEN_BUDGET,
+    SYSTEM_PROMPT,
+    compact_selector_prompt,
+    estimate_tokens,
+    inventory_rows,
+    verbose_selector_payload,
+)
+from recipes.recommendations import FEED_SIZE, rank_candidates, select_with_llm
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "Compare verbose vs compact recommendation selector prompts (bytes, estimated tokens)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scale", choices=sorted(SCALES), default="full")
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--limit", type=int, default=FEED_SIZE)
+        parser.add_argument("--budget", type=int, default=DEFAULT_TOKEN_BUDGET, help="Estimated token budget")
+
+    def handle(self, *args, **options):
+        limit = options["limit"]
+        try:
+            with offline_environment(), transaction.atomic():
+                dataset = seed_dataset(SCALES[options["scale"]], seed=options["seed"])
+                inventory = get_inventory_snapshot(dataset.user)
+                ranked = rank_candidates(inventory)
+                if not ranked:
+                    raise CommandError("The seeded user has no recommendation candidates")
+
+                verbose = verbose_selector_payload(inventory, ranked, limit)
+                compact = compact_selector_prompt(inventory_rows(inventory), ranked, limit, options["budget"])
+
+                first, _ = select_with_llm(inventory, ranked, limit)
+                # the view uses the default budget, whatever --budget says
+                served = compact_selector_prompt(inventory_rows(inventory), ranked, limit)
+                cached = cache.get(served.cache_key) is not None
+                second, _ = select_with_llm(inventory, ranked, limit)
+                raise _Rollback()
+        except _Rollback:
+            pass
+
+        verbose_bytes = len(verbose.encode("utf-8"))
+        verbose_tokens = estimate_tokens(verbose)
+        compact_tokens = compact.tokens - estimate_tokens(SYSTEM_PROMPT)
+
+        self.stdout.write(f"{'user message':<14} {'bytes':>8} {'~tokens':>8} {'candidates':>11}")
+        self.stdout.write(f"{'verbose':<14} {verbose_bytes:>8} {verbose_tokens:>8} {len(ranked):>11}")
+        self.stdout.write(f"{'compact':<14} {compact.bytes:>8} {compact_tokens:>8} {compact.candidates:>11}")
+        self.stdout.write(
+            f"Saved {1 - compact.bytes / verbose_bytes:.1%} bytes, {1 - compact_tokens / verbose_tokens:.1%} tokens "
+            f"({compact.dropped} candidates over the {options['budget']}-token budget); "
+            f"system prompt ~{estimate_tokens(SYSTEM_PROMPT)} tokens"
+        )
+
+        expected = [c["recipe_id"] for c in ranked[:limit]]
+        if first != expected or second != expected or not cached:
+            raise CommandError(f"Stub selection did not round-trip: {first} / {second}, expected {expected}")
+        self.stdout.write(self.style.SUCCESS("Aliases resolved and the repeated call was served from the cache."))
@@ -114,6 +114,13 @@ S3_BUCKET_FOOD_SCANS = os.getenv("S3_BUCKET_FOOD_SCANS", "greenbite-food-scans")
 # Keep this empty if you want private buckets (do not build public URLs)
 S3_PUBLIC_MEDIA_BASE_URL = os.getenv("S3_PUBLIC_MEDIA_BASE_URL", "").rstrip("/")
 
+# Memory-mapped recipe embedding matrix written by `manage.py embed_meals`
+EMBEDDING_STORE_DIR = os.getenv("EMBEDDING_STORE_DIR", str(BASE_DIR / "var" / "embeddings"))
+# "store" (embedding store above) or "db" (pgvector nearest-neighbour query)
+MEAL_FALLBACK_SEARCH = os.getenv("MEAL_FALLBACK_SEARCH", "store")
+# rows kept in the (model, sha256(text)) embedding cache before LRU eviction
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "50000"))
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=60),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
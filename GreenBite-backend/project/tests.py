@@ -0,0 +1,52 @@
+import json
+import tempfile
+from pathlib import Path
+
+from django.test import SimpleTestCase, TestCase
+
+from project.benchmarks import (
+    SCALES,
+    SCENARIOS,
+    Measurement,
+    compare_to_baseline,
+    load_baseline,
+    offline_environment,
+    run_benchmarks,
+    seed_dataset,
+    write_baseline,
+)
+
+
+class ApiBenchmarkTestCase(TestCase):
+    """Fails on N+1 regressions: every hot path must stay within its baseline query count."""
+
+    def test_small_scale_matches_query_baseline(self):
+        baseline = load_baseline().get("small")
+        self.assertTrue(baseline, "project/benchmarks/baseline.json has no 'small' entry")
+        self.assertEqual(set(baseline), {s.name for s in SCENARIOS})
+
+        with offline_environment():
+            dataset = seed_dataset(SCALES["small"])
+            measurements = run_benchmarks(dataset, repeat=1)
+
+        # wall time and memory depend on the machine; bench_api checks those
+        problems = compare_to_baseline(measurements, baseline, time_tolerance=None, memory_tolerance=None)
+        self.assertEqual(problems, [])
+
+
+class WriteBaselineTestCase(SimpleTestCase):
+    def test_only_measured_scenarios_are_replaced(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "baseline.json"
+            old = {"median_ms": 1.0, "p95_ms": 2.0, "peak_kib": 3.0, "queries": 4, "status": 200}
+            path.write_text(json.dumps({"small": {"recommend": old, "plan_detail": old}, "full": {"recommend": old}}))
+
+            write_baseline("small", [Measurement("recommend", 200, 200, 2, 5.0, 6.0, 7.0)], path)
+
+            baseline = load_baseline(path)
+        self.assertEqual(baseline["small"]["plan_detail"], old)
+        self.assertEqual(baseline["full"]["recommend"], old)
+        self.assertEqual(
+            baseline["small"]["recommend"],
+            {"status": 200, "queries": 2, "median_ms": 5.0, "p95_ms": 6.0, "peak_kib": 7.0},
+        )
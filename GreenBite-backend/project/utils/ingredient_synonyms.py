@@ -1,65 +1,144 @@
 """
 Ingredient synonym mappings for semantic matching.
 Base ingredient → list of common synonyms/variants.
+
+The entries are compiled at import into O(1) lookup tables (see SynonymTable);
+call reload_synonyms() to swap in a new table without restarting.
 """
+import json
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, List, Mapping, Optional, Tuple, Union
+
+from project.utils.normalize import normalize_ingredient_name
+
+logger = logging.getLogger(__name__)
 
-INGREDIENT_SYNONYMS = {
+# Ordered (base, synonyms) pairs. A list rather than a dict literal so that a base
+# listed twice is merged and reported instead of silently overwritten.
+INGREDIENT_SYNONYM_ENTRIES = [
     # Proteins
-    "chicken": ["chicken breast", "chicken thigh", "poultry", "hen"],
-    "beef": ["ground beef", "steak", "minced beef", "beef mince"],
-    "pork": ["pork chop", "pork loin", "bacon", "ham"],
-    "fish": ["salmon", "tuna", "cod", "tilapia", "white fish"],
-    "egg": ["eggs", "egg white", "egg yolk"],
-    "tofu": ["bean curd", "soy curd"],
+    ("chicken", ["chicken breast", "chicken thigh", "poultry", "hen"]),
+    ("beef", ["ground beef", "steak", "minced beef", "beef mince"]),
+    ("pork", ["pork chop", "pork loin", "bacon", "ham"]),
+    ("fish", ["salmon", "tuna", "cod", "tilapia", "white fish"]),
+    ("egg", ["eggs", "egg white", "egg yolk"]),
+    ("tofu", ["bean curd", "soy curd"]),
     
     # Dairy
-    "milk": ["whole milk", "skim milk", "dairy milk"],
-    "cheese": ["cheddar", "mozzarella", "parmesan", "feta"],
-    "yogurt": ["yoghurt", "greek yogurt", "plain yogurt"],
-    "butter": ["unsalted butter", "salted butter"],
-    "cream": ["heavy cream", "whipping cream", "single cream"],
+    ("milk", ["whole milk", "skim milk", "dairy milk"]),
+    ("cheese", ["cheddar", "mozzarella", "parmesan", "feta"]),
+    ("yogurt", ["yoghurt", "greek yogurt", "plain yogurt"]),
+    ("butter", ["unsalted butter", "salted butter"]),
+    ("cream", ["heavy cream", "whipping cream", "single cream"]),
     
     # Vegetables
-    "tomato": ["tomatoes", "cherry tomato", "roma tomato", "plum tomato"],
-    "potato": ["potatoes", "white potato", "red potato"],
-    "onion": ["onions", "yellow onion", "white onion", "red onion"],
-    "garlic": ["garlic clove", "garlic cloves", "minced garlic"],
-    "carrot": ["carrots", "baby carrot"],
-    "pepper": ["bell pepper", "capsicum", "sweet pepper"],
-    "mushroom": ["mushrooms", "button mushroom", "portobello"],
-    "spinach": ["fresh spinach", "baby spinach"],
-    "broccoli": ["broccoli florets"],
-    "lettuce": ["iceberg lettuce", "romaine lettuce", "salad greens"],
+    ("tomato", ["tomatoes", "cherry tomato", "roma tomato", "plum tomato"]),
+    ("potato", ["potatoes", "white potato", "red potato"]),
+    ("onion", ["onions", "yellow onion", "white onion", "red onion"]),
+    ("garlic", ["garlic clove", "garlic cloves", "minced garlic"]),
+    ("carrot", ["carrots", "baby carrot"]),
+    ("pepper", ["bell pepper", "capsicum", "sweet pepper"]),
+    ("mushroom", ["mushrooms", "button mushroom", "portobello"]),
+    ("spinach", ["fresh spinach", "baby spinach"]),
+    ("broccoli", ["broccoli florets"]),
+    ("lettuce", ["iceberg lettuce", "romaine lettuce", "salad greens"]),
     
     # Grains & Pasta
-    "rice": ["white rice", "brown rice", "basmati rice", "jasmine rice"],
-    "pasta": ["spaghetti", "penne", "macaroni", "noodles"],
-    "bread": ["white bread", "whole wheat bread", "loaf"],
-    "flour": ["all purpose flour", "plain flour", "wheat flour"],
+    ("rice", ["white rice", "brown rice", "basmati rice", "jasmine rice"]),
+    ("pasta", ["spaghetti", "penne", "macaroni", "noodles"]),
+    ("bread", ["white bread", "whole wheat bread", "loaf"]),
+    ("flour", ["all purpose flour", "plain flour", "wheat flour"]),
     
     # Legumes
-    "bean": ["beans", "kidney bean", "black bean", "pinto bean"],
-    "lentil": ["lentils", "red lentil", "green lentil"],
-    "chickpea": ["chickpeas", "garbanzo bean", "garbanzo beans"],
+    ("bean", ["beans", "kidney bean", "black bean", "pinto bean"]),
+    ("lentil", ["lentils", "red lentil", "green lentil"]),
+    ("chickpea", ["chickpeas", "garbanzo bean", "garbanzo beans"]),
     
     # Fruits
-    "apple": ["apples", "green apple", "red apple"],
-    "banana": ["bananas"],
-    "orange": ["oranges", "navel orange"],
-    "lemon": ["lemons", "lemon juice"],
+    ("apple", ["apples", "green apple", "red apple"]),
+    ("banana", ["bananas"]),
+    ("orange", ["oranges", "navel orange"]),
+    ("lemon", ["lemons", "lemon juice"]),
     
     # Herbs & Spices
-    "salt": ["sea salt", "table salt", "kosher salt"],
-    "pepper": ["black pepper", "ground pepper", "peppercorn"],
-    "basil": ["fresh basil", "dried basil"],
-    "parsley": ["fresh parsley", "dried parsley"],
-    "cilantro": ["coriander", "fresh cilantro", "coriander leaves"],
+    ("salt", ["sea salt", "table salt", "kosher salt"]),
+    ("pepper", ["black pepper", "ground pepper", "peppercorn"]),
+    ("basil", ["fresh basil", "dried basil"]),
+    ("parsley", ["fresh parsley", "dried parsley"]),
+    ("cilantro", ["coriander", "fresh cilantro", "coriander leaves"]),
     
     # Oils & Condiments
-    "oil": ["olive oil", "vegetable oil", "cooking oil", "canola oil"],
-    "vinegar": ["white vinegar", "apple cider vinegar", "balsamic vinegar"],
-    "soy sauce": ["soya sauce", "light soy sauce", "dark soy sauce"],
-}
+    ("oil", ["olive oil", "vegetable oil", "cooking oil", "canola oil"]),
+    ("vinegar", ["white vinegar", "apple cider vinegar", "balsamic vinegar"]),
+    ("soy sauce", ["soya sauce", "light soy sauce", "dark soy sauce"]),
+]
+
+
+SynonymSource = Union[Mapping[str, List[str]], Iterable[Tuple[str, List[str]]], str]
+
+
+@dataclass(frozen=True)
+class SynonymTable:
+    variant_to_base: Dict[str, str]          # normalized variant (or base) -> normalized base
+    expansions: Dict[str, FrozenSet[str]]    # normalized base -> base + all normalized synonyms
+    duplicates: Tuple[str, ...] = ()         # bases defined more than once (merged)
+
+
+def compile_synonyms(entries: SynonymSource) -> SynonymTable:
+    """
+    Normalize every base/synonym once. When a variant belongs to several bases
+    the first base wins, as with the old linear scan.
+    """
+    if isinstance(entries, str):
+        with open(entries, "r", encoding="utf-8") as f:
+            entries = json.load(f)
+    pairs = entries.items() if isinstance(entries, Mapping) else entries
+
+    merged: Dict[str, List[str]] = {}
+    duplicates: List[str] = []
+    for base, synonyms in pairs:
+        key = normalize_ingredient_name(base)
+        if key in merged:
+            duplicates.append(base)
+            merged[key].extend(synonyms)
+        else:
+            merged[key] = list(synonyms)
+
+    variant_to_base: Dict[str, str] = {}
+    expansions: Dict[str, FrozenSet[str]] = {}
+    for base, synonyms in merged.items():
+        normalized_synonyms = [normalize_ingredient_name(s) for s in synonyms]
+        expansions[base] = frozenset([base, *normalized_synonyms])
+        variant_to_base.setdefault(base, base)
+        for variant in normalized_synonyms:
+            variant_to_base.setdefault(variant, base)
+
+    if duplicates:
+        logger.warning(f"Ingredient synonyms: merged duplicate base entries {sorted(set(duplicates))}")
+
+    return SynonymTable(variant_to_base=variant_to_base, expansions=expansions, duplicates=tuple(duplicates))
+
+
+_table_lock = threading.Lock()
+_table: SynonymTable = compile_synonyms(INGREDIENT_SYNONYM_ENTRIES)
+
+
+def get_synonym_table() -> SynonymTable:
+    return _table
+
+
+def reload_synonyms(source: Optional[SynonymSource] = None) -> SynonymTable:
+    """
+    Recompile from `source` (mapping, (base, synonyms) pairs or a JSON file path),
+    or from the built-in entries, and swap it in atomically.
+    """
+    global _table
+    table = compile_synonyms(INGREDIENT_SYNONYM_ENTRIES if source is None else source)
+    with _table_lock:
+        _table = table
+    return table
 
 
 def get_base_ingredient(ingredient: str) -> str:
@@ -67,17 +146,17 @@ def get_base_ingredient(ingredient: str) -> str:
     Given an ingredient name, return its base form if it's a known synonym.
     Otherwise return the ingredient unchanged (normalized).
     """
-    from project.utils.normalize import normalize_ingredient_name
-    
     normalized = normalize_ingredient_name(ingredient)
-    
-    # Check if this is a synonym of any base ingredient
-    for base, synonyms in INGREDIENT_SYNONYMS.items():
-        normalized_synonyms = [normalize_ingredient_name(s) for s in synonyms]
-        if normalized in normalized_synonyms or normalized == normalize_ingredient_name(base):
-            return normalize_ingredient_name(base)
-    
-    return normalized
+    return get_synonym_table().variant_to_base.get(normalized, normalized)
+
+
+def expand_normalized_tokens(normalized: str) -> FrozenSet[str]:
+    """expand_ingredient_tokens() for a name that is already normalized."""
+    table = get_synonym_table()
+    base = table.variant_to_base.get(normalized)
+    if base is None:
+        return frozenset((normalized,))
+    return table.expansions[base] | {normalized}
 
 
 def expand_ingredient_tokens(ingredient: str) -> set:
@@ -87,19 +166,4 @@ def expand_ingredient_tokens(ingredient: str) -> set:
     - the base form (if it's a synonym)
     - all synonyms of the base form
     """
-    from project.utils.normalize import normalize_ingredient_name
-    
-    normalized = normalize_ingredient_name(ingredient)
-    tokens = {normalized}
-    
-    # Find base and add all related tokens
-    for base, synonyms in INGREDIENT_SYNONYMS.items():
-        normalized_base = normalize_ingredient_name(base)
-        normalized_synonyms = [normalize_ingredient_name(s) for s in synonyms]
-        
-        if normalized == normalized_base or normalized in normalized_synonyms:
-            tokens.add(normalized_base)
-            tokens.update(normalized_synonyms)
-            break
-    
-    return tokens
\ No newline at end of file
+    return set(expand_normalized_tokens(normalize_ingredient_name(ingredient)))
@@ -32,6 +32,10 @@ _SYNONYMS = {
 }
 
 _word_re = re.compile(r"[a-zA-Z]+")
+_paren_re = re.compile(r"\([^)]*\)")
+_SKIP = _UNITS | _DESCRIPTORS
+
+NORMALIZE_CACHE_SIZE = 50000
 
 def _singularize(token: str) -> str:
     # بسيط جدًا (مش perfect) لكنه كفاية للـ matching
@@ -45,7 +49,7 @@ def _singularize(token: str) -> str:
         return token[:-1]
     return token
 
-@lru_cache(maxsize=50000)
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
 def normalize_ingredient_name(text: str) -> str:
     if not text:
         return ""
@@ -53,23 +57,19 @@ def normalize_ingredient_name(text: str) -> str:
     s = str(text).strip().lower()
 
     # remove anything in parentheses: "tomato (chopped)" -> "tomato"
-    s = re.sub(r"\([^)]*\)", " ", s)
-
-    tokens = _word_re.findall(s)
-
-    cleaned = []
-    for t in tokens:
-        if t in _UNITS or t in _DESCRIPTORS:
-            continue
-        t = _singularize(t)
-        cleaned.append(t)
+    if "(" in s:
+        s = _paren_re.sub(" ", s)
 
-    norm = " ".join(cleaned).strip()
+    # single tokenize pass; units/descriptors dropped, the rest singularized
+    norm = " ".join(_singularize(t) for t in _word_re.findall(s) if t not in _SKIP)
     if not norm:
         return ""
 
+    # tokens are joined by single spaces, so no further whitespace cleanup is needed
     norm = _SYNONYMS.get(norm, norm)
-
-   
-    norm = re.sub(r"\s+", " ", norm).strip()
     return norm[:120]
+
+
+def normalize_many(texts) -> list[str]:
+    """Normalize a batch of names; repeated names hit the shared LRU cache."""
+    return [normalize_ingredient_name(t) for t in texts]
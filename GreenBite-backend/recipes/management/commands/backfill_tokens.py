@@ -4,6 +4,7 @@ Run this after importing MealDB recipes or when updating normalization logic.
 """
 from django.core.management.base import BaseCommand
 from recipes.models import MealDBRecipe
+from food.utils.caching import bump_catalog_version
 from project.utils.ingredient_tokens import extract_tokens_from_recipe, extract_tokens_with_synonyms
 
 
@@ -74,6 +75,10 @@ class Command(BaseCommand):
         if to_update:
             MealDBRecipe.objects.bulk_update(to_update, ["ingredient_tokens"], batch_size=batch_size)  # Changed field name
 
+        if updated:
+            # bulk_update skips signals; tell workers to rebuild their recipe index
+            bump_catalog_version()
+
         self.stdout.write(
             self.style.SUCCESS(
                 f"✅ Done. Processed {processed} recipes, updated {updated} with {'synonym-expanded' if use_synonyms else 'basic'} tokens."
@@ -1,16 +1,29 @@
+import json
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
 
 from recipes.models import MealDBRecipe
+from food.utils.caching import bump_catalog_version
 
 
 BASE = "https://www.themealdb.com/api/json/v1/1"
 LIST_BY_LETTER_URL = f"{BASE}/search.php"
 LOOKUP_URL = f"{BASE}/lookup.php"
+LETTERS = "abcdefghijklmnopqrstuvwxyz"
+
+# columns refreshed when a mealdb_id already exists (embeddings are left alone)
+UPSERT_FIELDS = [
+    "title", "category", "cuisine", "instructions", "thumbnail", "youtube", "source",
+    "tags", "ingredients", "ingredient_tokens", "updated_at",
+]
 
 
 def build_session() -> requests.Session:
@@ -83,14 +96,143 @@ def fetch_full_meal(session: requests.Session, mealdb_id: str) -> dict | None:
     return meals[0] if meals else None
 
 
+_thread_state = threading.local()
+
+
+def _thread_session() -> requests.Session:
+    # requests.Session is not thread-safe; one per worker thread
+    session = getattr(_thread_state, "session", None)
+    if session is None:
+        session = _thread_state.session = build_session()
+    return session
+
+
+def _is_full_meal(meal: dict) -> bool:
+    return bool(meal.get("idMeal")) and "strInstructions" in meal and "strIngredient1" in meal
+
+
+def discover_meals(workers: int = 4, sleep: float = 0.0) -> tuple[dict[str, dict], set[str]]:
+    """
+    Fetch search.php?f=<letter> for every letter in parallel.
+    Returns (full payloads by id, ids whose payload was incomplete).
+    """
+    def fetch_letter(ch: str) -> list[dict]:
+        data = fetch_json(_thread_session(), LIST_BY_LETTER_URL, {"f": ch})
+        if sleep > 0:
+            time.sleep(sleep)
+        return data.get("meals") or []
+
+    full: dict[str, dict] = {}
+    partial: set[str] = set()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for meals in pool.map(fetch_letter, LETTERS):
+            for m in meals:
+                mid = str(m.get("idMeal") or "").strip()
+                if not mid:
+                    continue
+                if _is_full_meal(m):
+                    full[mid] = m
+                else:
+                    partial.add(mid)
+    return full, partial - set(full)
+
+
+def fetch_meals(ids, workers: int = 4, sleep: float = 0.0) -> tuple[list[dict], list[tuple[str, Exception]]]:
+    """lookup.php for each id with a bounded worker pool."""
+    def fetch_one(mid: str):
+        try:
+            meal = fetch_full_meal(_thread_session(), mid)
+        except Exception as e:
+            return mid, None, e
+        finally:
+            if sleep > 0:
+                time.sleep(sleep)
+        return mid, meal, None
+
+    meals, errors = [], []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for mid, meal, error in pool.map(fetch_one, ids):
+            if error is not None:
+                errors.append((mid, error))
+            elif meal:
+                meals.append(meal)
+    return meals, errors
+
+
+def upsert_meals(meals, batch_size: int = 200) -> tuple[int, int, int]:
+    """
+    Insert-or-update raw MealDB payloads with bulk_create(update_conflicts=True).
+    Tokens are computed here because bulk writes bypass MealDBRecipe.save().
+    Returns (created, updated, skipped).
+    """
+    rows: dict[str, dict] = {}
+    skipped = 0
+    for meal in meals:
+        fields = mealdb_to_recipe_fields(meal)
+        if not fields["mealdb_id"] or not fields["title"]:
+            skipped += 1
+            continue
+        fields["ingredient_tokens"] = MealDBRecipe.tokens_for(fields["ingredients"])
+        rows[fields["mealdb_id"]] = fields
+
+    created = updated = 0
+    items = list(rows.values())
+    for start in range(0, len(items), batch_size):
+        batch = items[start:start + batch_size]
+        ids = [f["mealdb_id"] for f in batch]
+        existing = set(MealDBRecipe.objects.filter(mealdb_id__in=ids).values_list("mealdb_id", flat=True))
+
+        with transaction.atomic():
+            MealDBRecipe.objects.bulk_create(
+                [MealDBRecipe(**f) for f in batch],
+                update_conflicts=True,
+                unique_fields=["mealdb_id"],
+                update_fields=UPSERT_FIELDS,
+            )
+        updated += len(existing)
+        created += len(batch) - len(existing)
+
+    return created, updated, skipped
+
+
+def load_dump(path: str) -> list[dict]:
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        return data.get("meals") or []
+    return data
+
+
+def write_dump(path: str, meals: list[dict]) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"meals": meals}, f)
+
+
 class Command(BaseCommand):
     help = "Import meals from TheMealDB into local DB (MealDBRecipe)."
 
     def add_arguments(self, parser):
         parser.add_argument("--sleep", type=float, default=0.25, help="Delay between API calls")
         parser.add_argument("--limit", type=int, default=0, help="Limit number of meals (0 = no limit)")
+        parser.add_argument(
+            "--bulk",
+            action="store_true",
+            help="Reuse search.php payloads, fetch the rest in parallel and bulk upsert.",
+        )
+        parser.add_argument("--workers", type=int, default=4, help="Concurrent HTTP requests in --bulk mode")
+        parser.add_argument("--batch-size", type=int, default=200, help="Rows per bulk upsert")
+        parser.add_argument("--dump", type=str, default="", help="Save fetched payloads to this JSON file (--bulk)")
+        parser.add_argument(
+            "--from-dump",
+            type=str,
+            default="",
+            help="Replay a JSON dump written by --dump instead of calling TheMealDB (implies --bulk).",
+        )
 
     def handle(self, *args, **options):
+        if options["bulk"] or options["from_dump"]:
+            return self.handle_bulk(**options)
+
         sleep = options["sleep"]
         limit = options["limit"]
 
@@ -139,6 +281,56 @@ class Command(BaseCommand):
                 skipped += 1
                 self.stderr.write(self.style.WARNING(f"Skip {mid}: {e}"))
 
+        if created_count or updated_count:
+            bump_catalog_version()
+
         self.stdout.write(self.style.SUCCESS(
             f"Done. created={created_count}, updated={updated_count}, skipped={skipped}"
         ))
+
+    def handle_bulk(self, **options):
+        limit = options["limit"]
+        workers = max(1, options["workers"])
+        started = time.time()
+
+        if options["from_dump"]:
+            try:
+                meals = load_dump(options["from_dump"])
+            except (OSError, ValueError) as e:
+                raise CommandError(f"Cannot read dump {options['from_dump']}: {e}")
+            self.stdout.write(self.style.SUCCESS(f"Loaded {len(meals)} meals from {options['from_dump']}"))
+        else:
+            full, partial = discover_meals(workers=workers, sleep=options["sleep"])
+            self.stdout.write(self.style.SUCCESS(
+                f"Discovered {len(full) + len(partial)} meal IDs ({len(partial)} need a lookup)"
+            ))
+
+            ids_sorted = sorted(set(full) | partial)
+            if limit and limit > 0:
+                ids_sorted = ids_sorted[:limit]
+            wanted = set(ids_sorted)
+
+            meals = [full[mid] for mid in ids_sorted if mid in full]
+            fetched, errors = fetch_meals(sorted(partial & wanted), workers=workers, sleep=options["sleep"])
+            meals.extend(fetched)
+            for mid, e in errors:
+                self.stderr.write(self.style.WARNING(f"Skip {mid}: {e}"))
+
+            if options["dump"]:
+                write_dump(options["dump"], meals)
+                self.stdout.write(f"Wrote {len(meals)} payloads to {options['dump']}")
+
+        if limit and limit > 0:
+            meals = meals[:limit]
+
+        created_count, updated_count, skipped = upsert_meals(meals, batch_size=max(1, options["batch_size"]))
+
+        if created_count or updated_count:
+            bump_catalog_version()
+
+        elapsed = time.time() - started
+        rate = (created_count + updated_count) / elapsed if elapsed > 0 else 0.0
+        self.stdout.write(self.style.SUCCESS(
+            f"Done. created={created_count}, updated={updated_count}, skipped={skipped} "
+            f"elapsed={elapsed:.1f}s ({rate:.0f} meals/s)"
+        ))
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:22
+
+import pgvector.django.indexes
+import pgvector.django.vector
+from django.db import migrations
+from pgvector.django import VectorExtension
+
+
+# Copy existing JSON embeddings into the vector column before the index is built,
+# so HNSW is constructed once over the full table instead of row by row.
+COPY_JSON_EMBEDDINGS = """
+UPDATE recipes_mealdbrecipe
+SET embedding_vec = embedding::text::vector
+WHERE embedding IS NOT NULL
+  AND jsonb_typeof(embedding) = 'array'
+  AND jsonb_array_length(embedding) = 1536;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0001_initial'),
+    ]
+
+    operations = [
+        VectorExtension(),
+        migrations.AddField(
+            model_name='mealdbrecipe',
+            name='embedding_vec',
+            field=pgvector.django.vector.VectorField(blank=True, dimensions=1536, null=True),
+        ),
+        migrations.RunSQL(COPY_JSON_EMBEDDINGS, reverse_sql=migrations.RunSQL.noop),
+        migrations.AddIndex(
+            model_name='mealdbrecipe',
+            index=pgvector.django.indexes.HnswIndex(ef_construction=64, fields=['embedding_vec'], m=16, name='mealdb_embedding_hnsw', opclasses=['vector_cosine_ops']),
+        ),
+    ]
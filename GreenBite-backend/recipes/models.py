@@ -5,7 +5,12 @@ from django.core.validators import MinValueValidator, MaxValueValidator
 from django.contrib.postgres.indexes import GinIndex
 from django.contrib.postgres.fields import ArrayField
 from django.conf import settings
-from project.utils.normalize import normalize_ingredient_name
+from pgvector.django import HnswIndex, VectorField
+from project.utils.normalize import normalize_many
+
+
+# text-embedding-3-small
+EMBEDDING_DIMENSIONS = 1536
 
 
 class MealTimeChoices(models.TextChoices):
@@ -61,6 +66,8 @@ class MealDBRecipe(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     embedding = models.JSONField(null=True, blank=True)
+    # pgvector copy of `embedding`, used for database-side nearest-neighbour search
+    embedding_vec = VectorField(dimensions=EMBEDDING_DIMENSIONS, null=True, blank=True)
 
     class Meta:
         ordering = ["title"]
@@ -69,26 +76,36 @@ class MealDBRecipe(models.Model):
             GinIndex(fields=["tags"], name="mealdb_tags_gin"),
             models.Index(fields=["cuisine"]),
             models.Index(fields=["category"]),
+            HnswIndex(
+                name="mealdb_embedding_hnsw",
+                fields=["embedding_vec"],
+                m=16,
+                ef_construction=64,
+                opclasses=["vector_cosine_ops"],
+            ),
         ]
 
     def __str__(self) -> str:
         return f"{self.title} (mealdb:{self.mealdb_id})"
 
+    @staticmethod
+    def tokens_for(ingredients) -> list[str]:
+        """Sorted, de-duplicated normalized tokens for a raw ingredients list."""
+        raws = [(it.get("name") or it.get("ingredient") or "").strip() for it in (ingredients or [])]
+        return sorted({n for n in normalize_many(r for r in raws if r) if n})
+
     def rebuild_ingredients_norm(self) -> None:
         """Rebuild normalized ingredient tokens from raw ingredients."""
-        norms = []
-        for it in (self.ingredients or []):
-            raw = (it.get("name") or it.get("ingredient") or "").strip()
-            if not raw:
-                continue
-            n = normalize_ingredient_name(raw)
-            if n:
-                norms.append(n)
+        self.ingredient_tokens = self.tokens_for(self.ingredients)  # ✅ Updated field name
 
-        self.ingredient_tokens = sorted(set(norms))  # ✅ Updated field name
+    def sync_embedding_vector(self) -> None:
+        """Mirror the JSON embedding into the pgvector column (wrong sizes are left out)."""
+        emb = self.embedding
+        self.embedding_vec = emb if emb and len(emb) == EMBEDDING_DIMENSIONS else None
 
     def save(self, *args, **kwargs):
         self.rebuild_ingredients_norm()
+        self.sync_embedding_vector()
         super().save(*args, **kwargs)
 
 
@@ -0,0 +1,194 @@
+"""
+Compact prompt for the recommendation LLM selector.
+
+The selector used to get every candidate as a JSON object with its full
+ingredient token list, plus one inventory row per food log. The compact
+form sends:
+
+- `ing`: one dictionary of ingredient names; inventory rows and candidates
+  refer to them by index (a name shared by 80 candidates is sent once),
+- `inv`: [ingredient, days_left] once per ingredient, soonest first,
+- `c`: candidates as positional rows [id, title, ingredients, matched,
+  min_days_left, meal_time, difficulty], where `id` is a short alias
+  (1..n in ranking order) mapped back to the recipe id afterwards.
+
+Candidates are added in ranking order until the estimated token budget is
+spent (never fewer than `limit`). Estimates use tiktoken when it is
+installed, otherwise a local word-piece heuristic.
+"""
+import hashlib
+import json
+import math
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+try:
+    import tiktoken
+except Exception:
+    tiktoken = None
+
+SELECTOR_MODEL = "gpt-4o-mini"
+DEFAULT_TOKEN_BUDGET = 4000
+# inventory rows may use at most this share of the budget; the rest is for candidates
+INVENTORY_BUDGET_SHARE = 0.3
+
+SYSTEM_PROMPT = (
+    "You are a recipe recommendation assistant.\n"
+    "INPUT: ing = ingredient names, referenced by index everywhere else; "
+    "inv = [ingredient, days_left] the user has; "
+    "c = candidates [id, title, ingredients, matched_count, min_days_left, meal_time, difficulty].\n"
+    "RULES:\n"
+    "- You MUST select id values ONLY from c.\n"
+    "- Prefer recipes that use ingredients expiring soonest.\n"
+    "- Do NOT invent recipes, ingredients, steps, or ids.\n"
+    "- Output JSON only in this format:\n"
+    "{\"selected\":[{\"id\":1,\"why\":\"...\"}]}\n"
+    "- If none fit, output: {\"selected\":[]}\n"
+)
+
+# letters ~4 chars/token, digits ~3, a run of JSON punctuation ("],[", '":"') ~1
+_WORD_PIECES = re.compile(r"([A-Za-z]+)|(\d+)|[^\sA-Za-z\d]+")
+_encoding = None
+
+
+def estimate_tokens(text: str) -> int:
+    """Token count for `text`: exact with tiktoken, otherwise a word-piece estimate."""
+    global _encoding
+    if tiktoken is not None:
+        if _encoding is None:
+            _encoding = tiktoken.get_encoding("o200k_base")
+        return len(_encoding.encode(text))
+    total = 0
+    for match in _WORD_PIECES.finditer(text):
+        word, digits = match.group(1), match.group(2)
+        total += math.ceil(len(word) / 4) if word else math.ceil(len(digits) / 3) if digits else 1
+    return total
+
+
+def _dumps(data) -> str:
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+
+
+def inventory_rows(inventory) -> List[Tuple[str, int]]:
+    """(name_norm, days_left) per distinct ingredient, soonest expiry first."""
+    seen = {}
+    for name_id, days_left in zip(inventory.name_ids, inventory.days_left):
+        name = inventory.vocab[name_id]
+        if name and name not in seen:
+            seen[name] = days_left
+    return sorted(seen.items(), key=lambda item: (item[1], item[0]))
+
+
+@dataclass
+class CompactPrompt:
+    text: str
+    # alias sent to the model -> recipe id
+    aliases: Dict[int, int]
+    candidates: int
+    dropped: int
+    tokens: int
+    bytes: int = field(init=False)
+
+    def __post_init__(self):
+        self.bytes = len(self.text.encode("utf-8"))
+
+    @property
+    def cache_key(self) -> str:
+        digest = hashlib.sha256(f"{SELECTOR_MODEL}\n{SYSTEM_PROMPT}\n{self.text}".encode("utf-8")).hexdigest()
+        return f"recipes:llmselect:{digest}"
+
+    def resolve(self, picked: Iterable[dict]) -> List[Tuple[int, str]]:
+        """(recipe_id, why) for the model's picks that name a known alias, in its order."""
+        out = []
+        for item in picked:
+            if not isinstance(item, dict):
+                continue
+            recipe_id = self.aliases.get(item.get("id")) if isinstance(item.get("id"), int) else None
+            if recipe_id is not None:
+                out.append((recipe_id, (item.get("why") or "").strip()[:220]))
+        return out
+
+
+def compact_selector_prompt(
+    inventory: Sequence[Tuple[str, int]],
+    candidates: Sequence[dict],
+    limit: int,
+    token_budget: int = DEFAULT_TOKEN_BUDGET,
+) -> CompactPrompt:
+    """Build the user message for the selector from inventory_rows() and ranked candidates."""
+    ing: List[str] = []
+    ing_index: Dict[str, int] = {}
+
+    def alias_of(name: str) -> int:
+        if name not in ing_index:
+            ing_index[name] = len(ing)
+            ing.append(name)
+        return ing_index[name]
+
+    spent = 0
+    inv = []
+    for name, days_left in inventory:
+        cost = estimate_tokens(_dumps([name, days_left]))
+        if inv and spent + cost > token_budget * INVENTORY_BUDGET_SHARE:
+            break
+        inv.append([alias_of(name), days_left])
+        spent += cost
+
+    rows = []
+    aliases = {}
+    for c in candidates:
+        # names this row introduces take the next free indexes, in (sorted) row order
+        tokens = sorted(set(c["ingredient_tokens"]))
+        new_names = [t for t in tokens if t not in ing_index]
+        provisional = {name: len(ing) + i for i, name in enumerate(new_names)}
+        row = [
+            len(rows) + 1,
+            c["title"],
+            [ing_index[t] if t in ing_index else provisional[t] for t in tokens],
+            c["match_count"],
+            c["min_days_left"],
+            c["meal_time"],
+            c["difficulty"],
+        ]
+        cost = estimate_tokens(_dumps(row)) + sum(estimate_tokens(_dumps(name)) + 1 for name in new_names)
+        if len(rows) >= limit and spent + cost > token_budget:
+            break
+        for name in new_names:
+            alias_of(name)
+        rows.append(row)
+        aliases[row[0]] = c["recipe_id"]
+        spent += cost
+
+    text = _dumps({"limit": limit, "ing": ing, "inv": inv, "c": rows})
+    return CompactPrompt(
+        text=text,
+        aliases=aliases,
+        candidates=len(rows),
+        dropped=len(candidates) - len(rows),
+        tokens=estimate_tokens(SYSTEM_PROMPT) + estimate_tokens(text),
+    )
+
+
+def verbose_selector_payload(inventory, candidates: Sequence[dict], limit: int) -> str:
+    """The pre-compaction user message, kept to measure the saving (bench_prompt)."""
+    return json.dumps({
+        "limit": limit,
+        "inventory": [
+            {"name_norm": inventory.vocab[name_id], "days_left": days_left}
+            for name_id, days_left in zip(inventory.name_ids, inventory.days_left)
+            if inventory.vocab[name_id]
+        ],
+        "candidates": [
+            {
+                "recipe_id": c["recipe_id"],
+                "title": c["title"],
+                "ingredient_tokens": c["ingredient_tokens"],
+                "match_count": c["match_count"],
+                "min_days_left": c["min_days_left"],
+                "meal_time": c["meal_time"],
+                "difficulty": c["difficulty"],
+            }
+            for c in candidates
+        ],
+    })
@@ -0,0 +1,246 @@
+"""
+Per-user recommendation feed.
+
+A feed is the ranked candidate list for the user's current inventory plus
+the LLM's pick among them, stored in the cache under the foodlog version
+and day it was built for. RecommendRecipesAPIView serves a matching feed
+as is; when there is none it serves a deterministic feed (ranking only,
+no LLM call) and leaves the LLM selection to the refresh_recommendation_feed
+Celery task, which pantry writes also schedule (debounced per user).
+"""
+import json
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from food.utils.caching import get_foodlog_version
+from food.utils.tiered_cache import catalog_cache
+from meal_plans.services.inventory import get_inventory_snapshot
+from recipes.models import MealDBRecipe
+from recipes.prompt_compaction import SELECTOR_MODEL, SYSTEM_PROMPT, compact_selector_prompt, inventory_rows
+
+logger = logging.getLogger(__name__)
+
+# OpenAI is optional fallback
+try:
+    from openai import OpenAI
+except Exception:
+    OpenAI = None
+
+client = None
+if OpenAI and getattr(settings, "OPENAI_API_KEY", None):
+    client = OpenAI(api_key=settings.OPENAI_API_KEY)
+
+FEED_TTL_SECONDS = 60 * 60 * 24
+SELECTOR_CACHE_TTL_SECONDS = 60 * 60 * 24
+MAX_CANDIDATES = 400
+MAX_LLM_CANDIDATES = 150
+# the feed is built for the largest ?limit= the API accepts and sliced per request
+FEED_SIZE = 10
+
+CANDIDATE_FIELDS = (
+    "id", "mealdb_id", "title", "thumbnail", "category", "cuisine", "meal_time", "difficulty", "ingredient_tokens",
+)
+
+
+def feed_key(user_id: int) -> str:
+    return f"recipes:feed:{user_id}"
+
+
+def catalog_candidate_rows():
+    """Light projection of the whole catalog in default (title) order, cached in both tiers."""
+    return catalog_cache.get(
+        "candidates",
+        lambda: list(MealDBRecipe.objects.order_by("title", "id").values_list(*CANDIDATE_FIELDS)),
+    )
+
+
+def catalog_recipe_payloads(recipe_ids):
+    """Full recipe fields by id for the recommend response, cached in both tiers."""
+    def load(keys):
+        ids = [int(k.split(":", 1)[1]) for k in keys]
+        return {
+            f"recipe:{r['id']}": r
+            for r in MealDBRecipe.objects.filter(id__in=ids).values(
+                "id", "mealdb_id", "title", "thumbnail", "category", "cuisine",
+                "instructions", "tags", "ingredients", "ingredient_tokens", "meal_time", "difficulty",
+            )
+        }
+
+    found = catalog_cache.get_many([f"recipe:{i}" for i in recipe_ids], load)
+    return {int(k.split(":", 1)[1]): v for k, v in found.items()}
+
+
+def rank_candidates(inventory):
+    """Catalog recipes sharing an ingredient with the inventory, best overlap / soonest expiry first."""
+    inv_set = set(inventory.plain_tokens)
+    inv_days = inventory.min_days_left
+
+    # same rows the old `ingredient_tokens ?| inventory` query returned, from the catalog cache
+    candidates_scored = []
+    for rid, mealdb_id, title, thumbnail, category, cuisine, meal_time, difficulty, tokens in catalog_candidate_rows():
+        if len(candidates_scored) >= MAX_CANDIDATES:
+            break
+        ing_set = set(tokens or [])
+
+        matched = list(ing_set & inv_set)
+        match_count = len(matched)
+        if match_count < 1:
+            continue
+
+        min_days = min([inv_days[m] for m in matched], default=999999)
+
+        candidates_scored.append(
+            {
+                "recipe_id": rid,
+                "mealdb_id": mealdb_id,
+                "title": title,
+                "thumbnail": thumbnail,
+                "category": category,
+                "cuisine": cuisine,
+                "meal_time": meal_time,
+                "difficulty": difficulty,
+                "ingredient_tokens": sorted(ing_set)[:30],
+                "match_count": match_count,
+                "min_days_left": min_days,
+            }
+        )
+
+    # deterministic ranking as base
+    candidates_scored.sort(key=lambda x: (-x["match_count"], x["min_days_left"]))
+    return candidates_scored[:MAX_LLM_CANDIDATES]
+
+
+def select_with_llm(inventory, candidates, limit):
+    """
+    LLM selector: choose ONLY recipe_id values from `candidates`.
+    Returns (selected_ids, why_map); empty when there is no client or the call fails.
+
+    The model sees the compact prompt (recipes.prompt_compaction); answers are
+    cached by the hash of that prompt, so identical inventories and candidate
+    lists (any user) skip the call.
+    """
+    if not client or not candidates:
+        return [], {}
+
+    prompt = compact_selector_prompt(inventory_rows(inventory), candidates, limit)
+    picked = cache.get(prompt.cache_key)
+    cached = picked is not None
+    if not cached:
+        try:
+            resp = client.chat.completions.create(
+                model=SELECTOR_MODEL,
+                messages=[
+                    {"role": "system", "content": SYSTEM_PROMPT},
+                    {"role": "user", "content": prompt.text},
+                ],
+                temperature=0.2,
+                response_format={"type": "json_object"},
+            )
+            data = json.loads(resp.choices[0].message.content)
+            picked = data.get("selected", []) or []
+        except Exception as exc:
+            logger.warning(f"Recommendation LLM selector failed, using the deterministic ranking: {exc}")
+            return [], {}
+        cache.set(prompt.cache_key, picked, timeout=SELECTOR_CACHE_TTL_SECONDS)
+
+    logger.info(
+        f"Recommendation selector prompt: {prompt.bytes} bytes, ~{prompt.tokens} tokens, "
+        f"{prompt.candidates} candidates ({prompt.dropped} over budget), cached={cached}"
+    )
+
+    selected_ids = []
+    why_map = {}
+    for rid, why in prompt.resolve(picked):
+        if rid not in why_map:
+            selected_ids.append(rid)
+            why_map[rid] = why
+    return selected_ids[:limit], why_map
+
+
+def build_feed(user, use_llm: bool = True) -> dict:
+    """
+    Rank candidates for the user's current inventory (and let the LLM pick
+    among them when use_llm). `complete` is False when the LLM step was
+    skipped but a client is configured, i.e. a refresh can still improve it.
+    """
+    today = timezone.now().date()
+    # read before the snapshot: a write landing mid-build leaves the feed stale, not wrong
+    version = get_foodlog_version(user.id)
+    inventory = get_inventory_snapshot(user, today)
+
+    ranked = rank_candidates(inventory) if inventory.plain_tokens else []
+    selected, why = select_with_llm(inventory, ranked, FEED_SIZE) if use_llm else ([], {})
+
+    return {
+        "version": version,
+        "date": today.isoformat(),
+        "complete": use_llm or client is None or not ranked,
+        "ranked": [c["recipe_id"] for c in ranked[:FEED_SIZE]],
+        "selected": selected,
+        "why": why,
+        "inv_days": dict(inventory.min_days_left),
+    }
+
+
+def store_feed(user_id: int, feed: dict) -> None:
+    cache.set(feed_key(user_id), feed, timeout=FEED_TTL_SECONDS)
+
+
+def get_current_feed(user_id: int):
+    """The stored feed if it was built for the current foodlog version and today, else None."""
+    feed = cache.get(feed_key(user_id))
+    if feed is None:
+        return None
+    if feed["version"] != get_foodlog_version(user_id) or feed["date"] != timezone.now().date().isoformat():
+        return None
+    return feed
+
+
+def has_feed(user_id: int) -> bool:
+    return cache.get(feed_key(user_id)) is not None
+
+
+def render_feed(feed: dict, limit: int):
+    """Response rows for the first `limit` picks (LLM selection, else the ranking)."""
+    selected_ids = feed["selected"][:limit] or feed["ranked"][:limit]
+    inv_days = feed["inv_days"]
+    why_map = feed["why"]
+
+    # full recipes from the catalog (never from LLM)
+    rmap = catalog_recipe_payloads(selected_ids)
+    ordered = [rmap[i] for i in selected_ids if i in rmap]
+
+    out = []
+    for r in ordered:
+        ing_norms = r["ingredient_tokens"] or []
+        matched = [n for n in ing_norms if n in inv_days]
+
+        expiring_soon = sorted(
+            [{"name_norm": n, "days_left": inv_days[n]} for n in matched],
+            key=lambda d: d["days_left"],
+        )[:5]
+
+        out.append(
+            {
+                "recipe_id": r["id"],
+                "mealdb_id": r["mealdb_id"],
+                "title": r["title"],
+                "thumbnail": r["thumbnail"],
+                "category": r["category"],
+                "cuisine": r["cuisine"],
+                "instructions": r["instructions"],
+                "tags": r["tags"],
+                "ingredients": r["ingredients"],  # list of {"name","measure"}
+                "mealTime": r["meal_time"],
+                "difficulty": r["difficulty"],
+                "why": why_map.get(r["id"], ""),
+                "match": {
+                    "matched_ingredients_norm": matched,
+                    "expiring_soon": expiring_soon,
+                },
+            }
+        )
+    return out
@@ -0,0 +1,72 @@
+"""
+Random MealDB recipe sampling without touching the table.
+
+SamplePool holds the catalog ids as one dense sorted array plus one id array
+per facet value (category, cuisine, meal_time). It lives in the two-tier
+catalog cache, so it is rebuilt only after the catalog generation moves, and
+a pick is a random index into an array instead of COUNT + a full id scan.
+"""
+import random
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from food.utils.tiered_cache import catalog_cache
+from recipes.models import MealDBRecipe
+
+FACETS = ("category", "cuisine", "meal_time")
+
+
+def facet_key(value) -> str:
+    return (value or "").strip().lower()
+
+
+@dataclass(frozen=True)
+class SamplePool:
+    ids: np.ndarray
+    facets: Dict[str, Dict[str, np.ndarray]]
+
+    @classmethod
+    def from_rows(cls, rows) -> "SamplePool":
+        """rows: (id, category, cuisine, meal_time) tuples."""
+        rows = sorted(rows)
+        buckets: Dict[str, Dict[str, List[int]]] = {facet: {} for facet in FACETS}
+        for recipe_id, *values in rows:
+            for facet, value in zip(FACETS, values):
+                key = facet_key(value)
+                if key:
+                    buckets[facet].setdefault(key, []).append(recipe_id)
+        return cls(
+            ids=np.fromiter((r[0] for r in rows), dtype=np.int64, count=len(rows)),
+            facets={
+                facet: {key: np.asarray(ids, dtype=np.int64) for key, ids in values.items()}
+                for facet, values in buckets.items()
+            },
+        )
+
+    def candidates(self, **filters: Optional[str]) -> np.ndarray:
+        """Ids matching every given facet value (case-insensitive); no filters = whole catalog."""
+        selected = None
+        for facet in FACETS:
+            key = facet_key(filters.get(facet))
+            if not key:
+                continue
+            ids = self.facets[facet].get(key)
+            if ids is None:
+                return self.ids[:0]
+            # per-facet arrays are sorted and unique
+            selected = ids if selected is None else np.intersect1d(selected, ids, assume_unique=True)
+        return self.ids if selected is None else selected
+
+    def sample(self, n: int, rng=random, **filters: Optional[str]) -> List[int]:
+        ids = self.candidates(**filters)
+        n = min(n, len(ids))
+        return [int(ids[i]) for i in rng.sample(range(len(ids)), n)]
+
+
+def get_sample_pool() -> SamplePool:
+    return catalog_cache.get(
+        "sample_pool",
+        lambda: SamplePool.from_rows(MealDBRecipe.objects.values_list("id", *FACETS)),
+    )
@@ -0,0 +1,17 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from food.utils.caching import bump_catalog_version, on_foodlog_bump
+from .models import MealDBRecipe
+from .tasks import inventory_changed
+
+
+@receiver(post_save, sender=MealDBRecipe)
+@receiver(post_delete, sender=MealDBRecipe)
+def mealdb_catalog_changed(sender, instance, **kwargs):
+    """Single-row changes invalidate per-process catalog data (bulk commands bump explicitly)."""
+    bump_catalog_version()
+
+
+# pantry writes (food.signals, batch consumption) refresh the user's recommendation feed
+on_foodlog_bump(inventory_changed)
@@ -1,7 +1,69 @@
-from celery import shared_task
+import logging
 import time
 
+from celery import shared_task
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+
+from recipes.recommendations import build_feed, has_feed, store_feed
+
+logger = logging.getLogger(__name__)
+
+# pantry edits within this window are folded into one feed refresh
+FEED_DEBOUNCE_SECONDS = 30
+FEED_PENDING_TIMEOUT = FEED_DEBOUNCE_SECONDS + 5 * 60
+
+
+def _pending_key(user_id: int) -> str:
+    return f"recipes:feed:pending:{user_id}"
+
+
 @shared_task(bind=True)
 def test_task(self):
     time.sleep(3)
     return "Celery is working 🚀"
+
+
+def schedule_feed_refresh(user_id: int) -> bool:
+    """
+    Queue refresh_recommendation_feed for the user unless one is already
+    pending. Returns True when a task was queued.
+    """
+    if not cache.add(_pending_key(user_id), 1, timeout=FEED_PENDING_TIMEOUT):
+        return False
+    try:
+        refresh_recommendation_feed.apply_async(args=[user_id], countdown=FEED_DEBOUNCE_SECONDS, retry=False)
+    except Exception:
+        cache.delete(_pending_key(user_id))
+        logger.exception(f"Could not queue recommendation feed refresh for user {user_id}")
+        return False
+    return True
+
+
+def inventory_changed(user_id: int) -> None:
+    """Pantry writes refresh the feed of users who have one (others get theirs on first request)."""
+    if has_feed(user_id):
+        schedule_feed_refresh(user_id)
+
+
+@shared_task(bind=True, max_retries=2, default_retry_delay=30)
+def refresh_recommendation_feed(self, user_id: int):
+    # from here on a new pantry edit queues another run instead of being folded into this one
+    cache.delete(_pending_key(user_id))
+
+    user = get_user_model().objects.filter(id=user_id).first()
+    if user is None:
+        return {"user_id": user_id, "stored": False}
+
+    try:
+        feed = build_feed(user)
+    except Exception as exc:
+        logger.exception(f"Recommendation feed refresh failed for user {user_id}")
+        raise self.retry(exc=exc)
+
+    store_feed(user_id, feed)
+    logger.info(
+        f"Recommendation feed for user {user_id}: {len(feed['ranked'])} ranked, "
+        f"{len(feed['selected'])} selected (foodlog v{feed['version']})"
+    )
+    return {"user_id": user_id, "stored": True, "selected": len(feed["selected"])}
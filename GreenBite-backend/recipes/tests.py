@@ -1,10 +1,25 @@
-from django.test import TestCase
+import json
+import os
+import tempfile
+from io import StringIO
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
 from django.contrib.auth import get_user_model
 from rest_framework.test import APIClient
 from rest_framework import status
 from decimal import Decimal
 
 from recipes.models import MealDBRecipe, RecipeFavorite
+from recipes.prompt_compaction import compact_selector_prompt
+from recipes.recommendations import build_feed, get_current_feed, select_with_llm, store_feed
+from recipes.sampling import SamplePool
+from recipes.tasks import FEED_DEBOUNCE_SECONDS, refresh_recommendation_feed
 from food.models import FoodLogSys
 #model check 
 class MealDBRecipeModelTest(TestCase):
@@ -113,3 +128,213 @@ class UnauthorizedAccessTest(TestCase):
         response = self.client.get("/api/recipes/recommend/")
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
 
+
+def _mealdb_payload(mid, title, *ingredients):
+    meal = {"idMeal": mid, "strMeal": title, "strInstructions": "Cook.", "strArea": "Italian"}
+    for i in range(1, 21):
+        meal[f"strIngredient{i}"] = ingredients[i - 1] if i <= len(ingredients) else ""
+        meal[f"strMeasure{i}"] = "1" if i <= len(ingredients) else ""
+    return meal
+
+
+class ImportMealDBBulkTest(TestCase):
+    def _dump(self, meals):
+        f = tempfile.NamedTemporaryFile("w", suffix=".json", delete=False)
+        json.dump({"meals": meals}, f)
+        f.close()
+        self.addCleanup(os.unlink, f.name)
+        return f.name
+
+    def test_from_dump_upserts_and_builds_tokens(self):
+        MealDBRecipe.objects.create(mealdb_id="1", title="Old", embedding=[1.0])
+        path = self._dump([
+            _mealdb_payload("1", "Pasta", "Tomatoes", "Garlic"),
+            _mealdb_payload("2", "Omelette", "Eggs"),
+            {"idMeal": "", "strMeal": "Broken"},
+        ])
+
+        out = StringIO()
+        call_command("import_mealdb", "--from-dump", path, stdout=out)
+
+        self.assertIn("created=1, updated=1, skipped=1", out.getvalue())
+        pasta = MealDBRecipe.objects.get(mealdb_id="1")
+        self.assertEqual(pasta.title, "Pasta")
+        self.assertEqual(pasta.ingredient_tokens, MealDBRecipe.tokens_for(pasta.ingredients))
+        self.assertEqual(pasta.embedding, [1.0])
+        self.assertEqual(MealDBRecipe.objects.get(mealdb_id="2").ingredient_tokens, ["egg"])
+
+    def test_bulk_reuses_search_payloads(self):
+        def fake_fetch(session, url, params, timeout=20):
+            if url.endswith("search.php"):
+                if params["f"] == "p":
+                    return {"meals": [_mealdb_payload("1", "Pasta", "Garlic"), {"idMeal": "2", "strMeal": "Pie"}]}
+                return {"meals": None}
+            self.assertEqual(params, {"i": "2"})
+            return {"meals": [_mealdb_payload("2", "Pie", "Flour")]}
+
+        with patch("recipes.management.commands.import_mealdb.fetch_json", side_effect=fake_fetch) as fetch:
+            call_command("import_mealdb", "--bulk", "--sleep", "0", stdout=StringIO())
+
+        lookups = [c for c in fetch.call_args_list if c.args[1].endswith("lookup.php")]
+        self.assertEqual(len(lookups), 1)
+        self.assertEqual(set(MealDBRecipe.objects.values_list("mealdb_id", flat=True)), {"1", "2"})
+
+
+class SamplePoolTest(TestCase):
+    def setUp(self):
+        self.pool = SamplePool.from_rows([
+            (3, "Beef", "British", "dinner"),
+            (1, "Dessert", "French", "snack"),
+            (2, "Beef", "French", "dinner"),
+            (4, "", "", "breakfast"),
+        ])
+
+    def test_facets_intersect_case_insensitively(self):
+        self.assertEqual(list(self.pool.candidates()), [1, 2, 3, 4])
+        self.assertEqual(list(self.pool.candidates(category="beef")), [2, 3])
+        self.assertEqual(list(self.pool.candidates(category="Beef", cuisine=" french ")), [2])
+        self.assertEqual(list(self.pool.candidates(cuisine="Thai")), [])
+
+    def test_sample_is_unique_and_capped(self):
+        picked = self.pool.sample(10, category="beef")
+        self.assertEqual(sorted(picked), [2, 3])
+        self.assertEqual(self.pool.sample(3, cuisine="Thai"), [])
+
+
+class MealDBRandomFilterTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(email="random@test.com", password="123456")
+        self.client.force_authenticate(self.user)
+        MealDBRecipe.objects.create(mealdb_id="r1", title="Roast", category="Beef", meal_time="dinner")
+        MealDBRecipe.objects.create(mealdb_id="r2", title="Tart", category="Dessert", meal_time="snack")
+
+    def test_random_filters_by_facet(self):
+        response = self.client.get("/api/mealdb/random/", {"category": "dessert"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["mealdb_id"], "r2")
+
+    def test_random_with_no_match_is_empty(self):
+        response = self.client.get("/api/mealdb/random/", {"n": 3, "meal_time": "breakfast"})
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+
+FEED_TEST_CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "feed-tests"}}
+
+
+def _picking_client(title, calls=None):
+    """OpenAI stand-in that selects the candidate called `title` from the compact prompt."""
+    def create(messages, **kwargs):
+        if calls is not None:
+            calls.append(messages)
+        rows = json.loads(messages[-1]["content"])["c"]
+        picked = [{"id": row[0], "why": "uses your rice"} for row in rows if row[1] == title]
+        content = json.dumps({"selected": picked})
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+    return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+
+@override_settings(CACHES=FEED_TEST_CACHES)
+class RecommendationFeedTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(email="feed@test.com", password="123456")
+        self.client.force_authenticate(self.user)
+        self.both = MealDBRecipe.objects.create(
+            mealdb_id="f1", title="Chicken Rice",
+            ingredients=[{"name": "Chicken", "measure": ""}, {"name": "Rice", "measure": ""}],
+        )
+        self.rice = MealDBRecipe.objects.create(
+            mealdb_id="f2", title="Rice Pudding", ingredients=[{"name": "Rice", "measure": ""}],
+        )
+        for name in ("Chicken", "Rice"):
+            self._add_food(name)
+
+    def _add_food(self, name):
+        FoodLogSys.objects.create(
+            user=self.user, name=name, quantity=Decimal("1"), unit="kg",
+            expiry_date=timezone.now().date() + timedelta(days=2),
+        )
+
+    def test_first_request_serves_ranking_and_queues_llm_refresh(self):
+        with patch("recipes.recommendations.client", _picking_client("Rice Pudding")), \
+                patch.object(refresh_recommendation_feed, "apply_async") as queued:
+            response = self.client.get("/api/recipes/recommend/?limit=2")
+            self.client.get("/api/recipes/recommend/?limit=2")
+
+            self.assertEqual([r["recipe_id"] for r in response.data], [self.both.id, self.rice.id])
+            queued.assert_called_once()
+            self.assertEqual(queued.call_args.kwargs["args"], [self.user.id])
+
+            refresh_recommendation_feed(self.user.id)
+            with self.assertNumQueries(0):
+                response = self.client.get("/api/recipes/recommend/?limit=2")
+
+        self.assertEqual([r["recipe_id"] for r in response.data], [self.rice.id])
+        self.assertEqual(response.data[0]["why"], "uses your rice")
+        self.assertEqual(queued.call_count, 1)
+
+    def test_pantry_writes_refresh_an_existing_feed_once(self):
+        with patch.object(refresh_recommendation_feed, "apply_async") as queued:
+            self._add_food("Eggs")  # no feed yet: nothing to refresh
+            self.assertFalse(queued.called)
+
+            store_feed(self.user.id, build_feed(self.user, use_llm=False))
+            self._add_food("Milk")
+            self._add_food("Butter")
+
+        queued.assert_called_once()
+        self.assertEqual(queued.call_args.kwargs["countdown"], FEED_DEBOUNCE_SECONDS)
+
+    def test_stale_feed_is_not_served(self):
+        store_feed(self.user.id, build_feed(self.user, use_llm=False))
+        with patch.object(refresh_recommendation_feed, "apply_async"):
+            FoodLogSys.objects.filter(user=self.user).delete()
+
+        self.assertIsNone(get_current_feed(self.user.id))
+
+
+class SelectorPromptCompactionTest(TestCase):
+    def setUp(self):
+        self.inventory = [("rice", 1), ("chicken", 2)]
+        self.candidates = [
+            {
+                "recipe_id": 100 + i, "title": f"Recipe {i}", "ingredient_tokens": ["rice", "chicken", f"spice{i}"],
+                "match_count": 2, "min_days_left": 1, "meal_time": "dinner", "difficulty": "easy",
+            }
+            for i in range(40)
+        ]
+
+    def test_aliases_and_shared_ingredient_dictionary(self):
+        prompt = compact_selector_prompt(self.inventory, self.candidates[:2], limit=2)
+        payload = json.loads(prompt.text)
+
+        self.assertEqual(payload["ing"], ["rice", "chicken", "spice0", "spice1"])
+        self.assertEqual(payload["inv"], [[0, 1], [1, 2]])
+        self.assertEqual(payload["c"][1][:3], [2, "Recipe 1", [1, 0, 3]])
+        self.assertEqual(prompt.resolve([{"id": 2, "why": "x"}, {"id": 99}, {"recipe_id": 100}]), [(101, "x")])
+
+    def test_token_budget_truncates_but_keeps_limit(self):
+        full = compact_selector_prompt(self.inventory, self.candidates, limit=5, token_budget=100000)
+        tight = compact_selector_prompt(self.inventory, self.candidates, limit=5, token_budget=1)
+
+        self.assertEqual(full.candidates, 40)
+        self.assertEqual((tight.candidates, tight.dropped), (5, 35))
+        self.assertLess(full.bytes, len(json.dumps({"candidates": self.candidates})))
+        self.assertNotEqual(full.cache_key, tight.cache_key)
+
+    @override_settings(CACHES=FEED_TEST_CACHES)
+    def test_selector_answers_are_cached_by_prompt(self):
+        cache.clear()
+        inventory = SimpleNamespace(vocab=["", "rice", "chicken"], name_ids=[1, 2], days_left=[1, 2])
+        calls = []
+        with patch("recipes.recommendations.client", _picking_client("Recipe 3", calls)):
+            first = select_with_llm(inventory, self.candidates, 5)
+            second = select_with_llm(inventory, self.candidates, 5)
+
+        self.assertEqual(first, ([103], {103: "uses your rice"}))
+        self.assertEqual(second, first)
+        self.assertEqual(len(calls), 1)
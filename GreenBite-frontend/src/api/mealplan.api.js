@@ -9,10 +9,14 @@ export const getMealPlanById = async (id) => {
     const response = await api.get(`api/meal_plans/${id}/`);
     return response.data;
 };
-export const getAllMealPlans = async () => {
-    const response = await api.get("api/meal_plans/");
+export const getMealPlansPage = async (cursor) => {
+    // cursor-paginated: { next, previous, results }
+    const response = await api.get("api/meal_plans/", { params: cursor ? { cursor } : {} });
     return response.data;
 };
+// cursor of the page after `page`, read from its `next` link
+export const nextMealPlansCursor = (page) =>
+    page?.next ? new URL(page.next, window.location.origin).searchParams.get("cursor") : undefined;
 export const confirmMealPlanDay = async (id) => {
     const response = await api.post(`api/meal_plans/days/${id}/confirm/`);
     return response.data;
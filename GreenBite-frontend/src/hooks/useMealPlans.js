@@ -1,8 +1,9 @@
-import { useQuery, useMutation, useQueryClient } from "@tanstack/react-query";
+import { useQuery, useInfiniteQuery, useMutation, useQueryClient } from "@tanstack/react-query";
 import {
   generateMealPlan,
   getMealPlanById,
-  getAllMealPlans,
+  getMealPlansPage,
+  nextMealPlansCursor,
   confirmMealPlanDay,
   confirmMealPlan,
   replaceMeal,
@@ -11,9 +12,11 @@ import {
 } from "@/api/mealplan.api";
 
 export function useMealPlansList() {
-  return useQuery({
+  // pages of 20 plans; fetchNextPage() follows the cursor in `next`
+  return useInfiniteQuery({
     queryKey: ["mealPlans"],
-    queryFn: getAllMealPlans,
+    queryFn: ({ pageParam }) => getMealPlansPage(pageParam),
+    getNextPageParam: nextMealPlansCursor,
   });
 }
 
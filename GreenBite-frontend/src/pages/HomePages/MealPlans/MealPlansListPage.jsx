@@ -16,7 +16,8 @@ function StatusBadge({ confirmed }) {
 }
 
 export default function MealPlansListPage() {
-  const { data, isLoading, isError } = useMealPlansList();
+  const { data, isLoading, isError, hasNextPage, fetchNextPage, isFetchingNextPage } =
+    useMealPlansList();
   const deleteMutation = useDeleteMealPlan();
 
   if (isLoading) {
@@ -47,7 +48,7 @@ export default function MealPlansListPage() {
     );
   }
 
-  const plans = data || [];
+  const plans = data?.pages.flatMap((page) => page.results) || [];
 
   if (!plans.length) {
     return (
@@ -141,6 +142,19 @@ export default function MealPlansListPage() {
             </div>
           ))}
         </div>
+
+        {hasNextPage && (
+          <div className="flex justify-center pt-2">
+            <button
+              type="button"
+              onClick={() => fetchNextPage()}
+              disabled={isFetchingNextPage}
+              className="px-5 py-2.5 text-sm font-semibold rounded-xl border border-gray-200 bg-white hover:bg-gray-50 disabled:opacity-60 transition"
+            >
+              {isFetchingNextPage ? "Loading..." : "Load more"}
+            </button>
+          </div>
+        )}
       </div>
     </div>
   );